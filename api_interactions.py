@@ -1,39 +1,275 @@
 import os
 import asyncio
-from typing import Dict, List, Optional
-from notion_client import Client
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, Iterator, List, Optional
+from notion_client import AsyncClient, Client
 from dotenv import load_dotenv
-import torch
+from instrumentation import traced
+from rate_limiter import NotionRateLimiter, get_shared_limiter
 
-# Initialize PyTorch with CPU
-torch.set_num_threads(1)
-torch.set_num_interop_threads(1)
+# Notion API limits: characters per rich text object, rich text objects per
+# array, and blocks per children list (pages.create or blocks.children.append)
+MAX_TEXT_LENGTH = 2000
+MAX_RICH_TEXT_ITEMS = 100
+MAX_BLOCKS_PER_REQUEST = 100
 
-class NotionAPI:
-    def __init__(self):
-        """Initialize the Notion API client."""
-        load_dotenv()
-        self.client = Client(auth=os.getenv("NOTION_API_KEY"))
 
-        # Ensure we're using CPU
-        if torch.cuda.is_available():
-            torch.cuda.set_device('cpu')
+@dataclass
+class BulkResult:
+    """Outcome of one item in a bulk Notion operation."""
+    index: int
+    page_id: Optional[str] = None
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _same_due_date(current: Optional[str], wanted: str) -> bool:
+    """
+    Check whether a task's stored due date already matches the wanted one.
+
+    Date-only values compare by day; datetimes compare to the minute,
+    since Notion drops seconds.
+
+    Args:
+        current: The due date stored in Notion, if any
+        wanted: The due date the task should have
+
+    Returns:
+        bool: True if no update is needed
+    """
+    if not current:
+        return False
+    if len(current) == 10 or len(wanted) == 10:
+        return current[:10] == wanted[:10]
+    try:
+        current_time = datetime.fromisoformat(current.replace("Z", "+00:00")).timestamp()
+        wanted_time = datetime.fromisoformat(wanted.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return current == wanted
+    return abs(current_time - wanted_time) < 60
+
+
+class NotionBase:
+    """Request-building helpers shared by the sync and async clients."""
+
+    def _client_options(self) -> Dict:
+        """
+        Build the notion_client options from the environment.
+
+        NOTION_BASE_URL points the client at another server, such as the
+        fake Notion server used by the benchmarks.
+
+        Returns:
+            Dict: Keyword arguments for Client and AsyncClient
+        """
+        options = {"auth": os.getenv("NOTION_API_KEY")}
+        base_url = os.getenv("NOTION_BASE_URL")
+        if base_url:
+            options["base_url"] = base_url
+        return options
+
+    def _split_text(self, text: str, max_length: int = MAX_TEXT_LENGTH) -> List[str]:
+        """
+        Split text into segments that fit Notion's rich text limit.
+
+        Segments end at whitespace where possible, so words stay whole.
+
+        Args:
+            text: The text to split
+            max_length: Maximum characters per segment (default: 2000 for Notion)
+
+        Returns:
+            List[str]: Segments that join back into the original text
+        """
+        segments = []
+        while len(text) > max_length:
+            cut = text.rfind(" ", max_length // 2, max_length)
+            cut = cut + 1 if cut != -1 else max_length
+            segments.append(text[:cut])
+            text = text[cut:]
+        if text:
+            segments.append(text)
+        return segments
+
+    def _split_rich_text(self, rich_text: List[Dict]) -> List[Dict]:
+        """
+        Split every over-long text object in a rich text array.
+
+        Args:
+            rich_text: A Notion rich text array
+
+        Returns:
+            List[Dict]: The same text, each object within Notion's limit;
+                annotations and links are kept on every segment
+        """
+        split = []
+        for item in rich_text:
+            content = item.get("text", {}).get("content")
+            if content is None or len(content) <= MAX_TEXT_LENGTH:
+                split.append(item)
+                continue
+            for segment in self._split_text(content):
+                split.append(dict(item, text=dict(item["text"], content=segment)))
+        return split
+
+    def _prepare_properties(self, properties: Dict) -> Dict:
+        """
+        Split long text content in page properties to fit Notion's limits.
+
+        Args:
+            properties: Dictionary of page properties
+
+        Returns:
+            Dict: The same properties, with long text split in place
+        """
+        for prop_value in properties.values():
+            for key in ("rich_text", "title"):
+                if isinstance(prop_value, dict) and key in prop_value:
+                    prop_value[key] = self._split_rich_text(prop_value[key])
+        return properties
+
+    def _task_properties(self, title: str, due_date: str, progress: int = 0,
+                         task_type: Optional[str] = None) -> Dict:
+        """
+        Build the properties of a task page.
+
+        Args:
+            title: The title of the task
+            due_date: The due date of the task
+            progress: The progress percentage (0-100)
+            task_type: The Type option ("Summary" or "Question Set"), if any
+
+        Returns:
+            Dict: Page properties for the tasks database
+        """
+        properties = {
+            "Name": {"title": [{"text": {"content": title}}]},
+            "Due Date": {"date": {"start": due_date}},
+            "Progress": {"number": progress}
+        }
+        if task_type:
+            properties["Type"] = {"select": {"name": task_type}}
+        return properties
+
+    def _text_blocks(self, block_type: str, text: str, children: Optional[List[Dict]] = None) -> List[Dict]:
+        """
+        Build blocks of one type holding the whole text.
+
+        Long text is split into 2000-character rich text segments, and into
+        several blocks if it needs more segments than one block can hold.
+
+        Args:
+            block_type: The block type, e.g. "paragraph" or "toggle"
+            text: The text of the block
+            children: Nested blocks, attached to the last block
+
+        Returns:
+            List[Dict]: The blocks, in order
+        """
+        segments = [{"type": "text", "text": {"content": segment}} for segment in self._split_text(text)]
+        blocks = [
+            {
+                "object": "block",
+                "type": block_type,
+                block_type: {"rich_text": segments[start:start + MAX_RICH_TEXT_ITEMS]}
+            }
+            for start in range(0, len(segments), MAX_RICH_TEXT_ITEMS)
+        ]
+        if blocks and children:
+            blocks[-1][block_type]["children"] = children
+        return blocks
+
+    def _paragraph_blocks(self, paragraphs: List[str]) -> List[Dict]:
+        """
+        Build paragraph blocks for a page body.
+
+        Args:
+            paragraphs: Text of each paragraph
+
+        Returns:
+            List[Dict]: Paragraph blocks for the non-empty texts, without truncation
+        """
+        return [block for text in paragraphs if text for block in self._text_blocks("paragraph", text)]
+
+    def _material_blocks(self, summary: str, questions: List[Dict]) -> List[Dict]:
+        """
+        Build the page body for a summary and its review questions.
+
+        Each question is a toggle whose answer is hidden until it is opened.
+
+        Args:
+            summary: The summary text; blank lines separate paragraphs
+            questions: Dicts with "question" and "answer"
+
+        Returns:
+            List[Dict]: Blocks for the page body, in order
+        """
+        blocks = self._text_blocks("heading_2", "Summary")
+        blocks.extend(self._paragraph_blocks([paragraph.strip() for paragraph in summary.split("\n\n")]))
+        if questions:
+            blocks.extend(self._text_blocks("heading_2", "Review Questions"))
+            for number, qa in enumerate(questions, 1):
+                blocks.extend(self._text_blocks(
+                    "toggle", f"Q{number}. {qa['question']}", self._paragraph_blocks([qa["answer"]])
+                ))
+        return blocks
+
+    def _title_filter(self, titles: List[str]) -> Dict:
+        """
+        Build a Notion filter matching pages whose Name is any of the titles.
+
+        Args:
+            titles: Exact titles to match (Notion allows up to 100 conditions)
+
+        Returns:
+            Dict: Filter parameters for query_database
+        """
+        return {"or": [{"property": "Name", "title": {"equals": title}} for title in titles]}
 
-    def _truncate_text(self, text: str, max_length: int = 2000) -> str:
+    def _index_by_title(self, pages: List[Dict], titles: List[str]) -> Dict[str, Dict]:
         """
-        Truncate text to fit Notion's limits.
+        Map each wanted title to its existing task page.
+
+        Archived pages are ignored; when earlier runs left several pages with
+        the same title, the oldest one is used.
 
         Args:
-            text: The text to truncate
-            max_length: Maximum length allowed (default: 2000 for Notion)
+            pages: Pages returned by a title query
+            titles: The titles being looked up
 
         Returns:
-            str: Truncated text
+            Dict[str, Dict]: Page per title, for the titles that exist
+        """
+        wanted = set(titles)
+        existing = {}
+        for page in sorted(pages, key=lambda page: page.get("created_time", "")):
+            if page.get("archived") or page.get("in_trash"):
+                continue
+            title = "".join(part.get("plain_text", part.get("text", {}).get("content", ""))
+                            for part in page["properties"].get("Name", {}).get("title", []))
+            if title in wanted and title not in existing:
+                existing[title] = page
+        return existing
+
+
+class NotionAPI(NotionBase):
+    def __init__(self, limiter: Optional[NotionRateLimiter] = None):
+        """
+        Initialize the Notion API client.
+
+        Args:
+            limiter: Rate limiter for all requests (default: the process-wide one)
         """
-        if len(text) <= max_length:
-            return text
-        return text[:max_length-3] + "..."
+        load_dotenv()
+        self.client = Client(**self._client_options())
+        self.limiter = limiter or get_shared_limiter()
 
+    @traced("notion.create_database")
     def create_database(self, title: str, properties: Dict) -> str:
         """
         Create a new database in Notion.
@@ -46,90 +282,213 @@ class NotionAPI:
             str: The ID of the created database
         """
         try:
-            response = self.client.databases.create(
+            response = self.limiter.call(
+                self.client.databases.create,
                 parent={"type": "page_id", "page_id": os.getenv("NOTION_PAGE_ID")},
                 title=[{"type": "text", "text": {"content": title}}],
-                properties=properties
+                properties=properties,
+                idempotent=False
             )
             return response["id"]
         except Exception as e:
             print(f"Error creating database: {e}")
             return None
 
-    def create_page(self, database_id: str, properties: Dict) -> str:
+    @traced("notion.create_page")
+    def create_page(self, database_id: str, properties: Dict, children: Optional[List[Dict]] = None) -> str:
         """
         Create a new page in a Notion database.
 
         Args:
             database_id: The ID of the database
             properties: Dictionary of page properties
+            children: Body blocks; the first 100 are sent with the page and
+                the rest appended in batches
 
         Returns:
-            str: The ID of the created page
+            str: The ID of the created page (None if it could not be created;
+                a page whose body could not be written in full is archived)
         """
         try:
-            # Truncate text content if it exists
-            for prop_name, prop_value in properties.items():
-                if isinstance(prop_value, dict) and "rich_text" in prop_value:
-                    for text_block in prop_value["rich_text"]:
-                        if "text" in text_block and "content" in text_block["text"]:
-                            text_block["text"]["content"] = self._truncate_text(text_block["text"]["content"])
-                elif isinstance(prop_value, dict) and "title" in prop_value:
-                    for title_block in prop_value["title"]:
-                        if "text" in title_block and "content" in title_block["text"]:
-                            title_block["text"]["content"] = self._truncate_text(title_block["text"]["content"])
-
-            response = self.client.pages.create(
+            kwargs = {"children": children[:MAX_BLOCKS_PER_REQUEST]} if children else {}
+            response = self.limiter.call(
+                self.client.pages.create,
                 parent={"database_id": database_id},
-                properties=properties
+                properties=self._prepare_properties(properties),
+                **kwargs,
+                idempotent=False
             )
-            return response["id"]
         except Exception as e:
             print(f"Error creating page: {e}")
             return None
 
-    def update_page(self, page_id: str, properties: Dict) -> bool:
+        if children and not self.append_blocks(response["id"], children[MAX_BLOCKS_PER_REQUEST:]):
+            # Leave no truncated page behind for a retry to duplicate
+            self._archive_page(response["id"])
+            return None
+        return response["id"]
+
+    def _archive_page(self, page_id: str) -> bool:
+        """
+        Archive a page whose body could not be written in full.
+
+        Args:
+            page_id: The ID of the page
+
+        Returns:
+            bool: True if the page was archived
+        """
+        try:
+            self.limiter.call(self.client.pages.update, page_id=page_id, archived=True)
+            return True
+        except Exception as e:
+            print(f"Error archiving incomplete page {page_id}: {e}")
+            return False
+
+    @traced("notion.append_blocks")
+    def append_blocks(self, block_id: str, blocks: List[Dict]) -> bool:
+        """
+        Append blocks to a page or block, 100 per request.
+
+        Args:
+            block_id: The ID of the page or block to append to
+            blocks: The blocks to append, in order
+
+        Returns:
+            bool: True if every block was appended, False otherwise
+        """
+        try:
+            for start in range(0, len(blocks), MAX_BLOCKS_PER_REQUEST):
+                self.limiter.call(
+                    self.client.blocks.children.append,
+                    block_id=block_id,
+                    children=blocks[start:start + MAX_BLOCKS_PER_REQUEST],
+                    idempotent=False
+                )
+            return True
+        except Exception as e:
+            print(f"Error appending blocks: {e}")
+            return False
+
+    @traced("notion.save_learning_material")
+    def save_learning_material(self, title: str, summary: str, questions: List[Dict],
+                               due_date: Optional[str] = None) -> Optional[str]:
+        """
+        Save a summary and its review questions as a Summary task page.
+
+        The summary and questions go into the page body in full, in as few
+        requests as the block limits allow.
+
+        Args:
+            title: The title of the page
+            summary: The summary text
+            questions: Dicts with "question" and "answer"
+            due_date: When to review the material (default: in a week)
+
+        Returns:
+            Optional[str]: The ID of the created page, or None on failure
+        """
+        due_date = due_date or (datetime.now().date() + timedelta(days=7)).isoformat()
+        properties = self._task_properties(title, due_date, 0, "Summary")
+        return self.create_page(
+            os.getenv("TASKS_DATABASE_ID"), properties, self._material_blocks(summary, questions)
+        )
+
+    @traced("notion.update_page")
+    def update_page(self, page_id: str, properties: Dict, raise_errors: bool = False) -> bool:
         """
         Update an existing page in Notion.
 
         Args:
             page_id: The ID of the page to update
             properties: Dictionary of updated properties
+            raise_errors: Raise the API error instead of reporting it and returning False
 
         Returns:
             bool: True if successful, False otherwise
+
+        Raises:
+            Exception: The error from the Notion API, if raise_errors is set
         """
         try:
-            self.client.pages.update(
+            self.limiter.call(
+                self.client.pages.update,
                 page_id=page_id,
                 properties=properties
             )
             return True
         except Exception as e:
+            if raise_errors:
+                raise
             print(f"Error updating page: {e}")
             return False
 
-    def query_database(self, database_id: str, filter_params: Optional[Dict] = None) -> List[Dict]:
+    def iter_database(self, database_id: str, filter_params: Optional[Dict] = None,
+                      page_size: int = 100, prefetch: bool = False) -> Iterator[Dict]:
+        """
+        Stream every page of a database query, following pagination cursors.
+
+        Args:
+            database_id: The ID of the database to query
+            filter_params: Optional filter parameters
+            page_size: Results per request (Notion allows at most 100)
+            prefetch: Fetch the next batch in the background while the
+                current one is being consumed
+
+        Yields:
+            Dict: One page at a time
+
+        Raises:
+            Exception: Any error from the Notion API, after retries
+        """
+        def fetch(cursor: Optional[str]) -> Dict:
+            kwargs = {"database_id": database_id, "page_size": page_size}
+            if filter_params is not None:
+                # Notion rejects an explicit null filter
+                kwargs["filter"] = filter_params
+            if cursor:
+                kwargs["start_cursor"] = cursor
+            return self.limiter.call(self.client.databases.query, **kwargs)
+
+        executor = ThreadPoolExecutor(max_workers=1) if prefetch else None
+        try:
+            response = fetch(None)
+            while True:
+                has_more = response.get("has_more") and response.get("next_cursor")
+                next_response = None
+                if has_more and executor:
+                    next_response = executor.submit(fetch, response["next_cursor"])
+
+                yield from response["results"]
+
+                if not has_more:
+                    break
+                response = next_response.result() if next_response else fetch(response["next_cursor"])
+        finally:
+            if executor:
+                executor.shutdown(wait=False, cancel_futures=True)
+
+    @traced("notion.query_database")
+    def query_database(self, database_id: str, filter_params: Optional[Dict] = None,
+                       page_size: int = 100) -> List[Dict]:
         """
         Query a Notion database.
 
         Args:
             database_id: The ID of the database to query
             filter_params: Optional filter parameters
+            page_size: Results per request (Notion allows at most 100)
 
         Returns:
-            List[Dict]: List of pages matching the query
+            List[Dict]: List of all pages matching the query
         """
         try:
-            response = self.client.databases.query(
-                database_id=database_id,
-                filter=filter_params
-            )
-            return response["results"]
+            return list(self.iter_database(database_id, filter_params, page_size))
         except Exception as e:
             print(f"Error querying database: {e}")
             return []
 
+    @traced("notion.create_task")
     def create_task(self, title: str, due_date: str, progress: int = 0) -> str:
         """
         Create a new task in the tasks database.
@@ -142,20 +501,69 @@ class NotionAPI:
         Returns:
             str: The ID of the created task
         """
-        properties = {
-            "Name": {"title": [{"text": {"content": title}}]},
-            "Due Date": {"date": {"start": due_date}},
-            "Progress": {"number": progress}
-        }
+        properties = self._task_properties(title, due_date, progress)
         return self.create_page(os.getenv("TASKS_DATABASE_ID"), properties)
 
-    def update_progress(self, page_id: str, progress: int) -> bool:
+    def rate_limit_metrics(self) -> Dict:
+        """
+        Get throttle and retry counters for this client's rate limiter.
+
+        Returns:
+            Dict: Limiter metrics (shared by all clients using the same limiter)
+        """
+        return self.limiter.metrics()
+
+    @traced("notion.create_tasks_bulk")
+    def create_tasks_bulk(self, tasks: List[Dict], max_concurrency: Optional[int] = None) -> List[BulkResult]:
+        """
+        Create several tasks concurrently.
+
+        Runs AsyncNotionAPI.create_tasks_bulk on a private event loop, so it
+        must not be called from inside a running event loop.
+
+        Args:
+            tasks: List of dicts as for AsyncNotionAPI.create_tasks_bulk
+            max_concurrency: Maximum requests in flight (default: NOTION_MAX_CONCURRENCY)
+
+        Returns:
+            List[BulkResult]: One result per task, in input order
+        """
+        async def run() -> List[BulkResult]:
+            async with AsyncNotionAPI(max_concurrency, self.limiter) as api:
+                return await api.create_tasks_bulk(tasks)
+
+        return asyncio.run(run())
+
+    @traced("notion.upsert_tasks")
+    def upsert_tasks(self, tasks: List[Dict], max_concurrency: Optional[int] = None) -> List[BulkResult]:
+        """
+        Create tasks that do not exist yet and bring the due date of the rest up to date.
+
+        Runs AsyncNotionAPI.upsert_tasks on a private event loop, so it
+        must not be called from inside a running event loop.
+
+        Args:
+            tasks: List of dicts as for AsyncNotionAPI.upsert_tasks
+            max_concurrency: Maximum requests in flight (default: NOTION_MAX_CONCURRENCY)
+
+        Returns:
+            List[BulkResult]: One result per task, in input order
+        """
+        async def run() -> List[BulkResult]:
+            async with AsyncNotionAPI(max_concurrency, self.limiter) as api:
+                return await api.upsert_tasks(tasks)
+
+        return asyncio.run(run())
+
+    @traced("notion.update_progress")
+    def update_progress(self, page_id: str, progress: int, raise_errors: bool = False) -> bool:
         """
         Update the progress of a task.
 
         Args:
             page_id: The ID of the task page
             progress: The new progress percentage (0-100)
+            raise_errors: Raise the API error instead of reporting it and returning False
 
         Returns:
             bool: True if successful, False otherwise
@@ -163,4 +571,377 @@ class NotionAPI:
         properties = {
             "Progress": {"number": progress}
         }
-        return self.update_page(page_id, properties)
\ No newline at end of file
+        return self.update_page(page_id, properties, raise_errors)
+
+
+class AsyncNotionAPI(NotionBase):
+    def __init__(self, max_concurrency: Optional[int] = None, limiter: Optional[NotionRateLimiter] = None):
+        """
+        Initialize the async Notion API client.
+
+        Args:
+            max_concurrency: Maximum requests in flight for bulk operations
+                (default: NOTION_MAX_CONCURRENCY, or 3)
+            limiter: Rate limiter for all requests (default: the process-wide one)
+        """
+        load_dotenv()
+        self.client = AsyncClient(**self._client_options())
+        self.limiter = limiter or get_shared_limiter()
+        self.max_concurrency = max_concurrency or int(os.getenv("NOTION_MAX_CONCURRENCY", "3"))
+
+    async def __aenter__(self) -> "AsyncNotionAPI":
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        """Close the underlying HTTP connection pool."""
+        await self.client.aclose()
+
+    @traced("notion.create_page")
+    async def create_page(self, database_id: str, properties: Dict, children: Optional[List[Dict]] = None) -> str:
+        """
+        Create a new page in a Notion database.
+
+        Args:
+            database_id: The ID of the database
+            properties: Dictionary of page properties
+            children: Body blocks; the first 100 are sent with the page and
+                the rest appended in batches
+
+        Returns:
+            str: The ID of the created page (None if it could not be created;
+                a page whose body could not be written in full is archived)
+        """
+        try:
+            kwargs = {"children": children[:MAX_BLOCKS_PER_REQUEST]} if children else {}
+            response = await self.limiter.call_async(
+                self.client.pages.create,
+                parent={"database_id": database_id},
+                properties=self._prepare_properties(properties),
+                **kwargs,
+                idempotent=False
+            )
+        except Exception as e:
+            print(f"Error creating page: {e}")
+            return None
+
+        if children and not await self.append_blocks(response["id"], children[MAX_BLOCKS_PER_REQUEST:]):
+            # Leave no truncated page behind for a retry to duplicate
+            await self._archive_page(response["id"])
+            return None
+        return response["id"]
+
+    async def _archive_page(self, page_id: str) -> bool:
+        """
+        Archive a page whose body could not be written in full.
+
+        Args:
+            page_id: The ID of the page
+
+        Returns:
+            bool: True if the page was archived
+        """
+        try:
+            await self.limiter.call_async(self.client.pages.update, page_id=page_id, archived=True)
+            return True
+        except Exception as e:
+            print(f"Error archiving incomplete page {page_id}: {e}")
+            return False
+
+    @traced("notion.append_blocks")
+    async def append_blocks(self, block_id: str, blocks: List[Dict]) -> bool:
+        """
+        Append blocks to a page or block, 100 per request.
+
+        Batches go out one after another to keep the blocks in order.
+
+        Args:
+            block_id: The ID of the page or block to append to
+            blocks: The blocks to append, in order
+
+        Returns:
+            bool: True if every block was appended, False otherwise
+        """
+        try:
+            for start in range(0, len(blocks), MAX_BLOCKS_PER_REQUEST):
+                await self.limiter.call_async(
+                    self.client.blocks.children.append,
+                    block_id=block_id,
+                    children=blocks[start:start + MAX_BLOCKS_PER_REQUEST],
+                    idempotent=False
+                )
+            return True
+        except Exception as e:
+            print(f"Error appending blocks: {e}")
+            return False
+
+    @traced("notion.replace_page_body")
+    async def replace_page_body(self, page_id: str, blocks: List[Dict]) -> bool:
+        """
+        Replace the body of a page: delete its blocks, then append the new ones.
+
+        Args:
+            page_id: The ID of the page
+            blocks: The new body blocks, in order
+
+        Returns:
+            bool: True if the whole new body was written, False otherwise
+                (the page may then hold part of it; replacing again fixes it)
+        """
+        try:
+            old_ids, cursor = [], None
+            while True:
+                kwargs = {"start_cursor": cursor} if cursor else {}
+                response = await self.limiter.call_async(
+                    self.client.blocks.children.list, block_id=page_id, page_size=100, **kwargs
+                )
+                old_ids.extend(block["id"] for block in response["results"])
+                if not response.get("has_more"):
+                    break
+                cursor = response["next_cursor"]
+            for block_id in old_ids:
+                await self.limiter.call_async(self.client.blocks.delete, block_id=block_id)
+        except Exception as e:
+            print(f"Error clearing page {page_id}: {e}")
+            return False
+        return await self.append_blocks(page_id, blocks)
+
+    @traced("notion.update_page")
+    async def update_page(self, page_id: str, properties: Dict) -> bool:
+        """
+        Update an existing page in Notion.
+
+        Args:
+            page_id: The ID of the page to update
+            properties: Dictionary of updated properties
+
+        Returns:
+            bool: True if successful, False otherwise
+        """
+        try:
+            await self.limiter.call_async(
+                self.client.pages.update,
+                page_id=page_id,
+                properties=properties
+            )
+            return True
+        except Exception as e:
+            print(f"Error updating page: {e}")
+            return False
+
+    async def iter_database(self, database_id: str, filter_params: Optional[Dict] = None,
+                            page_size: int = 100, prefetch: bool = False) -> AsyncIterator[Dict]:
+        """
+        Stream every page of a database query, following pagination cursors.
+
+        Args:
+            database_id: The ID of the database to query
+            filter_params: Optional filter parameters
+            page_size: Results per request (Notion allows at most 100)
+            prefetch: Fetch the next batch while the current one is being consumed
+
+        Yields:
+            Dict: One page at a time
+
+        Raises:
+            Exception: Any error from the Notion API, after retries
+        """
+        async def fetch(cursor: Optional[str]) -> Dict:
+            kwargs = {"database_id": database_id, "page_size": page_size}
+            if filter_params is not None:
+                # Notion rejects an explicit null filter
+                kwargs["filter"] = filter_params
+            if cursor:
+                kwargs["start_cursor"] = cursor
+            return await self.limiter.call_async(self.client.databases.query, **kwargs)
+
+        response = await fetch(None)
+        next_response = None
+        try:
+            while True:
+                has_more = response.get("has_more") and response.get("next_cursor")
+                if has_more and prefetch:
+                    next_response = asyncio.ensure_future(fetch(response["next_cursor"]))
+
+                for page in response["results"]:
+                    yield page
+
+                if not has_more:
+                    break
+                response = await next_response if next_response else await fetch(response["next_cursor"])
+                next_response = None
+        finally:
+            if next_response and not next_response.done():
+                next_response.cancel()
+
+    @traced("notion.query_database")
+    async def query_database(self, database_id: str, filter_params: Optional[Dict] = None,
+                             page_size: int = 100) -> List[Dict]:
+        """
+        Query a Notion database.
+
+        Args:
+            database_id: The ID of the database to query
+            filter_params: Optional filter parameters
+            page_size: Results per request (Notion allows at most 100)
+
+        Returns:
+            List[Dict]: List of all pages matching the query
+        """
+        try:
+            return [page async for page in self.iter_database(database_id, filter_params, page_size)]
+        except Exception as e:
+            print(f"Error querying database: {e}")
+            return []
+
+    @traced("notion.create_pages_bulk")
+    async def create_pages_bulk(self, database_id: str, properties_list: List[Dict],
+                                max_concurrency: Optional[int] = None,
+                                children_list: Optional[List[Optional[List[Dict]]]] = None) -> List[BulkResult]:
+        """
+        Create many pages concurrently under a concurrency limit.
+
+        Args:
+            database_id: The ID of the database
+            properties_list: Properties of each page to create
+            max_concurrency: Maximum requests in flight (default: self.max_concurrency)
+            children_list: Body blocks of each page (None or an empty list for
+                none); blocks past the first 100 are appended in batches
+
+        Returns:
+            List[BulkResult]: One result per page, in input order; failed
+                items carry the error instead of a page ID
+        """
+        semaphore = asyncio.Semaphore(max_concurrency or self.max_concurrency)
+
+        children_list = children_list or [None] * len(properties_list)
+
+        async def create_one(index: int, properties: Dict, children: Optional[List[Dict]]) -> BulkResult:
+            async with semaphore:
+                try:
+                    kwargs = {"children": children[:MAX_BLOCKS_PER_REQUEST]} if children else {}
+                    response = await self.limiter.call_async(
+                        self.client.pages.create,
+                        parent={"database_id": database_id},
+                        properties=self._prepare_properties(properties),
+                        **kwargs,
+                        idempotent=False
+                    )
+                except Exception as e:
+                    return BulkResult(index=index, error=str(e))
+
+                # Bodies over the per-request block limit are appended in batches
+                if children and not await self.append_blocks(response["id"], children[MAX_BLOCKS_PER_REQUEST:]):
+                    # Archive the truncated page so a retry (or upsert) does not reuse it
+                    await self._archive_page(response["id"])
+                    return BulkResult(index=index, error="Could not write the full page body")
+                return BulkResult(index=index, page_id=response["id"])
+
+        return list(await asyncio.gather(
+            *(create_one(index, properties, children)
+              for index, (properties, children) in enumerate(zip(properties_list, children_list)))
+        ))
+
+    @traced("notion.create_tasks_bulk")
+    async def create_tasks_bulk(self, tasks: List[Dict], max_concurrency: Optional[int] = None) -> List[BulkResult]:
+        """
+        Create many tasks in the tasks database concurrently.
+
+        Args:
+            tasks: List of dicts with "title", "due_date" and optional
+                "progress", "type" ("Summary" or "Question Set") and
+                "body" (paragraphs of page text)
+            max_concurrency: Maximum requests in flight (default: self.max_concurrency)
+
+        Returns:
+            List[BulkResult]: One result per task, in input order
+        """
+        properties_list = [
+            self._task_properties(task["title"], task["due_date"], task.get("progress", 0), task.get("type"))
+            for task in tasks
+        ]
+        return await self.create_pages_bulk(
+            os.getenv("TASKS_DATABASE_ID"), properties_list, max_concurrency,
+            [self._paragraph_blocks(task.get("body", [])) for task in tasks]
+        )
+
+    @traced("notion.upsert_tasks")
+    async def upsert_tasks(self, tasks: List[Dict], max_concurrency: Optional[int] = None) -> List[BulkResult]:
+        """
+        Create tasks that do not exist yet and bring the due date of the rest up to date.
+
+        A task's title is its key: existing pages are found with one
+        batched title query (per 100 titles). Missing tasks are created in
+        bulk; existing ones only get their Due Date updated, and only when
+        it differs, so their progress is never reset. Running the same
+        schedule twice makes no writes.
+
+        Args:
+            tasks: List of dicts as for create_tasks_bulk; tasks with the
+                same title are created once. An existing task whose dict
+                sets "replace_body" also gets its page body replaced
+            max_concurrency: Maximum requests in flight (default: self.max_concurrency)
+
+        Returns:
+            List[BulkResult]: One result per task, in input order, carrying
+                the ID of the created or existing page
+        """
+        database_id = os.getenv("TASKS_DATABASE_ID")
+        titles = list(dict.fromkeys(task["title"] for task in tasks))
+
+        # A failed lookup must not fall through to creating duplicates
+        try:
+            pages = []
+            for start in range(0, len(titles), 100):
+                title_filter = self._title_filter(titles[start:start + 100])
+                pages.extend([page async for page in self.iter_database(database_id, title_filter)])
+        except Exception as e:
+            return [BulkResult(index=index, error=f"Error looking up existing tasks: {e}") for index in range(len(tasks))]
+        existing = self._index_by_title(pages, titles)
+
+        results: List[Optional[BulkResult]] = [None] * len(tasks)
+        first_index = {}
+        to_create, to_update = [], []
+        for index, task in enumerate(tasks):
+            if task["title"] in first_index:
+                continue
+            first_index[task["title"]] = index
+            page = existing.get(task["title"])
+            if page is None:
+                to_create.append(index)
+                continue
+            results[index] = BulkResult(index=index, page_id=page["id"])
+            due = (page["properties"].get("Due Date", {}).get("date") or {}).get("start")
+            if not _same_due_date(due, task["due_date"]) or task.get("replace_body"):
+                to_update.append(index)
+
+        if to_create:
+            created = await self.create_tasks_bulk([tasks[index] for index in to_create], max_concurrency)
+            for index, result in zip(to_create, created):
+                results[index] = BulkResult(index=index, page_id=result.page_id, error=result.error)
+
+        if to_update:
+            semaphore = asyncio.Semaphore(max_concurrency or self.max_concurrency)
+
+            async def update_task(index: int) -> None:
+                task = tasks[index]
+                async with semaphore:
+                    page_id = results[index].page_id
+                    due = (existing[task["title"]]["properties"].get("Due Date", {}).get("date") or {}).get("start")
+                    if (not _same_due_date(due, task["due_date"])
+                            and not await self.update_page(page_id, {"Due Date": {"date": {"start": task["due_date"]}}})):
+                        results[index] = BulkResult(index=index, page_id=page_id, error="Could not update the due date")
+                    elif (task.get("replace_body")
+                          and not await self.replace_page_body(page_id, self._paragraph_blocks(task.get("body", [])))):
+                        results[index] = BulkResult(index=index, page_id=page_id, error="Could not replace the page body")
+
+            await asyncio.gather(*(update_task(index) for index in to_update))
+
+        # Repeated titles share the result of their first occurrence
+        for index, task in enumerate(tasks):
+            if results[index] is None:
+                first = results[first_index[task["title"]]]
+                results[index] = BulkResult(index=index, page_id=first.page_id, error=first.error)
+        return results
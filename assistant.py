@@ -1,44 +1,80 @@
 import streamlit as st
 import os
+import time
 from datetime import datetime, timedelta
-from typing import Dict, List
+from typing import Dict, List, Optional
 from api_interactions import NotionAPI
-from summaries import SummaryGenerator
+from confirmation import StreamlitConfirmer
+from summaries import ProgressCallback, SummaryGenerator
 from questions import QuestionGenerator
 from progress_tracker import ProgressTracker
+from model_registry import registry
+from result_cache import get_default_cache
+import instrumentation
+from instrumentation import traced
+from jobs import CANCELLED, DONE, FAILED, PENDING, JobRunner
+from pipeline import SUMMARY_TOO_LONG, generate_material, use_hierarchical
+from runtime_config import apply_torch_threads, load_runtime_config, share_cores_with_pool
+
+# Number of weeks shown in progress history and used to adapt difficulty
+RECENT_WEEKS = 8
 
 class LearningAssistant:
     def __init__(self):
-        """Initialize the learning assistant with all necessary components."""
+        """Initialize the learning assistant; the generators load their models on first use."""
         self.notion_api = NotionAPI()
-        self.summary_generator = SummaryGenerator()
-        self.question_generator = QuestionGenerator()
         self.progress_tracker = ProgressTracker()
+        self._summary_generator: Optional[SummaryGenerator] = None
+        self._question_generator: Optional[QuestionGenerator] = None
+
+    @property
+    def summary_generator(self) -> SummaryGenerator:
+        """The summary generator, created (and its model loaded) on first access."""
+        if self._summary_generator is None:
+            self._summary_generator = SummaryGenerator()
+        return self._summary_generator
 
-    def process_learning_material(self, content: str) -> Dict:
+    @property
+    def question_generator(self) -> QuestionGenerator:
+        """The question generator, created (and its model loaded) on first access."""
+        if self._question_generator is None:
+            self._question_generator = QuestionGenerator()
+        return self._question_generator
+
+    @traced("assistant.process_learning_material")
+    def process_learning_material(self, content: str, progress_callback: Optional[ProgressCallback] = None) -> Dict:
         """
         Process learning material to generate summary and questions.
 
         Args:
             content: The learning material to process
+            progress_callback: Called as (level, completed, total) while the
+                material is summarized
 
         Returns:
             Dict: Generated summary and questions
         """
-        # Generate summary
-        summary, is_valid = self.summary_generator.generate_summary(content)
+        # Generate summary; book-length material is reduced in a tree
+        summary, is_valid = self.summary_generator.generate_summary(
+            content,
+            hierarchical=use_hierarchical(content),
+            progress_callback=progress_callback
+        )
         if not is_valid:
-            st.warning("Generated summary exceeds word limit. Please try with shorter content.")
+            st.warning(SUMMARY_TOO_LONG)
             return None
 
-        # Confirm summary
-        if not self.summary_generator.confirm_summary(summary):
+        # Confirm summary; under Streamlit the answer may still be pending
+        confirmed = self.summary_generator.confirm_summary(summary)
+        if confirmed is None:
+            return None
+        if not confirmed:
             st.info("Summary rejected. Please try again with different content.")
             return None
 
         # Generate questions
         questions = self.question_generator.generate_questions(summary)
-        validated_questions = self.question_generator.validate_questions(questions)
+        validated_questions = self.question_generator.validate_questions(questions, summary)
 
         return {
             "summary": summary,
@@ -47,43 +83,152 @@ class LearningAssistant:
 
     def create_weekly_tasks(self, week_number: int, difficulty: Dict) -> List[str]:
         """
-        Create weekly learning tasks.
+        Create weekly learning tasks, or bring existing ones up to date.
+
+        Tasks are keyed by title, so scheduling the same week again reuses
+        its pages (keeping their progress) instead of duplicating them.
 
         Args:
             week_number: The week number
             difficulty: Difficulty parameters
 
         Returns:
-            List[str]: List of created task IDs
+            List[str]: List of task IDs (failed tasks are reported and skipped)
         """
-        task_ids = []
-        start_date = datetime.now() + timedelta(days=7 * (week_number - 1))
+        # Due dates are whole days, so re-running on the same day changes nothing
+        start_date = datetime.now().date() + timedelta(days=7 * (week_number - 1))
 
-        # Create summary task
-        summary_task_id = self.notion_api.create_task(
-            title=f"Week {week_number} Summary",
-            due_date=(start_date + timedelta(days=2)).isoformat(),
-            progress=0
-        )
-        task_ids.append(summary_task_id)
-
-        # Create question tasks
+        # Summary task followed by the question tasks
+        tasks = [{
+            "title": f"Week {week_number} Summary",
+            "due_date": (start_date + timedelta(days=2)).isoformat(),
+            "progress": 0
+        }]
         for i in range(difficulty["tasks_per_week"]):
-            question_task_id = self.notion_api.create_task(
-                title=f"Week {week_number} Question Set {i+1}",
-                due_date=(start_date + timedelta(days=3+i)).isoformat(),
-                progress=0
-            )
-            task_ids.append(question_task_id)
+            tasks.append({
+                "title": f"Week {week_number} Question Set {i+1}",
+                "due_date": (start_date + timedelta(days=3+i)).isoformat(),
+                "progress": 0
+            })
+
+        # Create missing pages concurrently; report each failure by task
+        task_ids = []
+        for task, result in zip(tasks, self.notion_api.upsert_tasks(tasks)):
+            if result.ok:
+                task_ids.append(result.page_id)
+            else:
+                print(f"Error creating task '{task['title']}': {result.error}")
 
         return task_ids
 
+def stream_summary(assistant: LearningAssistant, content: str) -> Optional[str]:
+    """
+    Summarize material, rendering the summary as it is decoded.
+
+    Args:
+        assistant: The learning assistant
+        content: The learning material to process
+
+    Returns:
+        Optional[str]: The summary, or None if none was produced
+    """
+    if len(content.split()) < 10:
+        st.warning("Input text is too short for summarization. Please provide more content.")
+        return None
+
+    st.subheader("Generated Summary")
+    summary_box = st.empty()
+    summary = ""
+    for piece in assistant.summary_generator.stream_summary(content):
+        summary += piece
+        summary_box.write(summary)
+
+    if not summary:
+        st.warning("Could not generate a summary. Please try again.")
+        return None
+    if len(summary.split()) > 200:
+        st.warning(SUMMARY_TOO_LONG)
+        return None
+    return summary
+
+def stream_questions(assistant: LearningAssistant, summary: str) -> List[Dict]:
+    """
+    Generate review questions, rendering each answer as it is decoded.
+
+    Args:
+        assistant: The learning assistant
+        summary: The confirmed summary
+
+    Returns:
+        List[Dict]: The validated questions
+    """
+    st.subheader("Review Questions")
+    boxes = {}
+    questions = []
+    for update in assistant.question_generator.stream_questions(summary):
+        box = boxes.setdefault(update["index"], st.empty())
+        if not update["done"]:
+            box.markdown(f"**Q.** {update['question']}\n\n{update['answer']}")
+        elif update["valid"]:
+            questions.append({"question": update["question"], "answer": update["answer"]})
+            with box.container():
+                render_question(len(questions), questions[-1])
+        else:
+            # Drop questions that fail validation, as the batch path does
+            box.empty()
+    return questions
+
+def render_question(number: int, qa: Dict) -> None:
+    """Show a question with its answer in an expander."""
+    st.write(f"Q{number}. {qa['question']}")
+    with st.expander(f"Answer {number}"):
+        st.write(qa["answer"])
+
+def render_questions(questions: List[Dict]) -> None:
+    """Show the review questions section."""
+    st.subheader("Review Questions")
+    for i, qa in enumerate(questions, 1):
+        render_question(i, qa)
+
+def save_to_notion(assistant: LearningAssistant, summary: str, questions: List[Dict]) -> None:
+    """Offer to save a confirmed summary and its questions as a Notion page."""
+    saved = st.session_state.setdefault("saved_pages", {})
+    if summary in saved:
+        st.success("Saved to Notion.")
+        return
+
+    title = st.text_input("Page title", value=f"Learning Material {datetime.now():%Y-%m-%d}")
+    if st.button("Save to Notion"):
+        with st.spinner("Saving to Notion..."):
+            page_id = assistant.notion_api.save_learning_material(title, summary, questions)
+        if page_id:
+            saved[summary] = page_id
+            st.success("Saved to Notion.")
+        else:
+            st.error("Could not save to Notion. Please try again.")
+
+@st.cache_resource
+def get_job_runner() -> JobRunner:
+    """Create the worker pool once per server process, shared by all sessions."""
+    # Worker count and threads per worker follow INFERENCE_LAYOUT and friends;
+    # streaming in this process keeps to its own share of the cores
+    share_cores_with_pool()
+    config = load_runtime_config()
+    return JobRunner(
+        max_workers=config.workers,
+        initializer=apply_torch_threads,
+        initargs=(config.threads_per_worker, config.interop_threads)
+    )
+
 def main():
     st.title("Learning Assistant")
 
     # Initialize the assistant
     assistant = LearningAssistant()
 
+    # Get current week number
+    current_week = (datetime.now() - datetime(2024, 1, 1)).days // 7 + 1
+
     # Sidebar for navigation
     st.sidebar.title("Navigation")
     page = st.sidebar.radio("Go to", ["Process Material", "View Progress", "Settings"])
@@ -94,30 +239,106 @@ def main():
         # Input for learning material
         content = st.text_area("Enter your learning material:", height=200)
 
+        runner = get_job_runner()
+        stream = st.checkbox("Stream output", help="Show the summary and answers as they are written")
         if st.button("Process"):
-            if content:
-                with st.spinner("Processing..."):
-                    result = assistant.process_learning_material(content)
-                    if result:
-                        st.subheader("Generated Summary")
-                        st.write(result["summary"])
-
-                        st.subheader("Review Questions")
-                        for i, qa in enumerate(result["questions"], 1):
-                            st.write(f"Q{i}. {qa['question']}")
-                            with st.expander(f"Answer {i}"):
-                                st.write(qa["answer"])
+            if content and stream and not use_hierarchical(content):
+                # Generate in this session so every token can be shown as it arrives;
+                # book-length material still goes to a worker
+                st.session_state.pop("job_id", None)
+                st.session_state.pop("job_result", None)
+                st.session_state.pop("streamed", None)
+                summary = stream_summary(assistant, content)
+                if summary:
+                    st.session_state["streamed"] = {"summary": summary, "rendered": True}
+            elif content:
+                # Run the models in a worker process so this session stays responsive
+                try:
+                    st.session_state.pop("streamed", None)
+                    st.session_state.pop("job_result", None)
+                    st.session_state["job_id"] = runner.submit(generate_material, content, report_progress=True)
+                except RuntimeError as e:
+                    st.warning(str(e))
             else:
                 st.warning("Please enter some learning material.")
 
+        confirmer = StreamlitConfirmer()
+        streamed = st.session_state.get("streamed")
+        if streamed:
+            # Summary streamed in this session; questions follow confirmation
+            if not streamed.pop("rendered", False):
+                st.subheader("Generated Summary")
+                st.write(streamed["summary"])
+            confirmed = confirmer.confirm_summary(streamed["summary"])
+            if confirmed and "questions" not in streamed:
+                streamed["questions"] = stream_questions(assistant, streamed["summary"])
+            elif confirmed:
+                render_questions(streamed["questions"])
+            if confirmed:
+                save_to_notion(assistant, streamed["summary"], streamed["questions"])
+            elif confirmed is False:
+                st.info("Summary rejected. Please try again with different content.")
+
+        job_id = st.session_state.get("job_id")
+        if job_id:
+            status = runner.status(job_id)
+            if status in (DONE, FAILED, CANCELLED):
+                # Keep the outcome in the session and release the job's bookkeeping
+                if status == DONE:
+                    outcome = runner.result(job_id)
+                    # Fold the worker's timings into this process's metrics
+                    instrumentation.merge(outcome.pop("metrics", None))
+                elif status == FAILED:
+                    outcome = {"failed": runner.error(job_id)}
+                else:
+                    outcome = {"cancelled": True}
+                runner.forget(job_id)
+                st.session_state.pop("job_id", None)
+                st.session_state["job_result"] = outcome
+            else:
+                message = "Waiting for a free worker..." if status == PENDING else "Processing..."
+                progress = runner.progress(job_id)
+                if progress:
+                    level, completed, total = progress
+                    stage = "Summarizing chunks" if level == 0 else f"Reduce level {level}"
+                    message += f" {stage}: {completed}" + (f"/{total}" if total else "")
+                st.info(message)
+
+                if st.button("Cancel"):
+                    runner.cancel(job_id)
+                    st.rerun()
+
+                # Poll until the job finishes
+                time.sleep(1)
+                st.rerun()
+
+        result = st.session_state.get("job_result")
+        if result:
+            if "failed" in result:
+                st.error(f"Processing failed: {result['failed']}")
+            elif "cancelled" in result:
+                st.info("Processing cancelled.")
+            elif "error" in result:
+                st.warning(result["error"])
+            else:
+                st.subheader("Generated Summary")
+                st.write(result["summary"])
+
+                # Questions are ready, but only shown for a confirmed summary
+                confirmed = confirmer.confirm_summary(result["summary"])
+                if confirmed:
+                    render_questions(result["questions"])
+                    save_to_notion(assistant, result["summary"], result["questions"])
+                elif confirmed is False:
+                    st.info("Summary rejected. Please try again with different content.")
+
     elif page == "View Progress":
         st.header("Learning Progress")
 
-        # Get current week number
-        current_week = (datetime.now() - datetime(2024, 1, 1)).days // 7 + 1
-
-        # Display weekly progress
-        progress = assistant.progress_tracker.get_weekly_progress(current_week)
+        # Display weekly progress; statistics come from the local task mirror
+        force_refresh = st.button("Refresh from Notion")
+        # Week numbers count back from the current week, which is week 1
+        progress = assistant.progress_tracker.get_weekly_progress(1, force_refresh=force_refresh)
 
         st.subheader(f"Week {current_week} Progress")
         st.write(f"Total Tasks: {progress['total_tasks']}")
@@ -128,23 +349,82 @@ def main():
         # Progress bar
         st.progress(progress['completion_rate'] / 100)
 
+        # Recent weeks, computed from a single sweep over the task mirror
+        st.subheader("Recent Weeks")
+        history = assistant.progress_tracker.get_progress_range(1, RECENT_WEEKS)
+        # Week 1 is the current week, so reverse to plot oldest first
+        st.line_chart({
+            "Completion Rate": history["completion_rate"][::-1],
+            "Average Progress": history["average_progress"][::-1]
+        })
+
     else:  # Settings
         st.header("Settings")
 
-        # Display current difficulty settings
+        # Display current difficulty settings, based on recent performance
         st.subheader("Current Difficulty Settings")
-        difficulty = assistant.progress_tracker.adjust_difficulty({
-            "completion_rate": 70  # Example value
-        })
+        history = assistant.progress_tracker.get_progress_range(1, RECENT_WEEKS)
+        difficulty = assistant.progress_tracker.adjust_difficulty(
+            assistant.progress_tracker.performance_from_range(history)
+        )
 
         st.write(f"Question Complexity: {difficulty['question_complexity']}")
         st.write(f"Summary Length: {difficulty['summary_length']} words")
         st.write(f"Tasks per Week: {difficulty['tasks_per_week']}")
 
+        # Loaded models
+        st.subheader("Loaded Models")
+        for stats in registry.stats():
+            st.write(
+                f"{stats.model} ({stats.task}, {stats.backend}): loaded in {stats.load_seconds:.1f}s, "
+                f"{stats.resident_bytes / 1024 ** 2:.0f} MB resident"
+            )
+        if st.button("Unload Models"):
+            unloaded = registry.unload()
+            st.info(f"Unloaded {unloaded} model(s). They will reload on next use.")
+
+        # Result cache (read directly, so the page does not load a model)
+        cache = get_default_cache()
+        if cache is not None:
+            st.subheader("Result Cache")
+            cache_stats = cache.stats()
+            st.write(
+                f"{cache_stats['entries']} entries, {cache_stats['size_bytes'] / 1024 ** 2:.1f} MB, "
+                f"{cache_stats['hits']} hits / {cache_stats['misses']} misses this session"
+            )
+
+        # Notion rate limiting
+        st.subheader("Notion API")
+        limiter_metrics = assistant.notion_api.rate_limit_metrics()
+        st.write(
+            f"{limiter_metrics['calls']} requests, {limiter_metrics['throttle_waits']} throttled "
+            f"({limiter_metrics['throttle_wait_seconds']:.1f}s waiting), "
+            f"{limiter_metrics['retries']} retries, {limiter_metrics['failures']} failures"
+        )
+
+        # Pending progress writes
+        write_queue = assistant.progress_tracker.write_queue
+        if write_queue is not None:
+            queue_metrics = write_queue.metrics()
+            st.write(
+                f"Progress updates: {queue_metrics['depth']} pending, {queue_metrics['flushed']} written, "
+                f"{queue_metrics['coalesced']} coalesced, {queue_metrics['dropped']} dropped, "
+                f"{queue_metrics['avg_flush_latency']:.1f}s average flush latency"
+            )
+
+        # Per-stage timings, token counts and Notion latency of this server process,
+        # including the generation jobs its workers have finished
+        if instrumentation.is_enabled():
+            st.subheader("Metrics")
+            metrics_text = instrumentation.prometheus_text()
+            st.download_button("Download Prometheus metrics", metrics_text, file_name="metrics.prom")
+            with st.expander("Show metrics"):
+                st.code(metrics_text)
+
         # Feedback section
         st.subheader("Provide Feedback")
-        if st.button("Give Feedback"):
-            feedback = assistant.progress_tracker.get_feedback()
+        feedback = assistant.progress_tracker.get_feedback(StreamlitConfirmer("settings"))
+        if feedback is not None:
             st.success("Thank you for your feedback!")
 
 if __name__ == "__main__":
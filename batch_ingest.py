@@ -0,0 +1,322 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from itertools import islice
+from typing import Dict, Iterator, List, Optional
+from dotenv import load_dotenv
+from api_interactions import NotionAPI
+from pipeline import SUMMARY_TOO_LONG, use_hierarchical
+from questions import QuestionGenerator
+from summaries import SummaryGenerator
+
+# File types read from a source directory
+TEXT_EXTENSIONS = (".txt", ".md")
+
+# Pipeline stages timed by the ingester
+STAGES = ("read", "summarize", "questions", "notion", "checkpoint")
+
+
+@dataclass
+class Document:
+    """One piece of learning material to ingest."""
+    id: str
+    title: str
+    content: str
+
+    @property
+    def content_hash(self) -> str:
+        """SHA-256 of the content, recorded so an edited document is ingested again."""
+        return hashlib.sha256(self.content.encode("utf-8")).hexdigest()
+
+
+def iter_documents(source: str) -> Iterator[Document]:
+    """
+    Stream documents from a directory of text files or a JSONL file.
+
+    Directories are walked recursively for .txt and .md files; the document
+    ID is the path relative to the directory. JSONL lines need a "content"
+    (or "text") field and may set "id" (default: the line number) and "title".
+
+    Args:
+        source: Path of the directory or JSONL file
+
+    Yields:
+        Document: The documents, in a stable order
+    """
+    if os.path.isdir(source):
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for name in sorted(files):
+                if not name.lower().endswith(TEXT_EXTENSIONS):
+                    continue
+                path = os.path.join(root, name)
+                with open(path, encoding="utf-8") as f:
+                    content = f.read()
+                yield Document(
+                    id=os.path.relpath(path, source),
+                    title=os.path.splitext(name)[0],
+                    content=content
+                )
+        return
+
+    with open(source, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            doc_id = str(record.get("id", line_number))
+            yield Document(
+                id=doc_id,
+                title=record.get("title") or doc_id,
+                content=record.get("content") or record.get("text") or ""
+            )
+
+
+def load_checkpoint(path: str) -> Dict[str, Optional[str]]:
+    """
+    Read the documents finished by earlier runs.
+
+    Args:
+        path: Path of the JSONL checkpoint
+
+    Returns:
+        Dict[str, Optional[str]]: Content hash of each document recorded as
+            done, by ID (None for records written before hashes were kept)
+    """
+    done = {}
+    if not os.path.exists(path):
+        return done
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A run killed mid-write can leave a partial last line
+                continue
+            if record.get("status") == "done":
+                done[record["id"]] = record.get("content_hash")
+    return done
+
+
+def task_name(record: Dict) -> str:
+    """
+    Name a document's tasks after it, including its ID when the title differs.
+
+    The ID keeps the name unique, so notes.md in two directories (or two
+    JSONL lines with the same title) get tasks of their own.
+
+    Args:
+        record: Checkpoint record with the document's "id" and "title"
+
+    Returns:
+        str: Prefix of the document's task titles
+    """
+    if record["title"] == record["id"]:
+        return record["title"]
+    return f"{record['title']} ({record['id']})"
+
+
+class BatchIngester:
+    def __init__(self, checkpoint_path: str, batch_size: int = 8, num_questions: int = 3,
+                 max_length: int = 200, due_days: int = 7, write_to_notion: bool = True):
+        """
+        Initialize an ingester that runs documents through the whole pipeline.
+
+        Args:
+            checkpoint_path: JSONL file recording each finished or failed document
+            batch_size: Documents summarized and questioned together
+            num_questions: Questions generated per document
+            max_length: Maximum summary length in words
+            due_days: Days from now until the created tasks are due
+            write_to_notion: Create Summary and Question Set tasks in Notion
+        """
+        self.checkpoint_path = checkpoint_path
+        self.batch_size = batch_size
+        self.num_questions = num_questions
+        self.max_length = max_length
+        self.due_days = due_days
+        self.summary_generator = SummaryGenerator()
+        self.question_generator = QuestionGenerator()
+
+        self.notion_api = None
+        if write_to_notion:
+            self.notion_api = NotionAPI()
+
+        self.timings = {stage: 0.0 for stage in STAGES}
+        self.counts = {"done": 0, "failed": 0, "skipped": 0}
+
+    def run(self, documents: Iterator[Document]) -> Dict:
+        """
+        Ingest documents, skipping the ones the checkpoint records as done.
+
+        A document edited since it was recorded is ingested again, and its
+        Notion pages get the new summary and questions.
+
+        Args:
+            documents: The documents to ingest
+
+        Returns:
+            Dict: Document counts, elapsed seconds, documents per second and
+                seconds spent in each stage
+        """
+        done = load_checkpoint(self.checkpoint_path)
+        start = time.perf_counter()
+
+        def pending() -> Iterator[Document]:
+            for document in documents:
+                if document.id in done and done[document.id] in (None, document.content_hash):
+                    self.counts["skipped"] += 1
+                    continue
+                yield document
+
+        remaining = pending()
+        with open(self.checkpoint_path, "a", encoding="utf-8") as checkpoint:
+            while True:
+                stage_start = time.perf_counter()
+                batch = list(islice(remaining, self.batch_size))
+                self.timings["read"] += time.perf_counter() - stage_start
+                if not batch:
+                    break
+                self._ingest_batch(batch, checkpoint)
+
+        elapsed = time.perf_counter() - start
+        processed = self.counts["done"] + self.counts["failed"]
+        return dict(
+            self.counts,
+            seconds=elapsed,
+            docs_per_second=processed / elapsed if elapsed else 0.0,
+            stage_seconds=dict(self.timings)
+        )
+
+    def _ingest_batch(self, batch: List[Document], checkpoint) -> None:
+        """Summarize, question and save one batch, then checkpoint every document in it."""
+        stage_start = time.perf_counter()
+        # Book-length documents are reduced in a tree on their own; the rest share batches
+        summaries: List[Optional[tuple]] = [None] * len(batch)
+        batched = [i for i, document in enumerate(batch) if not use_hierarchical(document.content)]
+        for i, result in zip(batched, self.summary_generator.generate_summaries(
+                [batch[i].content for i in batched], self.max_length)):
+            summaries[i] = result
+        for i, document in enumerate(batch):
+            if summaries[i] is None:
+                summaries[i] = self.summary_generator.generate_summary(
+                    document.content, self.max_length, hierarchical=True
+                )
+        self.timings["summarize"] += time.perf_counter() - stage_start
+
+        records: List[Dict] = []
+        valid = []
+        for i, (document, (summary, within_limit)) in enumerate(zip(batch, summaries)):
+            record = {"id": document.id, "title": document.title, "content_hash": document.content_hash}
+            if not summary:
+                record.update(status="failed", error="Could not generate a summary")
+            elif not within_limit:
+                # Inputs too short to summarize come back with the reason as the summary
+                too_long = len(summary.split()) > self.max_length
+                record.update(status="failed", error=SUMMARY_TOO_LONG if too_long else summary)
+            else:
+                record.update(status="done", summary=summary)
+                valid.append(i)
+            records.append(record)
+
+        stage_start = time.perf_counter()
+        question_lists = self.question_generator.generate_questions_batch(
+            [records[i]["summary"] for i in valid], self.num_questions
+        ) if valid else []
+        for i, questions in zip(valid, question_lists):
+            records[i]["questions"] = self.question_generator.validate_questions(questions, records[i]["summary"])
+        self.timings["questions"] += time.perf_counter() - stage_start
+
+        if self.notion_api is not None and valid:
+            stage_start = time.perf_counter()
+            self._save_to_notion([records[i] for i in valid])
+            self.timings["notion"] += time.perf_counter() - stage_start
+
+        stage_start = time.perf_counter()
+        for record in records:
+            self.counts[record["status"]] += 1
+            if record["status"] == "failed":
+                print(f"Failed to ingest {record['id']}: {record['error']}")
+            record["finished_at"] = datetime.now().isoformat()
+            checkpoint.write(json.dumps(record) + "\n")
+        # Flush per batch so a crash loses at most the batch in flight
+        checkpoint.flush()
+        os.fsync(checkpoint.fileno())
+        self.timings["checkpoint"] += time.perf_counter() - stage_start
+
+    def _save_to_notion(self, records: List[Dict]) -> None:
+        """
+        Create a Summary and a Question Set task per record, in one bulk call.
+
+        Tasks are upserted by a title holding the document ID, so a resumed
+        run reuses the page that a partly failed earlier run created instead
+        of making a second one. The body of a reused page is replaced, since
+        a document only comes back when it was edited or its last save failed.
+        """
+        due_date = (datetime.now().date() + timedelta(days=self.due_days)).isoformat()
+        tasks = []
+        for record in records:
+            name = task_name(record)
+            tasks.append({
+                "title": f"{name} Summary",
+                "due_date": due_date,
+                "type": "Summary",
+                "body": [record["summary"]],
+                "replace_body": True
+            })
+            tasks.append({
+                "title": f"{name} Questions",
+                "due_date": due_date,
+                "type": "Question Set",
+                "body": [
+                    f"Q{i}. {qa['question']}\nA{i}. {qa['answer']}"
+                    for i, qa in enumerate(record["questions"], 1)
+                ],
+                "replace_body": True
+            })
+
+        results = self.notion_api.upsert_tasks(tasks)
+        for n, record in enumerate(records):
+            summary_result, questions_result = results[2 * n], results[2 * n + 1]
+            record["summary_page_id"] = summary_result.page_id
+            record["questions_page_id"] = questions_result.page_id
+            errors = [result.error for result in (summary_result, questions_result) if not result.ok]
+            if errors:
+                # Not done, so the next run retries it
+                record.update(status="failed", error="; ".join(errors))
+
+
+if __name__ == "__main__":
+    load_dotenv()
+
+    parser = argparse.ArgumentParser(description="Summarize and generate questions for a batch of learning materials.")
+    parser.add_argument("source", help="Directory of .txt/.md files or a JSONL file")
+    parser.add_argument("--checkpoint", default=".ingest_checkpoint.jsonl",
+                        help="JSONL file of finished documents; rerun with the same file to resume")
+    parser.add_argument("--batch-size", type=int, default=8, help="Documents processed together")
+    parser.add_argument("--questions", type=int, default=3, help="Questions per document")
+    parser.add_argument("--max-length", type=int, default=200, help="Maximum summary length in words")
+    parser.add_argument("--due-days", type=int, default=7, help="Days until the created tasks are due")
+    parser.add_argument("--no-notion", action="store_true", help="Only write results to the checkpoint")
+    args = parser.parse_args()
+
+    ingester = BatchIngester(
+        args.checkpoint,
+        batch_size=args.batch_size,
+        num_questions=args.questions,
+        max_length=args.max_length,
+        due_days=args.due_days,
+        write_to_notion=not args.no_notion
+    )
+    report = ingester.run(iter_documents(args.source))
+
+    print(
+        f"{report['done']} done, {report['failed']} failed, {report['skipped']} skipped (already done) "
+        f"in {report['seconds']:.1f}s: {report['docs_per_second']:.2f} docs/s"
+    )
+    for stage, seconds in report["stage_seconds"].items():
+        print(f"{stage:>10}: {seconds:.1f}s")
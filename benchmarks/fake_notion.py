@@ -0,0 +1,303 @@
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+
+def _now() -> str:
+    """Current time in Notion's timestamp format."""
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+
+def _timestamp(value: str) -> datetime:
+    """Parse a Notion date or timestamp; values without a zone count as UTC."""
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _compare(value, condition: Dict) -> bool:
+    """Apply one filter condition (equals, on_or_after, ...) to a property value."""
+    for operator, wanted in condition.items():
+        if operator == "is_empty":
+            return value is None
+        if operator == "is_not_empty":
+            return value is not None
+        if value is None:
+            return False
+        if operator in ("on_or_after", "on_or_before", "after", "before"):
+            value, wanted = _timestamp(value), _timestamp(wanted)
+        if operator == "equals" and value != wanted:
+            return False
+        if operator == "does_not_equal" and value == wanted:
+            return False
+        if operator in ("on_or_after", "greater_than_or_equal_to") and value < wanted:
+            return False
+        if operator in ("on_or_before", "less_than_or_equal_to") and value > wanted:
+            return False
+        if operator in ("after", "greater_than") and value <= wanted:
+            return False
+        if operator in ("before", "less_than") and value >= wanted:
+            return False
+    return True
+
+
+def _matches(page: Dict, query_filter: Optional[Dict]) -> bool:
+    """Check a page against a database query filter."""
+    if not query_filter:
+        return True
+    if "or" in query_filter:
+        return any(_matches(page, condition) for condition in query_filter["or"])
+    if "and" in query_filter:
+        return all(_matches(page, condition) for condition in query_filter["and"])
+    if query_filter.get("timestamp"):
+        kind = query_filter["timestamp"]
+        return _compare(page[kind], query_filter[kind])
+
+    prop = page["properties"].get(query_filter["property"], {})
+    if "title" in query_filter:
+        value = "".join(part["text"]["content"] for part in prop.get("title", [])) if prop else None
+        return _compare(value, query_filter["title"])
+    if "date" in query_filter:
+        return _compare((prop.get("date") or {}).get("start"), query_filter["date"])
+    if "number" in query_filter:
+        return _compare(prop.get("number"), query_filter["number"])
+    if "select" in query_filter:
+        return _compare((prop.get("select") or {}).get("name"), query_filter["select"])
+    raise ValueError(f"Unsupported filter: {query_filter}")
+
+
+def _paginate(results: List[Dict], params: Dict) -> Dict:
+    """Return one page of results, using the offset as the cursor."""
+    page_size = min(int(params.get("page_size", 100)), 100)
+    start = int(params.get("start_cursor") or 0)
+    has_more = start + page_size < len(results)
+    return {
+        "object": "list",
+        "results": results[start:start + page_size],
+        "has_more": has_more,
+        "next_cursor": str(start + page_size) if has_more else None
+    }
+
+
+class FakeNotionServer:
+    def __init__(self, latency: float = 0.0, rate_limit_ratio: float = 0.0, retry_after: float = 0.1,
+                 host: str = "127.0.0.1", port: int = 0, seed: Optional[int] = None):
+        """
+        Initialize a local stand-in for the parts of the Notion API the app uses.
+
+        Supports creating, reading and updating pages, querying a database
+        (with cursor pagination and the title, date, number, select and
+        last_edited_time filters the app sends), and listing, appending and
+        deleting block children. Data lives in memory for the lifetime of
+        the server.
+
+        Args:
+            latency: Seconds added to every response
+            rate_limit_ratio: Fraction of requests answered with 429 (0 to 1)
+            retry_after: Retry-After seconds sent with each 429
+            host: Interface to listen on
+            port: Port to listen on (0 picks a free one)
+            seed: Seed for the 429 injection, for repeatable runs
+        """
+        self.latency = latency
+        self.rate_limit_ratio = rate_limit_ratio
+        self.retry_after = retry_after
+        self.pages: Dict[str, Dict] = {}
+        self.blocks: Dict[str, List[Dict]] = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._stats = {"requests": 0, "rate_limited": 0, "by_route": {}}
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        """URL to use as NOTION_BASE_URL."""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        """
+        Serve requests on a background thread.
+
+        Returns:
+            str: The server's base URL
+        """
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-notion", daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self) -> None:
+        """Stop serving and close the socket."""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self) -> "FakeNotionServer":
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def stats(self) -> Dict:
+        """
+        Get request counters.
+
+        Returns:
+            Dict: Total requests, 429s sent and requests per route
+        """
+        with self._lock:
+            return dict(self._stats, by_route=dict(self._stats["by_route"]))
+
+    def _should_rate_limit(self) -> bool:
+        with self._lock:
+            return self._random.random() < self.rate_limit_ratio
+
+    def _count(self, route: str, rate_limited: bool) -> None:
+        with self._lock:
+            self._stats["requests"] += 1
+            self._stats["by_route"][route] = self._stats["by_route"].get(route, 0) + 1
+            if rate_limited:
+                self._stats["rate_limited"] += 1
+
+    def _dispatch(self, method: str, path: str, body: Dict, query: Optional[Dict] = None) -> Tuple[str, int, Dict]:
+        """Handle one API call and return (route, status, response body)."""
+        query = query or {}
+        if method == "POST" and path == "/v1/pages":
+            return "pages.create", 200, self._create_page(body)
+
+        match = re.fullmatch(r"/v1/pages/([^/]+)", path)
+        if match and method in ("GET", "PATCH"):
+            route = "pages.retrieve" if method == "GET" else "pages.update"
+            with self._lock:
+                page = self.pages.get(match.group(1))
+                if page is None:
+                    return route, 404, _error(404, "object_not_found", f"Could not find page {match.group(1)}")
+                if method == "PATCH":
+                    page["properties"].update(body.get("properties", {}))
+                    page["last_edited_time"] = _now()
+                    if "archived" in body:
+                        page["archived"] = body["archived"]
+                return route, 200, page
+
+        match = re.fullmatch(r"/v1/databases/([^/]+)/query", path)
+        if match and method == "POST":
+            return "databases.query", 200, self._query(match.group(1), body)
+
+        match = re.fullmatch(r"/v1/blocks/([^/]+)/children", path)
+        if match and method == "PATCH":
+            children = [dict(block, id=str(uuid.uuid4())) for block in body.get("children", [])]
+            with self._lock:
+                self.blocks.setdefault(match.group(1), []).extend(children)
+            return "blocks.children.append", 200, {"object": "list", "results": children, "has_more": False}
+        if match and method == "GET":
+            with self._lock:
+                children = list(self.blocks.get(match.group(1), []))
+            return "blocks.children.list", 200, _paginate(children, query)
+
+        match = re.fullmatch(r"/v1/blocks/([^/]+)", path)
+        if match and method == "DELETE":
+            with self._lock:
+                for children in self.blocks.values():
+                    for block in children:
+                        if block["id"] == match.group(1):
+                            children.remove(block)
+                            return "blocks.delete", 200, dict(block, archived=True)
+            return "blocks.delete", 404, _error(404, "object_not_found", f"Could not find block {match.group(1)}")
+
+        return "unknown", 400, _error(400, "invalid_request_url", f"Invalid request URL: {method} {path}")
+
+    def _create_page(self, body: Dict) -> Dict:
+        now = _now()
+        page = {
+            "object": "page",
+            "id": str(uuid.uuid4()),
+            "created_time": now,
+            "last_edited_time": now,
+            "archived": False,
+            "parent": body.get("parent", {}),
+            "properties": body.get("properties", {})
+        }
+        with self._lock:
+            self.pages[page["id"]] = page
+            if body.get("children"):
+                self.blocks[page["id"]] = [dict(block, id=str(uuid.uuid4())) for block in body["children"]]
+        return page
+
+    def _query(self, database_id: str, body: Dict) -> Dict:
+        with self._lock:
+            pages = [page for page in self.pages.values()
+                     if page["parent"].get("database_id") == database_id
+                     and _matches(page, body.get("filter"))]
+        return _paginate(pages, body)
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _handle(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = json.loads(self.rfile.read(length) or b"{}") if length else {}
+                path, _, query_string = self.path.partition("?")
+                query = {name: values[-1] for name, values in parse_qs(query_string).items()}
+
+                if server.latency:
+                    time.sleep(server.latency)
+
+                if server._should_rate_limit():
+                    server._count("rate_limited", True)
+                    self._send(429, _error(429, "rate_limited", "You have been rate limited."),
+                               {"Retry-After": str(server.retry_after)})
+                    return
+
+                route, status, response = server._dispatch(self.command, path, body, query)
+                server._count(route, False)
+                self._send(status, response)
+
+            def _send(self, status: int, body: Dict, headers: Optional[Dict] = None):
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_POST = do_PATCH = do_DELETE = _handle
+
+            def log_message(self, format, *args):
+                # Keep benchmark output clean
+                pass
+
+        return Handler
+
+
+def _error(status: int, code: str, message: str) -> Dict:
+    """Build a Notion-style error body."""
+    return {"object": "error", "status": status, "code": code, "message": message}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a local fake Notion API server.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--rate-limit-ratio", type=float, default=0.0, help="Fraction of requests answered with 429")
+    parser.add_argument("--retry-after", type=float, default=0.1, help="Retry-After seconds sent with each 429")
+    args = parser.parse_args()
+
+    fake = FakeNotionServer(args.latency, args.rate_limit_ratio, args.retry_after, port=args.port)
+    print(f"Fake Notion API at {fake.base_url} (set NOTION_BASE_URL to use it)")
+    try:
+        fake._httpd.serve_forever()
+    except KeyboardInterrupt:
+        fake.stop()
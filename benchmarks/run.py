@@ -0,0 +1,210 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional
+
+from benchmarks.fake_notion import FakeNotionServer
+from runtime_config import BENCHMARK_TEXT
+
+# Randomly initialized models with the production architectures, for fast CI runs
+TINY_SUMMARY_MODEL = "sshleifer/bart-tiny-random"
+TINY_QUESTION_MODEL = "patrickvonplaten/t5-tiny-random"
+
+# Where result files go by default
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+
+
+def measure(fn: Callable, repeat: int) -> Dict:
+    """
+    Time a function over several runs.
+
+    Args:
+        fn: The function to call, without arguments
+        repeat: Number of timed runs
+
+    Returns:
+        Dict: Mean, median, min and max seconds, and the run count
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return {
+        "runs": repeat,
+        "mean": statistics.mean(times),
+        "median": statistics.median(times),
+        "min": min(times),
+        "max": max(times)
+    }
+
+
+def benchmark_models(summary_model: Optional[str], question_model: Optional[str], repeat: int) -> Dict:
+    """
+    Benchmark chunking, summarization and question generation.
+
+    Model loading is timed separately; the result cache is disabled so every
+    run reaches the model.
+
+    Args:
+        summary_model: Summarization model (default: the production model)
+        question_model: Question model (default: the production model)
+        repeat: Timed runs per benchmark
+
+    Returns:
+        Dict: Timings per benchmark, plus the model names and load times
+    """
+    from questions import QuestionGenerator
+    from summaries import SummaryGenerator
+
+    start = time.perf_counter()
+    summary_generator = SummaryGenerator(**({"model_name": summary_model} if summary_model else {}))
+    summary_load = time.perf_counter() - start
+
+    start = time.perf_counter()
+    question_generator = QuestionGenerator(**({"model_name": question_model} if question_model else {}))
+    question_load = time.perf_counter() - start
+
+    summary_generator.cache = None
+    question_generator.cache = None
+
+    long_text = " ".join([BENCHMARK_TEXT] * 40)
+    summary, _ = summary_generator.generate_summary(BENCHMARK_TEXT)
+
+    return {
+        "summary_model": summary_generator.model_version,
+        "question_model": question_generator.model_version,
+        "load_seconds": {"summary": summary_load, "questions": question_load},
+        "split_text": dict(
+            measure(lambda: list(summary_generator._split_text(long_text)), repeat),
+            words=len(long_text.split()),
+            chunks=len(list(summary_generator._split_text(long_text)))
+        ),
+        "generate_summary": dict(
+            measure(lambda: summary_generator.generate_summary(BENCHMARK_TEXT), repeat),
+            words=len(BENCHMARK_TEXT.split())
+        ),
+        "generate_summary_long": dict(
+            measure(lambda: summary_generator.generate_summary(long_text), repeat),
+            words=len(long_text.split())
+        ),
+        "generate_questions": measure(lambda: question_generator.generate_questions(summary), repeat)
+    }
+
+
+def benchmark_notion(tasks: int, latency: float, rate_limit_ratio: float, rate: float, repeat: int) -> Dict:
+    """
+    Benchmark Notion bulk operations against the local fake Notion server.
+
+    Args:
+        tasks: Tasks created per bulk run
+        latency: Seconds the fake server adds to every response
+        rate_limit_ratio: Fraction of requests the fake server answers with 429
+        rate: Client-side rate limit in requests per second
+        repeat: Timed runs per benchmark
+
+    Returns:
+        Dict: Timings per operation, failures, limiter metrics and server counters
+    """
+    from api_interactions import NotionAPI
+    from rate_limiter import NotionRateLimiter
+
+    with FakeNotionServer(latency=latency, rate_limit_ratio=rate_limit_ratio, seed=0) as server:
+        os.environ["NOTION_BASE_URL"] = server.base_url
+        os.environ.setdefault("NOTION_API_KEY", "benchmark")
+        os.environ["TASKS_DATABASE_ID"] = "benchmark-tasks"
+
+        # A private limiter, so other clients in this process do not skew the metrics
+        api = NotionAPI(limiter=NotionRateLimiter(rate=rate, burst=max(1, int(rate))))
+        due_date = (datetime.now() + timedelta(days=7)).isoformat()
+        batch = [{"title": f"Benchmark Task {i}", "due_date": due_date, "progress": 0} for i in range(tasks)]
+
+        failures = []
+        created = []
+
+        def create_bulk():
+            results = api.create_tasks_bulk(batch)
+            failures.extend(result for result in results if not result.ok)
+            created.extend(result.page_id for result in results if result.ok)
+
+        create = dict(measure(create_bulk, repeat), tasks=tasks)
+        query = measure(lambda: api.query_database(os.environ["TASKS_DATABASE_ID"]), repeat)
+        update = dict(
+            measure(lambda: [api.update_progress(page_id, 50) for page_id in created[:tasks]], repeat),
+            pages=min(tasks, len(created))
+        )
+
+        return {
+            "latency": latency,
+            "rate_limit_ratio": rate_limit_ratio,
+            "rate": rate,
+            "create_tasks_bulk": dict(create, tasks_per_second=tasks / create["mean"] if create["mean"] else 0.0),
+            "query_database": dict(query, pages=len(server.pages)),
+            "update_progress": update,
+            "failures": len(failures),
+            "limiter": api.rate_limit_metrics(),
+            "server": server.stats()
+        }
+
+
+def git_commit() -> Optional[str]:
+    """Return the current commit hash, if this is a git checkout."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the summarize, questions and Notion stages.")
+    parser.add_argument("--tiny", action="store_true", help="Use tiny random models instead of the production ones")
+    parser.add_argument("--summary-model", help="Summarization model to benchmark")
+    parser.add_argument("--question-model", help="Question model to benchmark")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark")
+    parser.add_argument("--skip-models", action="store_true", help="Only benchmark the Notion operations")
+    parser.add_argument("--skip-notion", action="store_true", help="Only benchmark the models")
+    parser.add_argument("--tasks", type=int, default=20, help="Tasks per bulk create")
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake Notion response latency in seconds")
+    parser.add_argument("--rate-limit-ratio", type=float, default=0.05, help="Fraction of fake Notion 429s")
+    parser.add_argument("--rate", type=float, default=3.0, help="Client rate limit in requests per second")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/<time>-<commit>.json)")
+    args = parser.parse_args()
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "args": vars(args),
+        "results": {}
+    }
+
+    if not args.skip_models:
+        summary_model = args.summary_model or (TINY_SUMMARY_MODEL if args.tiny else None)
+        question_model = args.question_model or (TINY_QUESTION_MODEL if args.tiny else None)
+        report["results"]["models"] = benchmark_models(summary_model, question_model, args.repeat)
+
+    if not args.skip_notion:
+        report["results"]["notion"] = benchmark_notion(
+            args.tasks, args.latency, args.rate_limit_ratio, args.rate, args.repeat
+        )
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%dT%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"{stamp}-{(commit or 'nogit')[:8]}.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    print(json.dumps(report["results"], indent=2))
+    print(f"\nResults written to {output}")
@@ -0,0 +1,111 @@
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List
+
+from benchmarks.run import RESULTS_DIR, git_commit
+
+# Modules imported by each way of starting the app
+ENTRY_POINTS = {
+    "setup_notion": "setup_notion",
+    "notion_client_only": "api_interactions",
+    "progress_tracker": "progress_tracker",
+    "batch_ingest": "batch_ingest",
+    "job_worker": "pipeline",
+    "streamlit_app": "assistant"
+}
+
+# Heavy libraries whose presence after import is reported
+HEAVY_MODULES = ("torch", "transformers", "optimum", "numpy", "streamlit")
+
+# Run in a fresh interpreter: time the import and list the heavy modules it pulled in
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"import_seconds": elapsed,
+                  "heavy_modules": [m for m in {heavy!r} if m in sys.modules],
+                  "modules_loaded": len(sys.modules)}}))
+"""
+
+
+def measure_entry_point(module: str, repeat: int) -> Dict:
+    """
+    Measure cold start for one entry point in fresh interpreters.
+
+    Args:
+        module: The module the entry point imports
+        repeat: Number of fresh processes to time
+
+    Returns:
+        Dict: Median and max process and import seconds, and the heavy
+            modules that ended up imported
+    """
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    code = _PROBE.format(module=module, heavy=HEAVY_MODULES)
+
+    process_times: List[float] = []
+    import_times: List[float] = []
+    probe = {}
+    for _ in range(repeat):
+        start = time.perf_counter()
+        completed = subprocess.run(
+            [sys.executable, "-c", code], cwd=root, capture_output=True, text=True
+        )
+        process_times.append(time.perf_counter() - start)
+        if completed.returncode != 0:
+            return {"module": module, "error": completed.stderr.strip().splitlines()[-1:]}
+        probe = json.loads(completed.stdout.strip().splitlines()[-1])
+        import_times.append(probe["import_seconds"])
+
+    return {
+        "module": module,
+        "process_seconds": {"median": statistics.median(process_times), "max": max(process_times)},
+        "import_seconds": {"median": statistics.median(import_times), "max": max(import_times)},
+        "heavy_modules": probe["heavy_modules"],
+        "modules_loaded": probe["modules_loaded"]
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure cold-start time of each entry point.")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh processes per entry point")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/<time>-<commit>-startup.json)")
+    args = parser.parse_args()
+
+    results = {name: measure_entry_point(module, args.repeat) for name, module in ENTRY_POINTS.items()}
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "args": vars(args),
+        "results": {"startup": results}
+    }
+
+    output = args.output
+    if not output:
+        os.makedirs(RESULTS_DIR, exist_ok=True)
+        stamp = datetime.now().strftime("%Y%m%dT%H%M%S")
+        output = os.path.join(RESULTS_DIR, f"{stamp}-{(commit or 'nogit')[:8]}-startup.json")
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+
+    for name, result in results.items():
+        if "error" in result:
+            print(f"{name:>20}: failed ({' '.join(result['error'])})")
+            continue
+        heavy = ", ".join(result["heavy_modules"]) or "none"
+        print(
+            f"{name:>20}: {result['process_seconds']['median']:.2f}s process, "
+            f"{result['import_seconds']['median']:.2f}s import, heavy modules: {heavy}"
+        )
+    print(f"\nResults written to {output}")
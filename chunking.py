@@ -0,0 +1,186 @@
+import re
+import zlib
+from typing import Generator, Iterator, List, Tuple
+
+# End of a sentence (punctuation plus closing quotes/brackets) or a blank line
+_SENTENCE_BOUNDARY = re.compile(r'[.!?]+["\')\]]*(?=\s)|\n\s*\n')
+
+
+def iter_sentences(text: str) -> Iterator[str]:
+    """
+    Split text into sentences lazily.
+
+    Args:
+        text: The text to split
+
+    Yields:
+        str: One sentence at a time, stripped of surrounding whitespace
+    """
+    start = 0
+    for match in _SENTENCE_BOUNDARY.finditer(text):
+        sentence = text[start:match.end()].strip()
+        start = match.end()
+        if sentence:
+            yield sentence
+
+    remainder = text[start:].strip()
+    if remainder:
+        yield remainder
+
+
+def count_tokens(tokenizer, text: str) -> int:
+    """
+    Count the tokens the model will see for a piece of text.
+
+    Args:
+        tokenizer: A Hugging Face tokenizer
+        text: The text to measure
+
+    Returns:
+        int: Number of tokens, excluding special tokens
+    """
+    return len(tokenizer(text, add_special_tokens=False)["input_ids"])
+
+
+def _split_long_sentence(sentence: str, tokenizer, budget: int) -> Iterator[str]:
+    """Break a sentence that alone exceeds the budget at word boundaries."""
+    words = []
+    size = 0
+    for word in sentence.split():
+        word_tokens = count_tokens(tokenizer, " " + word)
+        if words and size + word_tokens > budget:
+            yield " ".join(words)
+            words = []
+            size = 0
+        words.append(word)
+        size += word_tokens
+
+    if words:
+        yield " ".join(words)
+
+
+def is_anchor(sentence: str, anchor_every: int) -> bool:
+    """
+    Decide from its content alone whether a sentence may end a chunk early.
+
+    Args:
+        sentence: The sentence to test
+        anchor_every: On average one sentence in this many is an anchor
+
+    Returns:
+        bool: True if the sentence is an anchor
+    """
+    normalized = " ".join(sentence.split()).encode("utf-8")
+    return zlib.crc32(normalized) % anchor_every == 0
+
+
+def _carry_overlap(sentences: List[str], sizes: List[int], overlap_tokens: int) -> List[Tuple[str, int]]:
+    """Pick the trailing sentences that fit in the overlap budget."""
+    kept, kept_total = [], 0
+    for previous, previous_size in zip(reversed(sentences), reversed(sizes)):
+        if kept_total + previous_size > overlap_tokens:
+            break
+        kept.insert(0, (previous, previous_size))
+        kept_total += previous_size
+    return kept
+
+
+def _emit(sentences: List[str], sizes: List[int], overlap: int, tokenizer, budget: int,
+          overlap_tokens: int) -> Generator[str, None, Tuple[List[Tuple[str, int]], List[Tuple[str, int]]]]:
+    """
+    Yield the longest prefix of the pending sentences that really fits the budget.
+
+    Sentence token counts are added up while packing, but the joined text
+    can tokenize to more tokens than the sum (e.g. BPE merges across the
+    joining spaces), so the chunk is measured again as a whole.
+
+    Returns:
+        The sentences to repeat as overlap and the sentences that did not
+        fit, as (sentence, tokens) pairs, to start the next chunk with
+    """
+    fit = len(sentences)
+    # Always emit at least one sentence past the overlap, so packing makes progress
+    while fit > overlap + 1 and count_tokens(tokenizer, " ".join(sentences[:fit])) > budget:
+        fit -= 1
+    yield " ".join(sentences[:fit])
+    kept = _carry_overlap(sentences[:fit], sizes[:fit], overlap_tokens)
+    return kept, list(zip(sentences[fit:], sizes[fit:]))
+
+
+def iter_token_chunks(text: str, tokenizer, max_tokens: int, overlap_tokens: int = 0,
+                      anchor_every: int = 0) -> Iterator[str]:
+    """
+    Pack whole sentences into chunks that fit the model's token budget.
+
+    Every chunk is measured again as a whole before it is emitted, so it
+    never exceeds max_tokens even where joining sentences adds tokens.
+
+    With anchor_every set, a chunk that is at least half full also ends
+    after any anchor sentence (see is_anchor). Anchors depend only on the
+    sentence itself, so after an edit the boundaries usually fall back into
+    place at the next anchor and the later chunks come out unchanged.
+
+    Args:
+        text: The text to split
+        tokenizer: The model's tokenizer, used to measure each sentence
+        max_tokens: Maximum number of tokens per chunk, including special tokens
+        overlap_tokens: Repeat up to this many tokens of trailing sentences
+            at the start of the next chunk (default: no overlap)
+        anchor_every: Average sentences between anchors (default: no anchors,
+            chunks are packed as full as possible)
+
+    Yields:
+        str: One chunk at a time
+    """
+    # Leave room for the special tokens the tokenizer adds around each input
+    budget = max(1, max_tokens - tokenizer.num_special_tokens_to_add())
+
+    sentences: List[str] = []
+    sizes: List[int] = []
+    total = 0
+    # Leading sentences repeated from the previous chunk, and whether any follow
+    overlap = 0
+    fresh = False
+
+    def carry(kept: List[Tuple[str, int]], leftover: List[Tuple[str, int]], room: int) -> None:
+        """Start the next chunk with the overlap (if it leaves room) and the leftover sentences."""
+        nonlocal sentences, sizes, total, overlap, fresh
+        if sum(n for _, n in kept + leftover) > room:
+            kept = []
+        sentences = [s for s, _ in kept + leftover]
+        sizes = [n for _, n in kept + leftover]
+        total = sum(sizes)
+        overlap = len(kept)
+        fresh = bool(leftover)
+
+    for sentence in iter_sentences(text):
+        size = count_tokens(tokenizer, sentence)
+        pieces = [(sentence, size)]
+        if size > budget:
+            pieces = [
+                (piece, count_tokens(tokenizer, piece))
+                for piece in _split_long_sentence(sentence, tokenizer, budget)
+            ]
+
+        for piece, size in pieces:
+            while fresh and total + size > budget:
+                kept, leftover = yield from _emit(sentences, sizes, overlap, tokenizer, budget, overlap_tokens)
+                carry(kept, leftover, budget - size)
+            if total + size > budget:
+                # Overlap that leaves no room for the next sentence is dropped
+                sentences, sizes, total, overlap = [], [], 0, 0
+
+            sentences.append(piece)
+            sizes.append(size)
+            total += size
+            fresh = True
+
+        # End the chunk early at an anchor, once it is at least half full
+        if anchor_every and total >= budget // 2 and is_anchor(sentence, anchor_every):
+            kept, leftover = yield from _emit(sentences, sizes, overlap, tokenizer, budget, overlap_tokens)
+            carry(kept, leftover, budget)
+
+    # A chunk holding only overlap from the previous one adds nothing
+    while fresh:
+        kept, leftover = yield from _emit(sentences, sizes, overlap, tokenizer, budget, overlap_tokens)
+        carry(kept, leftover, budget)
@@ -0,0 +1,197 @@
+import hashlib
+import os
+import sys
+from abc import ABC, abstractmethod
+from typing import Dict, Optional
+
+# Confirmation modes selectable with CONFIRMATION_MODE
+CLI = "cli"
+STREAMLIT = "streamlit"
+AUTO = "auto"
+
+# Answers to the weekly feedback question
+FEEDBACK_CHOICES = {1: "Too easy", 2: "Just right", 3: "Too difficult"}
+
+
+class Confirmer(ABC):
+    """
+    Asks the user to confirm summaries and give feedback.
+
+    Implementations return None while an answer is still pending (e.g. a
+    widget that has not been clicked yet) and must never block on stdin
+    unless they are meant for an interactive terminal.
+    """
+
+    @abstractmethod
+    def confirm_summary(self, summary: str) -> Optional[bool]:
+        """
+        Ask whether a generated summary is accurate.
+
+        Args:
+            summary: The summary to confirm
+
+        Returns:
+            Optional[bool]: True if confirmed, False if rejected, None if pending
+        """
+
+    @abstractmethod
+    def get_feedback(self) -> Optional[Dict]:
+        """
+        Ask about the user's learning experience.
+
+        Returns:
+            Optional[Dict]: "difficulty_rating" (1-3) and "areas_for_improvement",
+                or None if pending
+        """
+
+
+class CLIConfirmer(Confirmer):
+    """Prompts on the terminal; only for interactive command-line use."""
+
+    def confirm_summary(self, summary: str) -> Optional[bool]:
+        print("\nGenerated Summary:")
+        print(summary)
+        print(f"\nWord count: {len(summary.split())}")
+        print("\nDo you confirm this summary as accurate? [Yes/No]")
+
+        while True:
+            response = input().lower()
+            if response in ['yes', 'y']:
+                return True
+            elif response in ['no', 'n']:
+                return False
+            else:
+                print("Please answer with Yes/No or Y/N")
+
+    def get_feedback(self) -> Optional[Dict]:
+        print("\nHow did you feel about this week's learning?")
+        for choice, label in FEEDBACK_CHOICES.items():
+            print(f"{choice}. {label}")
+
+        while True:
+            try:
+                response = int(input("Enter your choice (1-3): "))
+                if 1 <= response <= 3:
+                    break
+                print("Please enter a number between 1 and 3")
+            except ValueError:
+                print("Please enter a valid number")
+
+        print("\nAny areas you need more help with? (Press Enter to skip)")
+        areas = input().strip()
+
+        return {
+            "difficulty_rating": response,
+            "areas_for_improvement": areas if areas else None
+        }
+
+
+class StreamlitConfirmer(Confirmer):
+    def __init__(self, key: str = "confirmation"):
+        """
+        Initialize a confirmer that renders Streamlit widgets.
+
+        Answers are kept in session state, so a confirmed summary stays
+        confirmed across reruns.
+
+        Args:
+            key: Prefix for widget and session state keys
+        """
+        self.key = key
+
+    def confirm_summary(self, summary: str) -> Optional[bool]:
+        import streamlit as st
+
+        state_key = f"{self.key}:summary:{hashlib.sha1(summary.encode('utf-8')).hexdigest()}"
+        if state_key in st.session_state:
+            return st.session_state[state_key]
+
+        st.write(f"Word count: {len(summary.split())}")
+        st.write("Do you confirm this summary as accurate?")
+        yes, no = st.columns(2)
+        if yes.button("Yes", key=f"{state_key}:yes"):
+            st.session_state[state_key] = True
+        elif no.button("No", key=f"{state_key}:no"):
+            st.session_state[state_key] = False
+        return st.session_state.get(state_key)
+
+    def get_feedback(self) -> Optional[Dict]:
+        import streamlit as st
+
+        with st.form(f"{self.key}:feedback"):
+            rating = st.radio(
+                "How did you feel about this week's learning?",
+                list(FEEDBACK_CHOICES),
+                index=1,
+                format_func=FEEDBACK_CHOICES.get
+            )
+            areas = st.text_input("Any areas you need more help with? (optional)").strip()
+            if st.form_submit_button("Submit Feedback"):
+                return {
+                    "difficulty_rating": rating,
+                    "areas_for_improvement": areas if areas else None
+                }
+        return None
+
+
+class AutoApproveConfirmer(Confirmer):
+    def __init__(self, approve: bool = True, difficulty_rating: int = 2):
+        """
+        Initialize a confirmer that answers without asking, for headless runs.
+
+        Args:
+            approve: Answer given to every summary confirmation
+            difficulty_rating: Feedback rating reported (default: "Just right")
+        """
+        self.approve = approve
+        self.difficulty_rating = difficulty_rating
+
+    def confirm_summary(self, summary: str) -> Optional[bool]:
+        return self.approve
+
+    def get_feedback(self) -> Optional[Dict]:
+        return {"difficulty_rating": self.difficulty_rating, "areas_for_improvement": None}
+
+
+def _running_in_streamlit() -> bool:
+    """Check whether this code runs inside a Streamlit server."""
+    if "streamlit" not in sys.modules:
+        return False
+    try:
+        from streamlit import runtime
+        return runtime.exists()
+    except ImportError:
+        return False
+
+
+def default_confirmer() -> Confirmer:
+    """
+    Choose a confirmer from the environment.
+
+    CONFIRMATION_MODE selects "cli", "streamlit" or "auto". Without it,
+    Streamlit widgets are used inside a Streamlit server, terminal prompts
+    when stdin is a terminal, and auto-approval otherwise, so nothing ever
+    waits on a stdin that nobody is typing into.
+
+    Returns:
+        Confirmer: The confirmer to use
+
+    Raises:
+        ValueError: If CONFIRMATION_MODE is not a supported mode
+    """
+    mode = os.getenv("CONFIRMATION_MODE", "")
+    if not mode:
+        if _running_in_streamlit():
+            mode = STREAMLIT
+        elif sys.stdin is not None and sys.stdin.isatty():
+            mode = CLI
+        else:
+            mode = AUTO
+
+    if mode == CLI:
+        return CLIConfirmer()
+    if mode == STREAMLIT:
+        return StreamlitConfirmer()
+    if mode == AUTO:
+        return AutoApproveConfirmer()
+    raise ValueError(f"CONFIRMATION_MODE must be one of {CLI}, {STREAMLIT}, {AUTO}, got {mode!r}")
@@ -0,0 +1,66 @@
+from typing import List, Optional
+import numpy as np
+from inference_backends import TORCH_FP32
+from model_registry import EMBEDDING_MODEL, registry
+
+
+def embed_texts(texts: List[str], model_name: str = EMBEDDING_MODEL[1], batch_size: int = 32) -> np.ndarray:
+    """
+    Embed texts with a sentence encoder.
+
+    Token embeddings are mean-pooled over the attention mask and normalized,
+    so dot products between rows are cosine similarities.
+
+    Args:
+        texts: The texts to embed
+        model_name: The sentence encoder (loaded once through the registry)
+        batch_size: Texts per forward pass
+
+    Returns:
+        np.ndarray: One unit-length row per text
+    """
+    import torch
+
+    pipe = registry.get(EMBEDDING_MODEL[0], model_name, device=-1, backend=TORCH_FP32)
+    tokenizer, model = pipe.tokenizer, pipe.model
+
+    rows = []
+    for start in range(0, len(texts), batch_size):
+        with registry.usage_lock(pipe), torch.inference_mode():
+            encoded = tokenizer(
+                texts[start:start + batch_size], padding=True, truncation=True, return_tensors="pt"
+            )
+            token_embeddings = model(**encoded)[0]
+        mask = encoded["attention_mask"].unsqueeze(-1).to(token_embeddings.dtype)
+        pooled = (token_embeddings * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1e-9)
+        rows.append(pooled.float().numpy())
+
+    if not rows:
+        return np.zeros((0, 0), dtype=np.float32)
+    vectors = np.vstack(rows)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def select_diverse(vectors: np.ndarray, scores: np.ndarray, k: Optional[int], threshold: float) -> List[int]:
+    """
+    Pick the best-scoring items, skipping near-duplicates of ones already picked.
+
+    Args:
+        vectors: Unit-length embeddings, one row per item
+        scores: Higher is better; ties keep the original order
+        k: Maximum items to pick (None for no limit)
+        threshold: Cosine similarity at or above which two items are duplicates
+
+    Returns:
+        List[int]: Indices of the picked items, best first
+    """
+    similarity = vectors @ vectors.T
+    picked: List[int] = []
+    for index in np.argsort(-scores, kind="stable"):
+        if picked and similarity[index, picked].max() >= threshold:
+            continue
+        picked.append(int(index))
+        if k is not None and len(picked) >= k:
+            break
+    return picked
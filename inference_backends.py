@@ -0,0 +1,197 @@
+import argparse
+import os
+import time
+from typing import Dict, List, Optional, Sequence
+from runtime_config import ensure_configured
+
+# Supported inference backends
+TORCH_FP32 = "torch"
+TORCH_INT8 = "torch-int8"
+ONNX = "onnx"
+BACKENDS = (TORCH_FP32, TORCH_INT8, ONNX)
+
+# Largest accepted drop in ROUGE-L agreement with the fp32 summaries
+DEFAULT_MAX_ROUGE_DELTA = 0.1
+
+
+def backend_from_env(variable: str) -> str:
+    """
+    Read a backend name from the environment.
+
+    Args:
+        variable: Environment variable to read (e.g. SUMMARY_BACKEND)
+
+    Returns:
+        str: The backend, TORCH_FP32 if unset
+
+    Raises:
+        ValueError: If the value is not a supported backend
+    """
+    backend = os.getenv(variable, TORCH_FP32) or TORCH_FP32
+    if backend not in BACKENDS:
+        raise ValueError(f"{variable} must be one of {', '.join(BACKENDS)}, got {backend!r}")
+    return backend
+
+
+def load_pipeline(task: str, model: str, device: int = -1, backend: str = TORCH_FP32):
+    """
+    Load a pipeline for the requested inference backend.
+
+    Args:
+        task: The transformers pipeline task
+        model: The model name or path
+        device: Device index for the fp32 backend (the others run on CPU)
+        backend: TORCH_FP32, TORCH_INT8 (dynamic int8 quantization of the
+            linear layers) or ONNX (exported to ONNX Runtime; needs
+            optimum[onnxruntime])
+
+    Returns:
+        The loaded pipeline
+    """
+    # Thread settings must be in place before torch does any work
+    ensure_configured()
+
+    if backend == TORCH_FP32:
+        from transformers import pipeline
+        return pipeline(task, model=model, device=device)
+
+    if backend == TORCH_INT8:
+        import torch
+        from transformers import pipeline
+
+        pipe = pipeline(task, model=model, device=-1)
+        pipe.model = torch.ao.quantization.quantize_dynamic(
+            pipe.model, {torch.nn.Linear}, dtype=torch.qint8
+        )
+        return pipe
+
+    if backend == ONNX:
+        try:
+            from optimum.pipelines import pipeline as ort_pipeline
+        except ImportError as e:
+            raise ImportError(
+                "The onnx backend needs optimum with ONNX Runtime: pip install optimum[onnxruntime]"
+            ) from e
+        # Exports the model to ONNX on first load
+        return ort_pipeline(task, model=model, accelerator="ort")
+
+    raise ValueError(f"Unknown inference backend: {backend}")
+
+
+def rouge_l(candidate: str, reference: str) -> float:
+    """
+    Compute the ROUGE-L F1 score between two texts.
+
+    Args:
+        candidate: The generated text
+        reference: The text to compare against
+
+    Returns:
+        float: F1 of the longest common word subsequence (0 to 1)
+    """
+    a = candidate.lower().split()
+    b = reference.lower().split()
+    if not a or not b:
+        return 0.0
+
+    # Longest common subsequence, one row at a time
+    previous = [0] * (len(b) + 1)
+    for word in a:
+        current = [0]
+        for j, other in enumerate(b, 1):
+            current.append(previous[j - 1] + 1 if word == other else max(previous[j], current[j - 1]))
+        previous = current
+    lcs = previous[-1]
+
+    if lcs == 0:
+        return 0.0
+    precision = lcs / len(a)
+    recall = lcs / len(b)
+    return 2 * precision * recall / (precision + recall)
+
+
+def compare_backends(texts: Sequence[str], backends: Sequence[str] = (TORCH_INT8, ONNX),
+                     max_rouge_delta: float = DEFAULT_MAX_ROUGE_DELTA,
+                     model_name: Optional[str] = None) -> List[Dict]:
+    """
+    Compare summary quality and latency of each backend with the fp32 baseline.
+
+    The delta for a backend is 1 minus the mean ROUGE-L F1 between its
+    summaries and the fp32 summaries of the same texts.
+
+    Args:
+        texts: Sample learning material to summarize
+        backends: Backends to compare against TORCH_FP32
+        max_rouge_delta: Largest acceptable delta
+        model_name: Summarization model (default: the generator's default)
+
+    Returns:
+        List[Dict]: One entry per backend (baseline first) with mean latency,
+            speedup, ROUGE-L, delta and whether it is within max_rouge_delta
+    """
+    from summaries import SummaryGenerator
+
+    def run(backend: str):
+        kwargs = {"backend": backend}
+        if model_name:
+            kwargs["model_name"] = model_name
+        generator = SummaryGenerator(**kwargs)
+        # Measure the model, not the result cache
+        generator.cache = None
+
+        summaries, latencies = [], []
+        for text in texts:
+            start = time.perf_counter()
+            summaries.append(generator.generate_summary(text)[0])
+            latencies.append(time.perf_counter() - start)
+        return summaries, sum(latencies) / len(latencies)
+
+    baseline, baseline_latency = run(TORCH_FP32)
+    results = [{
+        "backend": TORCH_FP32,
+        "mean_latency": baseline_latency,
+        "speedup": 1.0,
+        "rouge_l": 1.0,
+        "rouge_delta": 0.0,
+        "within_delta": True
+    }]
+
+    for backend in backends:
+        summaries, latency = run(backend)
+        score = sum(rouge_l(s, b) for s, b in zip(summaries, baseline)) / len(baseline)
+        results.append({
+            "backend": backend,
+            "mean_latency": latency,
+            "speedup": baseline_latency / latency if latency else 0.0,
+            "rouge_l": score,
+            "rouge_delta": 1 - score,
+            "within_delta": 1 - score <= max_rouge_delta
+        })
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare inference backends against the fp32 baseline.")
+    parser.add_argument("files", nargs="+", help="Text files to summarize")
+    parser.add_argument("--backends", nargs="+", default=[TORCH_INT8, ONNX], choices=BACKENDS[1:])
+    parser.add_argument("--max-rouge-delta", type=float,
+                        default=float(os.getenv("ROUGE_MAX_DELTA", str(DEFAULT_MAX_ROUGE_DELTA))))
+    args = parser.parse_args()
+
+    samples = []
+    for path in args.files:
+        with open(path, encoding="utf-8") as f:
+            samples.append(f.read())
+
+    results = compare_backends(samples, args.backends, args.max_rouge_delta)
+    for result in results:
+        verdict = "ok" if result["within_delta"] else "EXCEEDS DELTA"
+        print(
+            f"{result['backend']:>10}: {result['mean_latency']:.2f}s mean ({result['speedup']:.2f}x), "
+            f"ROUGE-L {result['rouge_l']:.3f}, delta {result['rouge_delta']:.3f} [{verdict}]"
+        )
+
+    # Non-zero exit so the comparison can gate a release
+    if not all(result["within_delta"] for result in results):
+        raise SystemExit(1)
@@ -1,13 +1,11 @@
 import os
-import torch
 import asyncio
 import streamlit as st
 
 def init_environment():
     """Initialize the environment for the application."""
-    # Set PyTorch to use CPU
-    torch.set_num_threads(1)
-    torch.set_num_interop_threads(1)
+    # PyTorch threading (INFERENCE_LAYOUT / TORCH_NUM_THREADS) is applied when
+    # the first model loads, so startup does not import torch
 
     # Configure Streamlit
     st.set_page_config(
@@ -0,0 +1,366 @@
+import asyncio
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from typing import Any, Callable, Dict, Optional, Tuple
+from dotenv import load_dotenv
+
+# Histogram bucket bounds: seconds for durations, plain values for sizes and counts
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384)
+
+# Prefix of every exported metric name
+METRIC_PREFIX = "learning_assistant_"
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus style."""
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class _NoopSpan:
+    """Stand-in returned by span() while instrumentation is disabled."""
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        return None
+
+    def set(self, key: str, value: Any) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+_current_span: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    def __init__(self, name: str, attributes: Dict):
+        """
+        Initialize a timed span; use it as a context manager.
+
+        Args:
+            name: Dotted span name, e.g. "summary.generate"
+            attributes: Initial attributes (token counts, batch sizes, ...)
+        """
+        self.name = name
+        self.attributes = attributes
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent: Optional[Span] = None
+        self.trace_id: Optional[str] = None
+        self.start = 0.0
+        self.duration = 0.0
+        self._token = None
+
+    def set(self, key: str, value: Any) -> None:
+        """Record an attribute on the span."""
+        self.attributes[key] = value
+
+    def __enter__(self) -> "Span":
+        self.parent = _current_span.get()
+        self.trace_id = self.parent.trace_id if self.parent else uuid.uuid4().hex
+        self._token = _current_span.set(self)
+        self.start = time.time()
+        self._perf_start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.duration = time.perf_counter() - self._perf_start
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            self.attributes["error"] = exc_type.__name__
+        _collector.finish_span(self)
+
+
+class Collector:
+    def __init__(self):
+        """Initialize an in-process store of histograms and counters."""
+        self.enabled = False
+        self.file_path: Optional[str] = None
+        self._lock = threading.Lock()
+        self._histograms: Dict[Tuple[str, Tuple], Histogram] = {}
+        self._counters: Dict[Tuple[str, Tuple], float] = {}
+
+    def observe(self, name: str, value: float, buckets: Tuple[float, ...], labels: Dict) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(buckets)
+            histogram.observe(value)
+
+    def increment(self, name: str, amount: float, labels: Dict) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def finish_span(self, span: Span) -> None:
+        """Record a finished span's duration and append it to the span file, if any."""
+        labels = {"span": span.name}
+        if "error" in span.attributes:
+            labels["error"] = span.attributes["error"]
+        self.observe("span_seconds", span.duration, SECONDS_BUCKETS, labels)
+
+        if self.file_path:
+            record = {
+                "name": span.name,
+                "trace_id": span.trace_id,
+                "span_id": span.span_id,
+                "parent_id": span.parent.span_id if span.parent else None,
+                "start": span.start,
+                "duration": span.duration,
+                "attributes": span.attributes
+            }
+            line = json.dumps(record, default=str) + "\n"
+            with self._lock:
+                with open(self.file_path, "a", encoding="utf-8") as f:
+                    f.write(line)
+
+    def reset(self) -> None:
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def drain(self) -> Dict:
+        """Return every metric as plain data and start over from empty."""
+        with self._lock:
+            histograms, self._histograms = self._histograms, {}
+            counters, self._counters = self._counters, {}
+        return {
+            "histograms": [
+                (name, labels, histogram.buckets, histogram.counts, histogram.sum, histogram.count)
+                for (name, labels), histogram in histograms.items()
+            ],
+            "counters": [(name, labels, value) for (name, labels), value in counters.items()]
+        }
+
+    def merge(self, snapshot: Dict) -> None:
+        """Add metrics returned by drain() (e.g. in another process) to this collector."""
+        with self._lock:
+            for name, labels, buckets, counts, total, count in snapshot.get("histograms", ()):
+                histogram = self._histograms.get((name, labels))
+                if histogram is None:
+                    histogram = self._histograms[(name, labels)] = Histogram(tuple(buckets))
+                if histogram.buckets != tuple(buckets):
+                    # Histograms with different bounds cannot be added up
+                    continue
+                histogram.counts = [a + b for a, b in zip(histogram.counts, counts)]
+                histogram.sum += total
+                histogram.count += count
+            for name, labels, value in snapshot.get("counters", ()):
+                self._counters[(name, labels)] = self._counters.get((name, labels), 0) + value
+
+    def prometheus_text(self) -> str:
+        """Render every metric in the Prometheus text exposition format."""
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+
+        lines = []
+        typed = set()
+        for (name, labels), value in counters:
+            metric = METRIC_PREFIX + name
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} counter")
+                typed.add(metric)
+            lines.append(f"{metric}{_labels(labels)} {value}")
+
+        for (name, labels), histogram in histograms:
+            metric = METRIC_PREFIX + name
+            if metric not in typed:
+                lines.append(f"# TYPE {metric} histogram")
+                typed.add(metric)
+            cumulative = 0
+            for bound, count in zip(histogram.buckets + (float("inf"),), histogram.counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{metric}_bucket{_labels(labels + (('le', le),))} {cumulative}")
+            lines.append(f"{metric}_sum{_labels(labels)} {histogram.sum}")
+            lines.append(f"{metric}_count{_labels(labels)} {histogram.count}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _labels(labels: Tuple) -> str:
+    """Format label pairs as {key="value",...}."""
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels) + "}"
+
+
+def _escape(value: Any) -> str:
+    """Escape a label value for the Prometheus text format."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+_collector = Collector()
+
+
+def configure(enabled: Optional[bool] = None, file_path: Optional[str] = None) -> None:
+    """
+    Turn instrumentation on or off.
+
+    Without arguments the settings come from the environment: METRICS_ENABLED=1
+    enables it and METRICS_SPAN_FILE appends every finished span as a JSON
+    line to that file.
+
+    Args:
+        enabled: Record spans and metrics
+        file_path: File to append finished spans to (None keeps them in memory only)
+    """
+    if enabled is None:
+        enabled = os.getenv("METRICS_ENABLED", "0") == "1"
+        file_path = file_path or os.getenv("METRICS_SPAN_FILE") or None
+    _collector.enabled = enabled
+    _collector.file_path = file_path
+
+
+def is_enabled() -> bool:
+    """Check whether instrumentation is recording."""
+    return _collector.enabled
+
+
+def span(name: str, **attributes) -> Any:
+    """
+    Time a block of work as a span nested under the current one.
+
+    Args:
+        name: Dotted span name, e.g. "notion.create_page"
+        **attributes: Initial attributes; more can be added with .set()
+
+    Returns:
+        A context manager yielding the span (a no-op while disabled)
+    """
+    if not _collector.enabled:
+        return _NOOP_SPAN
+    return Span(name, attributes)
+
+
+def observe(name: str, value: float, buckets: Tuple[float, ...] = SIZE_BUCKETS, **labels) -> None:
+    """
+    Record a value in a histogram.
+
+    Args:
+        name: Metric name without the prefix, e.g. "summary_input_tokens"
+        value: The observed value
+        buckets: Bucket bounds used when the histogram is first created
+        **labels: Metric labels
+    """
+    if _collector.enabled:
+        _collector.observe(name, value, buckets, labels)
+
+
+def increment(name: str, amount: float = 1, **labels) -> None:
+    """
+    Add to a counter.
+
+    Args:
+        name: Metric name without the prefix, e.g. "result_cache_hits"
+        amount: Amount to add
+        **labels: Metric labels
+    """
+    if _collector.enabled:
+        _collector.increment(name, amount, labels)
+
+
+def traced(name: str) -> Callable:
+    """
+    Decorate a function or coroutine function so each call is a span.
+
+    Args:
+        name: The span name
+
+    Returns:
+        Callable: The decorator
+    """
+    def decorator(fn: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                if not _collector.enabled:
+                    return await fn(*args, **kwargs)
+                with Span(name, {}):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _collector.enabled:
+                return fn(*args, **kwargs)
+            with Span(name, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+def prometheus_text() -> str:
+    """
+    Export the collected metrics.
+
+    Returns:
+        str: Metrics in the Prometheus text exposition format
+    """
+    return _collector.prometheus_text()
+
+
+def write_prometheus(path: str) -> None:
+    """
+    Write the collected metrics to a file, e.g. for node_exporter's textfile collector.
+
+    Args:
+        path: Destination file; replaced atomically
+    """
+    temporary = f"{path}.tmp"
+    with open(temporary, "w", encoding="utf-8") as f:
+        f.write(prometheus_text())
+    os.replace(temporary, path)
+
+
+def reset() -> None:
+    """Drop every collected metric."""
+    _collector.reset()
+
+
+def drain() -> Dict:
+    """
+    Take the metrics collected so far, leaving the collector empty.
+
+    Worker processes return this with a job's result so the parent can
+    merge() it; draining keeps each job's metrics from being sent twice.
+
+    Returns:
+        Dict: Picklable histograms and counters
+    """
+    return _collector.drain()
+
+
+def merge(snapshot: Optional[Dict]) -> None:
+    """
+    Add metrics drained in another process to this process's metrics.
+
+    Args:
+        snapshot: The value returned by drain() (None is ignored)
+    """
+    if snapshot and _collector.enabled:
+        _collector.merge(snapshot)
+
+
+load_dotenv()
+configure()
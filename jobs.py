@@ -0,0 +1,233 @@
+import multiprocessing
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional
+
+# Job states reported by JobRunner.status
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+
+class JobCancelled(Exception):
+    """Raised inside a worker when its job was cancelled while running."""
+
+
+@dataclass
+class Job:
+    """Bookkeeping for one submitted job."""
+    id: str
+    future: Future
+    submitted_at: float = field(default_factory=time.time)
+    cancelled: bool = False
+
+
+def _run_job(job_id: str, shared: Dict, fn: Callable, args: tuple, kwargs: Dict, report_progress: bool) -> Any:
+    """
+    Worker-side wrapper that records start time and progress for a job.
+
+    Args:
+        job_id: The job's ID
+        shared: Manager dict shared with the parent process
+        fn: The job function (must be importable by the worker)
+        args, kwargs: Arguments for fn
+        report_progress: Pass a progress_callback keyword argument to fn
+
+    Returns:
+        The value returned by fn
+    """
+    # A job cancelled while queued may already be on its way to a worker
+    if shared.get(f"{job_id}:cancel"):
+        raise JobCancelled(job_id)
+    shared[f"{job_id}:started"] = time.time()
+
+    if report_progress:
+        def progress_callback(*progress):
+            # Progress reports double as cancellation points
+            if shared.get(f"{job_id}:cancel"):
+                raise JobCancelled(job_id)
+            shared[f"{job_id}:progress"] = progress
+        kwargs = dict(kwargs, progress_callback=progress_callback)
+
+    return fn(*args, **kwargs)
+
+
+class JobRunner:
+    def __init__(self, max_workers: int = 2, max_pending: Optional[int] = None,
+                 initializer: Optional[Callable] = None, initargs: tuple = ()):
+        """
+        Initialize a bounded pool of worker processes for long-running jobs.
+
+        Workers are started with "spawn" so each one loads its own models
+        and thread settings, independent of the server process.
+
+        Args:
+            max_workers: Number of worker processes
+            max_pending: Maximum unfinished jobs (default: 4 per worker)
+            initializer: Called once in each worker process when it starts
+            initargs: Arguments for initializer
+        """
+        context = multiprocessing.get_context("spawn")
+        self.max_workers = max_workers
+        self.max_pending = max_pending or 4 * max_workers
+        self._executor = ProcessPoolExecutor(
+            max_workers=max_workers,
+            mp_context=context,
+            initializer=initializer,
+            initargs=initargs
+        )
+        self._manager = context.Manager()
+        self._shared = self._manager.dict()
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def submit(self, fn: Callable, *args, report_progress: bool = False, **kwargs) -> str:
+        """
+        Queue a job on the worker pool.
+
+        Args:
+            fn: A module-level function to run in a worker process
+            *args, **kwargs: Arguments for fn
+            report_progress: Pass fn a progress_callback whose reports are
+                readable with progress() and which raises JobCancelled
+                once the job is cancelled
+
+        Returns:
+            str: The job ID
+
+        Raises:
+            RuntimeError: If max_pending jobs are already unfinished
+        """
+        with self._lock:
+            unfinished = sum(1 for job in self._jobs.values() if not job.future.done())
+            if unfinished >= self.max_pending:
+                raise RuntimeError("Too many jobs in progress. Please try again shortly.")
+
+            job_id = uuid.uuid4().hex
+            future = self._executor.submit(_run_job, job_id, self._shared, fn, args, kwargs, report_progress)
+            self._jobs[job_id] = Job(id=job_id, future=future)
+            return job_id
+
+    def _job(self, job_id: str) -> Job:
+        with self._lock:
+            if job_id not in self._jobs:
+                raise KeyError(f"Unknown job: {job_id}")
+            return self._jobs[job_id]
+
+    def status(self, job_id: str) -> str:
+        """
+        Get the state of a job.
+
+        Args:
+            job_id: The job ID
+
+        Returns:
+            str: One of PENDING, RUNNING, DONE, FAILED or CANCELLED
+        """
+        job = self._job(job_id)
+        if job.cancelled or job.future.cancelled():
+            return CANCELLED
+        if job.future.done():
+            return FAILED if job.future.exception() is not None else DONE
+        if f"{job_id}:started" in self._shared:
+            return RUNNING
+        return PENDING
+
+    def progress(self, job_id: str) -> Optional[tuple]:
+        """
+        Get the last progress report of a job.
+
+        Args:
+            job_id: The job ID
+
+        Returns:
+            Optional[tuple]: Arguments of the last progress_callback call, if any
+        """
+        self._job(job_id)
+        return self._shared.get(f"{job_id}:progress")
+
+    def result(self, job_id: str) -> Any:
+        """
+        Get the result of a finished job.
+
+        Args:
+            job_id: The job ID
+
+        Returns:
+            The job's return value
+
+        Raises:
+            RuntimeError: If the job has not finished or was cancelled
+            Exception: The error raised by the job, if it failed
+        """
+        job = self._job(job_id)
+        if job.cancelled:
+            raise RuntimeError(f"Job {job_id} was cancelled")
+        if not job.future.done():
+            raise RuntimeError(f"Job {job_id} has not finished")
+        return job.future.result()
+
+    def error(self, job_id: str) -> Optional[str]:
+        """
+        Get the error message of a failed job.
+
+        Args:
+            job_id: The job ID
+
+        Returns:
+            Optional[str]: The error, or None if the job has not failed
+        """
+        job = self._job(job_id)
+        if job.cancelled or not job.future.done() or job.future.cancelled():
+            return None
+        error = job.future.exception()
+        return str(error) if error is not None else None
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a job.
+
+        Queued jobs never start. A running job stops at its next progress
+        report if it reports progress; otherwise it runs to completion and
+        its result is discarded.
+
+        Args:
+            job_id: The job ID
+
+        Returns:
+            bool: True if the job was cancelled, False if it had already finished
+        """
+        job = self._job(job_id)
+        if job.future.done():
+            return False
+        job.future.cancel()
+        job.cancelled = True
+        self._shared[f"{job_id}:cancel"] = True
+        return True
+
+    def forget(self, job_id: str) -> None:
+        """
+        Drop a finished job's bookkeeping and result.
+
+        Args:
+            job_id: The job ID
+        """
+        with self._lock:
+            self._jobs.pop(job_id, None)
+        for suffix in ("started", "progress", "cancel"):
+            self._shared.pop(f"{job_id}:{suffix}", None)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop the worker processes.
+
+        Args:
+            wait: Wait for running jobs to finish
+        """
+        self._executor.shutdown(wait=wait, cancel_futures=True)
+        self._manager.shutdown()
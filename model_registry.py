@@ -0,0 +1,211 @@
+import gc
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+from inference_backends import TORCH_FP32, backend_from_env, load_pipeline
+
+# Models used by the generators, loaded by warmup() when no specs are given
+SUMMARY_MODEL = ("summarization", "facebook/bart-large-cnn")
+QUESTION_MODEL = ("text2text-generation", "t5-base")
+EMBEDDING_MODEL = ("feature-extraction", "sentence-transformers/all-MiniLM-L6-v2")
+DEFAULT_MODELS = [SUMMARY_MODEL, QUESTION_MODEL, EMBEDDING_MODEL]
+
+# Environment variable choosing the backend of each generator's task
+BACKEND_VARIABLES = {SUMMARY_MODEL[0]: "SUMMARY_BACKEND", QUESTION_MODEL[0]: "QUESTION_BACKEND"}
+
+
+@dataclass
+class ModelStats:
+    """Load statistics for a single registered pipeline."""
+    task: str
+    model: str
+    device: int
+    backend: str
+    load_seconds: float
+    resident_bytes: int
+    loaded_at: float
+
+
+class ModelRegistry:
+    def __init__(self):
+        """Initialize an empty registry; pipelines are loaded on first use."""
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Tuple, threading.Lock] = {}
+        self._pipelines: Dict[Tuple, object] = {}
+        self._stats: Dict[Tuple, ModelStats] = {}
+        self._usage_locks: Dict[int, threading.RLock] = {}
+
+    def _lock_for(self, key: Tuple) -> threading.Lock:
+        """Return the per-model lock so two models can load concurrently."""
+        with self._lock:
+            if key not in self._key_locks:
+                self._key_locks[key] = threading.Lock()
+            return self._key_locks[key]
+
+    def get(self, task: str, model: str, device: int = -1, backend: str = TORCH_FP32):
+        """
+        Get a pipeline, loading it the first time it is requested.
+
+        Args:
+            task: The transformers pipeline task (e.g. "summarization")
+            model: The model name or path
+            device: Device index (-1 for CPU)
+            backend: Inference backend (see inference_backends)
+
+        Returns:
+            The shared pipeline instance
+        """
+        key = (task, model, device, backend)
+        pipe = self._pipelines.get(key)
+        if pipe is not None:
+            return pipe
+
+        # Only one thread loads a given model; the others wait for it
+        with self._lock_for(key):
+            pipe = self._pipelines.get(key)
+            if pipe is None:
+                start = time.perf_counter()
+                pipe = load_pipeline(task, model, device, backend)
+                load_seconds = time.perf_counter() - start
+
+                self._stats[key] = ModelStats(
+                    task=task,
+                    model=model,
+                    device=device,
+                    backend=backend,
+                    load_seconds=load_seconds,
+                    resident_bytes=self._resident_bytes(pipe),
+                    loaded_at=time.time()
+                )
+                self._pipelines[key] = pipe
+        return pipe
+
+    def usage_lock(self, pipe) -> threading.RLock:
+        """
+        Get the lock that serializes use of a shared pipeline.
+
+        Fast (Rust) tokenizers are not thread-safe: two threads tokenizing
+        with one tokenizer can fail with "Already borrowed". Hold this lock
+        around tokenizer and pipeline calls on a pipeline from the registry.
+
+        Args:
+            pipe: A pipeline returned by get()
+
+        Returns:
+            threading.RLock: The pipeline's lock (reentrant)
+        """
+        with self._lock:
+            return self._usage_locks.setdefault(id(pipe), threading.RLock())
+
+    def warmup(self, specs: Optional[List[Tuple[str, str]]] = None, device: int = -1,
+               backend: Optional[str] = None) -> List[ModelStats]:
+        """
+        Load pipelines ahead of the first request.
+
+        Args:
+            specs: List of (task, model) pairs (default: the generator models)
+            device: Device index (-1 for CPU)
+            backend: Inference backend for every model (default: the backend
+                each generator is configured with, see BACKEND_VARIABLES)
+
+        Returns:
+            List[ModelStats]: Statistics for the warmed pipelines
+        """
+        specs = specs or DEFAULT_MODELS
+        keys = []
+        for task, model in specs:
+            model_backend = backend
+            if model_backend is None:
+                variable = BACKEND_VARIABLES.get(task)
+                model_backend = backend_from_env(variable) if variable else TORCH_FP32
+            self.get(task, model, device, model_backend)
+            keys.append((task, model, device, model_backend))
+        return [self._stats[key] for key in keys]
+
+    def unload(self, task: Optional[str] = None, model: Optional[str] = None) -> int:
+        """
+        Drop loaded pipelines so their memory can be reclaimed.
+
+        Args:
+            task: Only unload pipelines for this task (default: any)
+            model: Only unload pipelines for this model (default: any)
+
+        Returns:
+            int: Number of pipelines unloaded
+        """
+        with self._lock:
+            keys = [
+                key for key in self._pipelines
+                if (task is None or key[0] == task) and (model is None or key[1] == model)
+            ]
+            for key in keys:
+                self._usage_locks.pop(id(self._pipelines[key]), None)
+                del self._pipelines[key]
+                del self._stats[key]
+
+        if keys:
+            gc.collect()
+            # torch is already imported if anything was loaded
+            import torch
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+        return len(keys)
+
+    def stats(self) -> List[ModelStats]:
+        """
+        Get load statistics for every loaded pipeline.
+
+        Returns:
+            List[ModelStats]: One entry per loaded pipeline
+        """
+        return list(self._stats.values())
+
+    @staticmethod
+    def model_version(pipe) -> str:
+        """
+        Identify the exact weights behind a pipeline.
+
+        Args:
+            pipe: A loaded pipeline
+
+        Returns:
+            str: "name@revision", using the Hub commit hash when known
+        """
+        config = pipe.model.config
+        revision = getattr(config, "_commit_hash", None) or "unknown"
+        return f"{config.name_or_path}@{revision}"
+
+    @staticmethod
+    def _resident_bytes(pipe) -> int:
+        """Size of the model's weights in bytes."""
+        model = getattr(pipe, "model", None)
+        if model is None:
+            return 0
+
+        # ONNX Runtime models keep their weights in the exported files
+        if not hasattr(model, "state_dict"):
+            model_dir = getattr(model, "model_save_dir", None)
+            if not model_dir or not os.path.isdir(model_dir):
+                return 0
+            return sum(
+                os.path.getsize(os.path.join(model_dir, name))
+                for name in os.listdir(model_dir) if name.endswith((".onnx", ".onnx_data"))
+            )
+
+        import torch
+
+        # state_dict also covers int8 packed weights, which are not parameters
+        def tensor_bytes(value) -> int:
+            if isinstance(value, (tuple, list)):
+                return sum(tensor_bytes(item) for item in value)
+            if torch.is_tensor(value):
+                return value.numel() * value.element_size()
+            return 0
+
+        return sum(tensor_bytes(value) for value in model.state_dict().values())
+
+
+# Shared by every generator in the process; Streamlit reruns reuse it
+registry = ModelRegistry()
@@ -0,0 +1,68 @@
+import multiprocessing
+import os
+from typing import Dict, Optional
+from summaries import ProgressCallback, SummaryGenerator
+from questions import QuestionGenerator
+import instrumentation
+from instrumentation import traced
+
+# Message shown when a summary cannot be produced within the word limit
+SUMMARY_TOO_LONG = "Generated summary exceeds word limit. Please try with shorter content."
+
+
+def use_hierarchical(content: str) -> bool:
+    """
+    Decide whether material is long enough for hierarchical summarization.
+
+    Args:
+        content: The learning material
+
+    Returns:
+        bool: True above HIERARCHICAL_SUMMARY_WORDS words (default 5000)
+    """
+    return len(content.split()) > int(os.getenv("HIERARCHICAL_SUMMARY_WORDS", "5000"))
+
+
+def generate_material(content: str, progress_callback: Optional[ProgressCallback] = None) -> Dict:
+    """
+    Summarize learning material and generate review questions without any UI.
+
+    This is the job function run by worker processes, so it must stay at
+    module level in an importable module. In a worker process the result
+    also carries the job's metrics under "metrics", for the parent to pass
+    to instrumentation.merge().
+
+    Args:
+        content: The learning material to process
+        progress_callback: Called as (level, completed, total) while the
+            summary is generated
+
+    Returns:
+        Dict: "summary" and "questions", or "error" if no valid summary was produced
+    """
+    result = _generate_material(content, progress_callback)
+    if instrumentation.is_enabled() and multiprocessing.parent_process() is not None:
+        # Metrics recorded here would otherwise never leave the worker
+        result["metrics"] = instrumentation.drain()
+    return result
+
+
+@traced("pipeline.generate_material")
+def _generate_material(content: str, progress_callback: Optional[ProgressCallback]) -> Dict:
+    # Generators are cheap to build; the registry keeps one model copy per worker
+    summary_generator = SummaryGenerator()
+    question_generator = QuestionGenerator()
+
+    summary, is_valid = summary_generator.generate_summary(
+        content,
+        hierarchical=use_hierarchical(content),
+        progress_callback=progress_callback
+    )
+    if not is_valid:
+        return {"error": SUMMARY_TOO_LONG}
+
+    questions = question_generator.generate_questions(summary)
+    return {
+        "summary": summary,
+        "questions": question_generator.validate_questions(questions, summary)
+    }
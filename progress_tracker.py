@@ -1,12 +1,29 @@
-from typing import Dict, List, Optional
-from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from datetime import datetime, time, timedelta
 import os
+import numpy as np
 from api_interactions import NotionAPI
+from confirmation import Confirmer, default_confirmer
+from task_mirror import TaskMirror, create_default_mirror, parse_notion_date
+from write_behind import ProgressWriteQueue, get_shared_write_queue
+
+# Performance assumed when a range holds no tasks yet; adjust_difficulty keeps medium
+DEFAULT_PERFORMANCE = {"completion_rate": 70, "trend": 0}
 
 class ProgressTracker:
-    def __init__(self):
-        """Initialize the progress tracker with Notion API integration."""
+    def __init__(self, mirror: Optional[TaskMirror] = None, write_queue: Optional[ProgressWriteQueue] = None):
+        """
+        Initialize the progress tracker with Notion API integration.
+
+        Args:
+            mirror: Local task mirror used for statistics (default: configured
+                from the environment; None when TASK_MIRROR_PATH is empty)
+            write_queue: Write-behind queue for progress updates (default: the
+                shared queue; None when PROGRESS_WRITE_BEHIND=0)
+        """
         self.notion_api = NotionAPI()
+        self.mirror = mirror if mirror is not None else create_default_mirror(self.notion_api)
+        self.write_queue = write_queue if write_queue is not None else get_shared_write_queue(self.notion_api)
 
     def track_completion(self, task_id: str, progress: int) -> bool:
         """
@@ -17,26 +34,188 @@ class ProgressTracker:
             progress: Progress percentage (0-100)
 
         Returns:
-            bool: True if successful, False otherwise
+            bool: True if successful (or queued for writing), False otherwise
         """
-        return self.notion_api.update_progress(task_id, progress)
+        if self.write_queue is None:
+            return self.notion_api.update_progress(task_id, progress)
 
-    def get_weekly_progress(self, week_number: int) -> Dict:
+        # Queue the write and reflect it locally so statistics see it at once
+        self.write_queue.enqueue(task_id, progress)
+        if self.mirror is not None:
+            self.mirror.apply_local_progress(task_id, progress)
+        return True
+
+    def get_weekly_progress(self, week_number: int, force_refresh: bool = False) -> Dict:
         """
         Get progress statistics for a specific week.
 
         Args:
             week_number: The week number to get progress for
+            force_refresh: Fully resync the local mirror before answering
 
         Returns:
             Dict: Progress statistics for the week
         """
-        # Calculate date range for the week
-        start_date = datetime.now() - timedelta(days=7 * (week_number - 1))
-        end_date = start_date + timedelta(days=6)
+        start_date, end_date = self._week_range(week_number)
 
-        # Query tasks for the week
-        filter_params = {
+        if self.mirror is not None:
+            stats = self._mirror_week_stats(start_date, end_date, force_refresh)
+        else:
+            stats = self._notion_week_stats(start_date, end_date)
+
+        total_tasks = stats["total_tasks"]
+        completed_tasks = stats["completed_tasks"]
+
+        return {
+            "week_number": week_number,
+            "total_tasks": total_tasks,
+            "completed_tasks": completed_tasks,
+            "completion_rate": (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0,
+            "average_progress": stats["average_progress"]
+        }
+
+    def get_progress_range(self, start_week: int, end_week: int, force_refresh: bool = False) -> Dict:
+        """
+        Get progress statistics for a span of weeks in one sweep.
+
+        All tasks in the span are read at once (from the local mirror, or in
+        a single paginated Notion query) and bucketed by week with array
+        operations.
+
+        Args:
+            start_week: First week number (inclusive)
+            end_week: Last week number (inclusive)
+            force_refresh: Fully resync the local mirror before answering
+
+        Returns:
+            Dict: Columns keyed like get_weekly_progress, one entry per week,
+                plus "week_start" (POSIX timestamp) and "trend", the change
+                in completion rate from the chronologically previous week in
+                the range (0 for the earliest)
+        """
+        weeks = np.arange(start_week, end_week + 1)
+        bounds = [self._week_range(int(week)) for week in weeks]
+        starts = np.array([start.timestamp() for start, _ in bounds])
+        ends = np.array([end.timestamp() for _, end in bounds])
+
+        # Week numbers count backwards in time, so the span runs from the
+        # earliest start to the latest end among its weeks
+        span_start = min(start for start, _ in bounds)
+        span_end = max(end for _, end in bounds)
+        if self.mirror is not None:
+            rows = self._mirror_tasks(span_start, span_end, force_refresh)
+        else:
+            rows = self._notion_tasks(span_start, span_end)
+
+        tasks = np.array(rows, dtype=float).reshape(-1, 2)
+        due, progress = tasks[:, 0], tasks[:, 1]
+
+        # in_week[i, j] is True when task i falls in week j
+        in_week = (due[:, None] >= starts[None, :]) & (due[:, None] <= ends[None, :])
+        has_progress = in_week & ~np.isnan(progress)[:, None]
+
+        total_tasks = in_week.sum(axis=0)
+        completed_tasks = (in_week & (progress == 100)[:, None]).sum(axis=0)
+        progress_sum = np.where(has_progress, np.nan_to_num(progress)[:, None], 0).sum(axis=0)
+        progress_count = has_progress.sum(axis=0)
+
+        completion_rate = np.divide(
+            completed_tasks * 100, total_tasks,
+            out=np.zeros(len(weeks)), where=total_tasks > 0
+        )
+        average_progress = np.divide(
+            progress_sum, progress_count,
+            out=np.zeros(len(weeks)), where=progress_count > 0
+        )
+        # Week numbers count backwards in time, so order by start before differencing
+        order = np.argsort(starts)
+        trend = np.empty(len(weeks))
+        trend[order] = np.diff(completion_rate[order], prepend=completion_rate[order][:1])
+
+        return {
+            "week_number": weeks,
+            "week_start": starts,
+            "total_tasks": total_tasks,
+            "completed_tasks": completed_tasks,
+            "completion_rate": completion_rate,
+            "average_progress": average_progress,
+            "trend": trend
+        }
+
+    def performance_from_range(self, range_stats: Dict) -> Dict:
+        """
+        Condense range statistics into the input expected by adjust_difficulty.
+
+        Args:
+            range_stats: Output of get_progress_range
+
+        Returns:
+            Dict: Overall completion rate and average weekly trend for the
+                span, or DEFAULT_PERFORMANCE if the span holds no tasks
+        """
+        total = range_stats["total_tasks"].sum()
+        if total == 0:
+            return dict(DEFAULT_PERFORMANCE)
+
+        completed = range_stats["completed_tasks"].sum()
+        # The earliest week has no previous week to compare with
+        trend = range_stats["trend"][np.argsort(range_stats["week_start"])][1:]
+        return {
+            "completion_rate": float(completed / total * 100),
+            "trend": float(trend.mean()) if len(trend) else 0
+        }
+
+    def _mirror_tasks(self, start_date: datetime, end_date: datetime, force_refresh: bool) -> List[Tuple]:
+        """Read (due timestamp, progress) rows from the local mirror, syncing it first if stale."""
+        try:
+            self.mirror.sync(force=force_refresh)
+        except Exception as e:
+            # Serve the last synced state rather than nothing
+            print(f"Error syncing task mirror: {e}")
+        return self.mirror.tasks_between(start_date, end_date)
+
+    def _notion_tasks(self, start_date: datetime, end_date: datetime) -> List[Tuple]:
+        """Read (due timestamp, progress) rows with one paginated Notion query."""
+        rows = []
+        try:
+            for task in self.notion_api.iter_database(
+                os.getenv("TASKS_DATABASE_ID"), self._date_filter(start_date, end_date), prefetch=True
+            ):
+                properties = task["properties"]
+                due = (properties["Due Date"]["date"] or {}).get("start")
+                rows.append((parse_notion_date(due), properties["Progress"]["number"]))
+        except Exception as e:
+            print(f"Error querying database: {e}")
+            return []
+        return rows
+
+    def _week_range(self, week_number: int) -> Tuple[datetime, datetime]:
+        """
+        Calculate the date range covered by a week.
+
+        Args:
+            week_number: The week number
+
+        Returns:
+            Tuple[datetime, datetime]: Start of its first day and end of its last day
+        """
+        # Whole days, so date-only due dates (local midnight) fall inside their week
+        start_date = datetime.combine(datetime.now().date() - timedelta(days=7 * (week_number - 1)), time.min)
+        end_date = datetime.combine(start_date.date() + timedelta(days=6), time.max)
+        return start_date, end_date
+
+    def _date_filter(self, start_date: datetime, end_date: datetime) -> Dict:
+        """
+        Build a Notion filter for tasks due within a date range.
+
+        Args:
+            start_date: Start of the range (inclusive)
+            end_date: End of the range (inclusive)
+
+        Returns:
+            Dict: Filter parameters for query_database
+        """
+        return {
             "and": [
                 {
                     "property": "Due Date",
@@ -53,22 +232,44 @@ class ProgressTracker:
             ]
         }
 
-        tasks = self.notion_api.query_database(
-            os.getenv("TASKS_DATABASE_ID"),
-            filter_params
-        )
+    def _mirror_week_stats(self, start_date: datetime, end_date: datetime, force_refresh: bool) -> Dict:
+        """Answer week statistics from the local mirror, syncing it first if stale."""
+        try:
+            self.mirror.sync(force=force_refresh)
+        except Exception as e:
+            # Serve the last synced state rather than nothing
+            print(f"Error syncing task mirror: {e}")
+        return self.mirror.week_stats(start_date, end_date)
+
+    def _notion_week_stats(self, start_date: datetime, end_date: datetime) -> Dict:
+        """Compute week statistics with a filtered Notion query."""
+        # Query tasks for the week
+        filter_params = self._date_filter(start_date, end_date)
 
-        # Calculate statistics
-        total_tasks = len(tasks)
-        completed_tasks = sum(1 for task in tasks if task["properties"]["Progress"]["number"] == 100)
-        average_progress = sum(task["properties"]["Progress"]["number"] for task in tasks) / total_tasks if total_tasks > 0 else 0
+        # Calculate statistics while streaming pages, so large weeks never
+        # have to be held in memory at once
+        total_tasks = 0
+        completed_tasks = 0
+        progress_sum = 0
+        progress_count = 0
+        try:
+            for task in self.notion_api.iter_database(os.getenv("TASKS_DATABASE_ID"), filter_params, prefetch=True):
+                progress = task["properties"]["Progress"]["number"]
+                total_tasks += 1
+                # A task without progress counts, but not towards the average (as in the mirror)
+                if progress is None:
+                    continue
+                completed_tasks += progress == 100
+                progress_sum += progress
+                progress_count += 1
+        except Exception as e:
+            print(f"Error querying database: {e}")
+            total_tasks = completed_tasks = progress_sum = progress_count = 0
 
         return {
-            "week_number": week_number,
             "total_tasks": total_tasks,
             "completed_tasks": completed_tasks,
-            "completion_rate": (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0,
-            "average_progress": average_progress
+            "average_progress": progress_sum / progress_count if progress_count > 0 else 0
         }
 
     def adjust_difficulty(self, user_performance: Dict) -> Dict:
@@ -102,31 +303,15 @@ class ProgressTracker:
 
         return difficulty
 
-    def get_feedback(self) -> Dict:
+    def get_feedback(self, confirmer: Optional[Confirmer] = None) -> Optional[Dict]:
         """
         Get user feedback about their learning experience.
 
+        Args:
+            confirmer: How to ask (default: default_confirmer())
+
         Returns:
-            Dict: User feedback and suggestions
+            Optional[Dict]: User feedback and suggestions, or None while the
+                answer is pending (Streamlit widgets)
         """
-        print("\nHow did you feel about this week's learning?")
-        print("1. Too easy")
-        print("2. Just right")
-        print("3. Too difficult")
-
-        while True:
-            try:
-                response = int(input("Enter your choice (1-3): "))
-                if 1 <= response <= 3:
-                    break
-                print("Please enter a number between 1 and 3")
-            except ValueError:
-                print("Please enter a valid number")
-
-        print("\nAny areas you need more help with? (Press Enter to skip)")
-        areas = input().strip()
-
-        return {
-            "difficulty_rating": response,
-            "areas_for_improvement": areas if areas else None
-        }
\ No newline at end of file
+        return (confirmer or default_confirmer()).get_feedback()
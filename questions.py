@@ -1,17 +1,47 @@
-from transformers import pipeline
-from typing import List, Dict
-import torch
+import os
+import re
+from typing import Dict, Iterator, List, Optional
+import numpy as np
+from embeddings import embed_texts, select_diverse
+from inference_backends import TORCH_FP32, backend_from_env
+from instrumentation import observe, span, traced
+from model_registry import QUESTION_MODEL, registry
+from result_cache import ResultCache, get_default_cache
+from streaming import stream_generate
 
 class QuestionGenerator:
-    def __init__(self):
-        """Initialize the question generator with a pre-trained model."""
-        # Check if CUDA is available, otherwise use CPU
-        device = 0 if torch.cuda.is_available() else -1
-        self.question_generator = pipeline(
-            "text2text-generation",
-            model="t5-base",
-            device=device
-        )
+    def __init__(self, model_name: str = QUESTION_MODEL[1], cache: Optional[ResultCache] = None,
+                 backend: Optional[str] = None):
+        """
+        Initialize the question generator with a pre-trained model.
+
+        Args:
+            model_name: The text-to-text model to use
+            cache: Result cache (default: the shared on-disk cache, if enabled)
+            backend: Inference backend (default: QUESTION_BACKEND, or fp32 PyTorch)
+        """
+        self.model_name = model_name
+        self.backend = backend or backend_from_env("QUESTION_BACKEND")
+        # Check if CUDA is available, otherwise use CPU (int8 and ONNX are CPU-only);
+        # torch is imported here so that importing this module stays cheap
+        import torch
+        device = 0 if self.backend == TORCH_FP32 and torch.cuda.is_available() else -1
+        self.question_generator = registry.get(QUESTION_MODEL[0], model_name, device=device, backend=self.backend)
+        self.model_version = registry.model_version(self.question_generator)
+        self.cache = cache if cache is not None else get_default_cache()
+        # The pipeline (and its tokenizer) may be shared with other threads
+        self._model_lock = registry.usage_lock(self.question_generator)
+
+        # Beam candidates generated per requested question, to survive deduplication
+        self.candidates_per_question = int(os.getenv("QUESTION_CANDIDATES_PER_QUESTION", "2"))
+
+        # Upper bound on prompts per forward pass when batching across texts
+        self.max_batch_size = int(os.getenv("QUESTION_BATCH_SIZE", "8"))
+
+        # Rank candidates with a sentence encoder and drop near-duplicates
+        # (cosine similarity at or above the threshold); QUESTION_RANKING=0 disables it
+        self.ranking = os.getenv("QUESTION_RANKING", "1") != "0"
+        self.duplicate_threshold = float(os.getenv("QUESTION_DUPLICATE_THRESHOLD", "0.9"))
 
     def generate_questions(self, text: str, num_questions: int = 3) -> List[Dict]:
         """
@@ -24,44 +54,265 @@ class QuestionGenerator:
         Returns:
             List[Dict]: List of generated questions with their answers
         """
+        return self.generate_questions_batch([text], num_questions)[0]
+
+    @traced("questions.generate_batch")
+    def generate_questions_batch(self, texts: List[str], num_questions: int = 3) -> List[List[Dict]]:
+        """
+        Generate questions for several texts, batching model calls across them.
+
+        Args:
+            texts: The texts to generate questions from
+            num_questions: Number of questions to generate per text
+
+        Returns:
+            List[List[Dict]]: Questions with their answers, one list per text
+                (empty for a text whose generation failed)
+        """
+        results: List[List[Dict]] = [[] for _ in texts]
         try:
-            questions = []
-            for _ in range(num_questions):
-                # Generate question
-                question_prompt = f"generate question: {text}"
-                question_response = self.question_generator(
-                    question_prompt,
-                    max_new_tokens=50,
-                    num_return_sequences=1
-                )
-                question = question_response[0]['generated_text'].strip()
-
-                # Generate answer
-                answer_prompt = f"answer this question based on the text: {question} {text}"
-                answer_response = self.question_generator(
-                    answer_prompt,
-                    max_new_tokens=100,
-                    num_return_sequences=1
+            pending = []
+            for index, text in enumerate(texts):
+                cache_key = self._cache_key(text, num_questions)
+                cached = self.cache.get(cache_key) if self.cache is not None else None
+                if cached is not None:
+                    results[index] = cached
+                else:
+                    pending.append((index, cache_key))
+            if not pending:
+                return results
+
+            with self._model_lock:
+                question_lists = self._generate_question_texts_batch(
+                    [texts[index] for index, _ in pending], num_questions
                 )
-                answer = answer_response[0]['generated_text'].strip()
 
-                questions.append({
-                    "question": question,
-                    "answer": answer
-                })
+            # Answer every question of every text in batched passes
+            owners, questions = [], []
+            for (index, _), text_questions in zip(pending, question_lists):
+                for question in text_questions:
+                    owners.append(index)
+                    questions.append(question)
+
+            if questions:
+                answer_prompts = [
+                    self._answer_prompt(question, texts[index]) for index, question in zip(owners, questions)
+                ]
+                with self._model_lock, span("questions.model", stage="answers", batch_size=len(answer_prompts)):
+                    answer_responses = self.question_generator(
+                        answer_prompts,
+                        max_new_tokens=100,
+                        num_return_sequences=1,
+                        batch_size=min(len(answer_prompts), self.max_batch_size)
+                    )
+                observe("questions_batch_size", len(answer_prompts), stage="answers")
 
-            return questions
+                for index, question, answer_response in zip(owners, questions, answer_responses):
+                    # Pipelines return a list per input unless it was unwrapped
+                    if isinstance(answer_response, list):
+                        answer_response = answer_response[0]
+                    results[index].append({
+                        "question": question,
+                        "answer": answer_response['generated_text'].strip()
+                    })
+
+            if self.cache is not None:
+                for index, cache_key in pending:
+                    if results[index]:
+                        self.cache.set(cache_key, results[index], "questions")
+            return results
 
         except Exception as e:
             print(f"Error generating questions: {e}")
-            return []
+            return [[] for _ in texts]
+
+    def _cache_key(self, text: str, num_questions: int) -> str:
+        """Build the result cache key for the questions of a text."""
+        return ResultCache.make_key("questions", text, self.model_version, {
+            "backend": self.backend,
+            "num_questions": num_questions,
+            "candidates_per_question": self.candidates_per_question,
+            "ranking": self.ranking,
+            "duplicate_threshold": self.duplicate_threshold if self.ranking else None
+        })
 
-    def validate_questions(self, questions: List[Dict]) -> List[Dict]:
+    @staticmethod
+    def _deduplicate(candidates: List[str]) -> List[str]:
+        """
+        Drop repeated questions, keeping the first (highest ranked) occurrence.
+
+        Args:
+            candidates: Generated questions in beam-score order
+
+        Returns:
+            List[str]: Unique questions, ignoring case, spacing and punctuation
+        """
+        seen = set()
+        unique = []
+        for candidate in candidates:
+            question = candidate.strip()
+            key = " ".join(re.sub(r"[^\w\s]", " ", question.lower()).split())
+            if question and key not in seen:
+                seen.add(key)
+                unique.append(question)
+        return unique
+
+    def _generate_question_texts(self, text: str, num_questions: int) -> List[str]:
+        """
+        Generate up to num_questions distinct questions about the text.
+
+        Args:
+            text: The text to generate questions from
+            num_questions: Number of questions to generate
+
+        Returns:
+            List[str]: The questions, best first
+        """
+        return self._generate_question_texts_batch([text], num_questions)[0]
+
+    def _generate_question_texts_batch(self, texts: List[str], num_questions: int) -> List[List[str]]:
+        """
+        Generate up to num_questions distinct questions about each text.
+
+        Args:
+            texts: The texts to generate questions from
+            num_questions: Number of questions to generate per text
+
+        Returns:
+            List[List[str]]: The questions for each text, best first
+        """
+        # One beam search call returns several distinct candidate questions;
+        # over-generate so duplicates can be dropped and N still remain
+        num_candidates = num_questions * self.candidates_per_question
+        question_prompts = [f"generate question: {text}" for text in texts]
+        with span("questions.model", stage="questions", batch_size=len(question_prompts),
+                  num_beams=num_candidates):
+            question_responses = self.question_generator(
+                question_prompts,
+                max_new_tokens=50,
+                num_beams=num_candidates,
+                num_return_sequences=num_candidates,
+                do_sample=False,
+                batch_size=min(len(question_prompts), self.max_batch_size)
+            )
+        observe("questions_batch_size", len(question_prompts), stage="questions")
+
+        question_lists = []
+        for response in question_responses:
+            # A single sequence per input comes back unwrapped
+            if isinstance(response, dict):
+                response = [response]
+            candidates = [candidate['generated_text'] for candidate in response]
+            question_lists.append(self._deduplicate(candidates))
+
+        if self.ranking:
+            try:
+                return self._rank_candidates(question_lists, texts, num_questions)
+            except Exception as e:
+                print(f"Error ranking questions, keeping beam order: {e}")
+        return [questions[:num_questions] for questions in question_lists]
+
+    def _rank_candidates(self, question_lists: List[List[str]], texts: List[str],
+                         num_questions: int) -> List[List[str]]:
+        """
+        Pick the most relevant distinct candidates for each text before answering.
+
+        Every candidate and text is embedded in one batch; candidates are
+        scored by cosine similarity to their text and near-duplicates of
+        better candidates are dropped.
+
+        Args:
+            question_lists: Candidate questions per text, in beam order
+            texts: The texts the questions are about
+            num_questions: Questions to keep per text
+
+        Returns:
+            List[List[str]]: Up to num_questions questions per text, most relevant first
+        """
+        # Malformed candidates would fail validation anyway; keep them only as a last resort
+        question_lists = [
+            [question for question in questions if self._well_formed(question)] or questions
+            for questions in question_lists
+        ]
+        flat = [question for questions in question_lists for question in questions]
+        if not flat:
+            return [[] for _ in texts]
+
+        with span("questions.embed", texts=len(flat) + len(texts)):
+            vectors = embed_texts(flat + list(texts))
+        question_vectors, text_vectors = vectors[:len(flat)], vectors[len(flat):]
+
+        ranked = []
+        offset = 0
+        for questions, text_vector in zip(question_lists, text_vectors):
+            candidate_vectors = question_vectors[offset:offset + len(questions)]
+            offset += len(questions)
+            picked = select_diverse(
+                candidate_vectors, candidate_vectors @ text_vector, num_questions, self.duplicate_threshold
+            )
+            ranked.append([questions[i] for i in picked])
+        return ranked
+
+    @staticmethod
+    def _well_formed(question: str) -> bool:
+        """Check that a question has at least 3 words and a question mark."""
+        return len(question.split()) >= 3 and "?" in question
+
+    @staticmethod
+    def _answer_prompt(question: str, text: str) -> str:
+        """Build the prompt that asks the model to answer a question from the text."""
+        return f"answer this question based on the text: {question} {text}"
+
+    def stream_questions(self, text: str, num_questions: int = 3) -> Iterator[Dict]:
+        """
+        Generate questions, streaming each answer as it is decoded.
+
+        The questions are generated in one call up front; their answers are
+        then streamed one at a time. Answers use greedy decoding, like
+        generate_questions, but are not written to the result cache.
+
+        Args:
+            text: The text to generate questions from
+            num_questions: Number of questions to generate
+
+        Yields:
+            Dict: Updates with "index", "question", the "answer" so far and
+                "done"; the last update for a question has done=True and
+                "valid" set by validate_questions
+        """
+        try:
+            with self._model_lock:
+                question_texts = self._generate_question_texts(text, num_questions)
+            for index, question in enumerate(question_texts):
+                answer = ""
+                yield {"index": index, "question": question, "answer": answer, "done": False}
+
+                for piece in stream_generate(
+                    self.question_generator,
+                    self._answer_prompt(question, text),
+                    max_new_tokens=100
+                ):
+                    answer += piece
+                    yield {"index": index, "question": question, "answer": answer, "done": False}
+
+                qa = {"question": question, "answer": answer.strip()}
+                yield dict(qa, index=index, done=True, valid=bool(self.validate_questions([qa])))
+
+        except Exception as e:
+            print(f"Error generating questions: {e}")
+
+    def validate_questions(self, questions: List[Dict], summary: Optional[str] = None,
+                           top_k: Optional[int] = None) -> List[Dict]:
         """
         Validate generated questions for quality and relevance.
 
+        With ranking enabled, near-duplicate questions are also dropped and,
+        given the summary, the rest are ordered by relevance to it.
+
         Args:
             questions: List of question-answer pairs
+            summary: The text the questions were generated from
+            top_k: Maximum questions to keep (default: all that pass)
 
         Returns:
             List[Dict]: List of validated questions
@@ -69,13 +320,28 @@ class QuestionGenerator:
         validated_questions = []
 
         for qa in questions:
-            # Basic validation rules
-            if (len(qa["question"].split()) >= 3 and  # Question should be at least 3 words
-                "?" in qa["question"] and  # Should end with question mark
-                len(qa["answer"].split()) >= 5):  # Answer should be at least 5 words
+            # Basic validation rules: a question of at least 3 words with a
+            # question mark, and an answer of at least 5 words
+            if self._well_formed(qa["question"]) and len(qa["answer"].split()) >= 5:
                 validated_questions.append(qa)
 
-        return validated_questions
+        if self.ranking and len(validated_questions) > 1:
+            try:
+                texts = [qa["question"] for qa in validated_questions] + ([summary] if summary else [])
+                with span("questions.embed", texts=len(texts)):
+                    vectors = embed_texts(texts)
+                question_vectors = vectors[:len(validated_questions)]
+                if summary:
+                    scores = question_vectors @ vectors[-1]
+                else:
+                    # Without a summary keep the original order
+                    scores = -np.arange(len(validated_questions), dtype=np.float32)
+                picked = select_diverse(question_vectors, scores, top_k, self.duplicate_threshold)
+                return [validated_questions[i] for i in picked]
+            except Exception as e:
+                print(f"Error ranking questions, keeping them unranked: {e}")
+
+        return validated_questions[:top_k] if top_k is not None else validated_questions
 
     def format_questions(self, questions: List[Dict]) -> str:
         """
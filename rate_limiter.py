@@ -0,0 +1,304 @@
+import asyncio
+import os
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+import httpx
+from notion_client.errors import RequestTimeoutError
+import instrumentation
+
+# HTTP statuses worth retrying: rate limiting and transient server errors
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+# Network failures that happen before the request is sent, so any call can be retried
+UNSENT_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+def is_retryable(error: Exception, idempotent: bool = True) -> bool:
+    """
+    Check whether a failed Notion call is worth retrying.
+
+    A call that creates something (a page, appended blocks) may already
+    have been carried out when a timeout or 5xx comes back, so repeating it
+    could create a duplicate. Such calls are only retried when Notion
+    rejected them (429) or the request never left this machine.
+
+    Args:
+        error: The exception raised by the call
+        idempotent: Whether repeating the call is harmless
+
+    Returns:
+        bool: True for rate limiting and unsent requests, and for an
+            idempotent call also transient server errors and other network
+            failures; False for errors such as 400, 401 or 404 that will not
+            go away by themselves
+    """
+    if getattr(error, "status", None) == 429:
+        return True
+    # notion_client reports every timeout as RequestTimeoutError, raised from the httpx error
+    if isinstance(error, UNSENT_ERRORS) or isinstance(error.__context__, UNSENT_ERRORS):
+        return True
+    if not idempotent:
+        return False
+    return (getattr(error, "status", None) in RETRYABLE_STATUSES
+            or isinstance(error, (RequestTimeoutError, httpx.TransportError)))
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        """
+        Initialize a thread-safe token bucket.
+
+        Callers reserve a token and are told how long to wait for it, so
+        the same bucket works for blocking threads and asyncio tasks.
+
+        Args:
+            rate: Tokens added per second
+            capacity: Maximum tokens that can accumulate (burst size)
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self) -> float:
+        """
+        Take one token, possibly from the future.
+
+        Returns:
+            float: Seconds the caller must wait before using the token
+        """
+        with self._lock:
+            self._refill()
+            self._tokens -= 1
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def pause(self, seconds: float) -> None:
+        """
+        Hold back every caller for the given time (e.g. after a Retry-After).
+
+        Pauses do not add up: several requests rate limited with the same
+        Retry-After hold the bucket back once, not once each.
+
+        Args:
+            seconds: How long no new tokens should be handed out
+        """
+        with self._lock:
+            self._refill()
+            self._tokens = min(self._tokens, -seconds * self.rate)
+
+
+class NotionRateLimiter:
+    def __init__(self, rate: float = 3.0, burst: float = 3.0, max_retries: int = 5,
+                 base_delay: float = 0.5, max_delay: float = 30.0):
+        """
+        Initialize a client-side limiter with retry and backoff.
+
+        Args:
+            rate: Requests per second allowed (Notion's limit is about 3)
+            burst: Requests that may be sent back to back after an idle period
+            max_retries: Retries per call before the error is raised
+            base_delay: First backoff delay in seconds, doubled on each retry
+            max_delay: Upper bound for a single backoff delay
+        """
+        self.bucket = TokenBucket(rate, burst)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+        self._metrics_lock = threading.Lock()
+        self._metrics = {
+            "calls": 0,
+            "throttle_waits": 0,
+            "throttle_wait_seconds": 0.0,
+            "retries": 0,
+            "retry_wait_seconds": 0.0,
+            "failures": 0,
+            "retries_by_status": {}
+        }
+
+    def call(self, fn: Callable, *args, idempotent: bool = True, **kwargs) -> Any:
+        """
+        Call fn under the rate limit, retrying transient failures.
+
+        Args:
+            fn: The client method to call
+            *args, **kwargs: Arguments for fn
+            idempotent: Whether repeating the call is harmless; pass False for
+                calls that create something (see is_retryable)
+
+        Returns:
+            The value returned by fn
+
+        Raises:
+            The last error, once it is not retryable or retries are exhausted
+        """
+        attempt = 0
+        while True:
+            self._record_wait(self.bucket.reserve(), time.sleep)
+            start = time.perf_counter()
+            try:
+                result = fn(*args, **kwargs)
+                self._record_request(fn, start)
+                return result
+            except Exception as e:
+                self._record_request(fn, start, e)
+                delay = self._retry_delay(e, attempt, idempotent)
+                if delay is None:
+                    raise
+                if delay:
+                    time.sleep(delay)
+                attempt += 1
+
+    async def call_async(self, fn: Callable, *args, idempotent: bool = True, **kwargs) -> Any:
+        """
+        Await fn(*args, **kwargs) under the rate limit, retrying transient failures.
+
+        Args:
+            fn: The async client method to call
+            *args, **kwargs: Arguments for fn
+            idempotent: Whether repeating the call is harmless; pass False for
+                calls that create something (see is_retryable)
+
+        Returns:
+            The value returned by the awaited call
+
+        Raises:
+            The last error, once it is not retryable or retries are exhausted
+        """
+        attempt = 0
+        while True:
+            wait = self.bucket.reserve()
+            self._record_wait(wait, None)
+            if wait:
+                await asyncio.sleep(wait)
+            start = time.perf_counter()
+            try:
+                result = await fn(*args, **kwargs)
+                self._record_request(fn, start)
+                return result
+            except Exception as e:
+                self._record_request(fn, start, e)
+                delay = self._retry_delay(e, attempt, idempotent)
+                if delay is None:
+                    raise
+                if delay:
+                    await asyncio.sleep(delay)
+                attempt += 1
+
+    def _record_wait(self, wait: float, sleep: Optional[Callable[[float], None]]) -> None:
+        """Count the call and any throttle wait, sleeping if a sleep function is given."""
+        with self._metrics_lock:
+            self._metrics["calls"] += 1
+            if wait:
+                self._metrics["throttle_waits"] += 1
+                self._metrics["throttle_wait_seconds"] += wait
+        if wait:
+            instrumentation.observe("notion_throttle_wait_seconds", wait, instrumentation.SECONDS_BUCKETS)
+        if wait and sleep:
+            sleep(wait)
+
+    @staticmethod
+    def _record_request(fn: Callable, start: float, error: Optional[Exception] = None) -> None:
+        """Record the HTTP latency of one attempt, labelled by endpoint and outcome."""
+        if not instrumentation.is_enabled():
+            return
+        # Bound endpoint methods, e.g. PagesEndpoint.create -> "pages.create"
+        owner = type(getattr(fn, "__self__", None)).__name__.replace("Endpoint", "").lower()
+        endpoint = f"{owner}.{getattr(fn, '__name__', 'call')}"
+        status = "ok" if error is None else str(getattr(error, "status", None) or type(error).__name__)
+        instrumentation.observe(
+            "notion_request_seconds", time.perf_counter() - start, instrumentation.SECONDS_BUCKETS,
+            endpoint=endpoint, status=status
+        )
+
+    def _retry_delay(self, error: Exception, attempt: int, idempotent: bool = True) -> Optional[float]:
+        """
+        Decide whether to retry a failed call and how long to wait.
+
+        Args:
+            error: The exception raised by the call
+            attempt: Number of retries already made
+            idempotent: Whether repeating the call is harmless
+
+        Returns:
+            Optional[float]: Seconds to wait, or None if the error should be raised
+        """
+        status = getattr(error, "status", None)
+        if not is_retryable(error, idempotent) or attempt >= self.max_retries:
+            with self._metrics_lock:
+                self._metrics["failures"] += 1
+            return None
+
+        retry_after = self._retry_after(error)
+        if retry_after is not None:
+            # Every caller sharing the bucket must back off, not just this one;
+            # the retry then waits for its token like any other request
+            self.bucket.pause(retry_after)
+            delay = 0.0
+        else:
+            # Exponential backoff with full jitter
+            delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+
+        with self._metrics_lock:
+            self._metrics["retries"] += 1
+            self._metrics["retry_wait_seconds"] += retry_after if retry_after is not None else delay
+            key = str(status) if status is not None else type(error).__name__
+            self._metrics["retries_by_status"][key] = self._metrics["retries_by_status"].get(key, 0) + 1
+        return delay
+
+    @staticmethod
+    def _retry_after(error: Exception) -> Optional[float]:
+        """Read the Retry-After header (in seconds) from an HTTP error, if any."""
+        headers = getattr(error, "headers", None)
+        if not headers:
+            return None
+        try:
+            return float(headers.get("retry-after"))
+        except (TypeError, ValueError):
+            return None
+
+    def metrics(self) -> Dict:
+        """
+        Get throttling and retry counters.
+
+        Returns:
+            Dict: Counts and total wait times since the limiter was created
+        """
+        with self._metrics_lock:
+            metrics = dict(self._metrics)
+            metrics["retries_by_status"] = dict(self._metrics["retries_by_status"])
+            return metrics
+
+
+_shared_limiter = None
+_shared_limiter_lock = threading.Lock()
+
+
+def get_shared_limiter() -> NotionRateLimiter:
+    """
+    Get the limiter shared by every NotionAPI instance in the process.
+
+    Configured from NOTION_RATE_LIMIT (requests per second) and
+    NOTION_MAX_RETRIES the first time it is requested.
+
+    Returns:
+        NotionRateLimiter: The process-wide limiter
+    """
+    global _shared_limiter
+    with _shared_limiter_lock:
+        if _shared_limiter is None:
+            rate = float(os.getenv("NOTION_RATE_LIMIT", "3"))
+            _shared_limiter = NotionRateLimiter(
+                rate=rate,
+                burst=rate,
+                max_retries=int(os.getenv("NOTION_MAX_RETRIES", "5"))
+            )
+        return _shared_limiter
@@ -0,0 +1,242 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import unicodedata
+from typing import Any, Dict, List, Optional, Tuple
+from instrumentation import increment
+
+# Default location and size of the on-disk cache
+DEFAULT_CACHE_PATH = ".learning_cache.sqlite3"
+DEFAULT_CACHE_MAX_MB = 256
+
+# Eviction frees space down to this fraction of max_bytes, so it runs rarely
+EVICTION_LOW_WATER = 0.9
+
+# Cache hits whose access times are written to the database in one go
+TOUCH_BATCH_SIZE = 64
+
+
+class ResultCache:
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_bytes: int = DEFAULT_CACHE_MAX_MB * 1024 ** 2):
+        """
+        Initialize a persistent, size-bounded cache of generated results.
+
+        The cache is a SQLite database in WAL mode, so several Streamlit
+        sessions (threads or processes) can read and write it at once. The
+        total size is kept in a one-row table, so writes do not scan the
+        cache, and access times of hits are written in batches.
+
+        Args:
+            path: Path of the SQLite database file
+            max_bytes: Total size of cached values before LRU eviction starts
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self._local = threading.local()
+        self._counter_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        # Access times of recent hits, not yet written to the database
+        self._touches: Dict[str, float] = {}
+
+        with self._connection() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    namespace TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_access REAL NOT NULL
+                )
+                """
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_last_access ON entries (last_access)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS usage (id INTEGER PRIMARY KEY CHECK (id = 0), total INTEGER NOT NULL)"
+            )
+            # Seeded once from the entries, e.g. for a cache created before the table existed
+            conn.execute("INSERT OR IGNORE INTO usage (id, total) SELECT 0, COALESCE(SUM(size), 0) FROM entries")
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    @staticmethod
+    def make_key(namespace: str, content: str, model: str, params: Dict) -> str:
+        """
+        Build a content-addressed cache key.
+
+        Args:
+            namespace: Kind of result (e.g. "summary", "questions")
+            content: The input text; whitespace and Unicode form are normalized
+            model: Model name and version that produced the result
+            params: Generation parameters that affect the result
+
+        Returns:
+            str: Hex SHA-256 digest identifying the result
+        """
+        normalized = " ".join(unicodedata.normalize("NFC", content).split())
+        payload = json.dumps(
+            {"namespace": namespace, "content": normalized, "model": model, "params": params},
+            sort_keys=True
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Any]:
+        """
+        Look up a cached result and mark it as recently used.
+
+        Args:
+            key: A key from make_key
+
+        Returns:
+            The cached value, or None on a miss
+        """
+        conn = self._connection()
+        row = conn.execute("SELECT value FROM entries WHERE key = ?", (key,)).fetchone()
+        increment("result_cache_lookups", outcome="miss" if row is None else "hit")
+        with self._counter_lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            # Access times are written in batches rather than on every hit
+            self._touches[key] = time.time()
+            touches = self._take_touches() if len(self._touches) >= TOUCH_BATCH_SIZE else []
+
+        if touches:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                conn.executemany("UPDATE entries SET last_access = ? WHERE key = ?", touches)
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+        return json.loads(row[0])
+
+    def _take_touches(self) -> List[Tuple[float, str]]:
+        """Return and forget the pending access times; call with _counter_lock held."""
+        touches = [(accessed, key) for key, accessed in self._touches.items()]
+        self._touches.clear()
+        return touches
+
+    def set(self, key: str, value: Any, namespace: str = "") -> None:
+        """
+        Store a result and evict least recently used entries over the size bound.
+
+        Args:
+            key: A key from make_key
+            value: A JSON-serializable result
+            namespace: Kind of result, kept for inspection and clearing
+        """
+        data = json.dumps(value)
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            previous = conn.execute("SELECT size FROM entries WHERE key = ?", (key,)).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, namespace, value, size, last_access) VALUES (?, ?, ?, ?, ?)",
+                (key, namespace, data, len(data), time.time())
+            )
+            conn.execute(
+                "UPDATE usage SET total = total + ? WHERE id = 0",
+                (len(data) - (previous[0] if previous else 0),)
+            )
+            if conn.execute("SELECT total FROM usage WHERE id = 0").fetchone()[0] > self.max_bytes:
+                self._evict(conn)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        """Delete the least recently used entries until the cache is below its low-water mark."""
+        with self._counter_lock:
+            touches = self._take_touches()
+        conn.executemany("UPDATE entries SET last_access = ? WHERE key = ?", touches)
+
+        total = conn.execute("SELECT total FROM usage WHERE id = 0").fetchone()[0]
+        target = int(self.max_bytes * EVICTION_LOW_WATER)
+        stale = []
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY last_access"):
+            if total <= target:
+                break
+            stale.append((key,))
+            total -= size
+        conn.executemany("DELETE FROM entries WHERE key = ?", stale)
+        conn.execute("UPDATE usage SET total = ? WHERE id = 0", (total,))
+
+    def clear(self, namespace: Optional[str] = None) -> None:
+        """
+        Remove cached results.
+
+        Args:
+            namespace: Only remove results of this kind (default: everything)
+        """
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            if namespace is None:
+                conn.execute("DELETE FROM entries")
+            else:
+                conn.execute("DELETE FROM entries WHERE namespace = ?", (namespace,))
+            conn.execute("UPDATE usage SET total = (SELECT COALESCE(SUM(size), 0) FROM entries) WHERE id = 0")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def stats(self) -> Dict:
+        """
+        Get cache usage statistics.
+
+        Returns:
+            Dict: Hit/miss counters for this process and the cache's size
+        """
+        conn = self._connection()
+        entries = conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        size = conn.execute("SELECT total FROM usage WHERE id = 0").fetchone()[0]
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0,
+            "entries": entries,
+            "size_bytes": size
+        }
+
+
+_default_cache = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache() -> Optional[ResultCache]:
+    """
+    Get the process-wide cache configured from the environment.
+
+    RESULT_CACHE_PATH sets the database file (empty disables caching) and
+    RESULT_CACHE_MAX_MB its size bound.
+
+    Returns:
+        Optional[ResultCache]: The shared cache, or None if disabled
+    """
+    global _default_cache
+    path = os.getenv("RESULT_CACHE_PATH", DEFAULT_CACHE_PATH)
+    if not path:
+        return None
+
+    with _default_cache_lock:
+        if _default_cache is None or _default_cache.path != path:
+            max_mb = float(os.getenv("RESULT_CACHE_MAX_MB", str(DEFAULT_CACHE_MAX_MB)))
+            _default_cache = ResultCache(path, int(max_mb * 1024 ** 2))
+        return _default_cache
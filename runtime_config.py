@@ -0,0 +1,266 @@
+import argparse
+import json
+import os
+import time
+from dataclasses import asdict, dataclass
+from typing import Dict, List, Optional
+
+# Worker layouts: one worker using every core, or many single-threaded workers
+SINGLE = "single"
+MULTI = "multi"
+
+# Text summarized by the layout benchmark
+BENCHMARK_TEXT = (
+    "Python is a high-level, interpreted programming language known for its simplicity and readability. "
+    "It was created by Guido van Rossum and first released in 1991. Python supports multiple programming "
+    "paradigms, including procedural, object-oriented, and functional programming. Its design philosophy "
+    "emphasizes code readability with its notable use of significant whitespace. Python features a dynamic "
+    "type system and automatic memory management. It has a comprehensive standard library and is often "
+    "called a batteries included language. Python is widely used in web development, data analysis, "
+    "artificial intelligence, scientific computing, and automation."
+)
+
+# Whether apply_torch_threads has run in this process
+_threads_applied = False
+
+# Whether this process runs inference next to its own worker pool (the Streamlit server)
+_shares_cores_with_pool = False
+
+
+@dataclass
+class RuntimeConfig:
+    """How inference work is spread over processes and threads."""
+    layout: str
+    workers: int
+    threads_per_worker: int
+    interop_threads: int
+    # Threads for inference in the process that owns the worker pool (e.g. streaming in the UI)
+    ui_threads: int = 0
+
+
+def detect_cores() -> int:
+    """
+    Count the CPU cores this process may run on.
+
+    Returns:
+        int: Cores in the affinity mask (respects taskset/cgroup pinning)
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def load_runtime_config(layout: Optional[str] = None, workers: Optional[int] = None,
+                        threads: Optional[int] = None) -> RuntimeConfig:
+    """
+    Build the runtime configuration from arguments, the environment and the core count.
+
+    INFERENCE_LAYOUT chooses "single" (one worker with every core) or
+    "multi" (one single-threaded worker per core). INFERENCE_WORKERS and
+    TORCH_NUM_THREADS override either count, and TORCH_NUM_INTEROP_THREADS
+    sets inter-op threads (default 1).
+
+    The process that owns the pool can run inference too (the Streamlit
+    server streams short summaries itself), so the cores are one budget:
+    INFERENCE_UI_THREADS (default half the cores for "single", one for
+    "multi") are kept for that process and the workers share the rest.
+
+    Args:
+        layout: Overrides INFERENCE_LAYOUT
+        workers: Overrides INFERENCE_WORKERS
+        threads: Overrides TORCH_NUM_THREADS
+
+    Returns:
+        RuntimeConfig: The resolved configuration
+    """
+    cores = detect_cores()
+    layout = layout or os.getenv("INFERENCE_LAYOUT", SINGLE)
+    if layout not in (SINGLE, MULTI):
+        raise ValueError(f"Unknown inference layout: {layout}")
+
+    workers = workers or int(os.getenv("INFERENCE_WORKERS", "0"))
+    threads = threads or int(os.getenv("TORCH_NUM_THREADS", "0"))
+
+    ui_threads = int(os.getenv("INFERENCE_UI_THREADS", "0"))
+
+    if layout == SINGLE:
+        workers = workers or 1
+        ui_threads = ui_threads or max(1, cores // 2)
+        threads = threads or max(1, (cores - ui_threads) // workers)
+    else:
+        ui_threads = ui_threads or 1
+        threads = threads or 1
+        workers = workers or max(1, (cores - ui_threads) // threads)
+
+    return RuntimeConfig(
+        layout=layout,
+        workers=workers,
+        threads_per_worker=threads,
+        interop_threads=int(os.getenv("TORCH_NUM_INTEROP_THREADS", "1")),
+        ui_threads=ui_threads
+    )
+
+
+def apply_torch_threads(threads: int, interop_threads: int = 1) -> None:
+    """
+    Set PyTorch's intra-op and inter-op thread counts for this process.
+
+    Args:
+        threads: Threads used inside each operator (matrix multiplies etc.)
+        interop_threads: Threads used to run independent operators
+    """
+    global _threads_applied
+    import torch
+
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(interop_threads)
+    except RuntimeError:
+        # Can only be set once, before any parallel work has started
+        pass
+    _threads_applied = True
+
+
+def ensure_configured() -> None:
+    """
+    Apply the runtime configuration unless thread counts were already set.
+
+    Called before the first model load, so processes that never load a
+    model never import torch. Worker processes whose initializer already
+    set their threads keep those settings.
+    """
+    if not _threads_applied:
+        configure_process()
+
+
+def share_cores_with_pool() -> None:
+    """
+    Mark this process as the owner of a worker pool that also runs inference itself.
+
+    Its own models then use ui_threads instead of threads_per_worker, so
+    it and the workers together stay within the machine's cores. Call it
+    before the first model load in this process.
+    """
+    global _shares_cores_with_pool
+    _shares_cores_with_pool = True
+
+
+def configure_process(config: Optional[RuntimeConfig] = None) -> RuntimeConfig:
+    """
+    Apply the runtime configuration to the current process.
+
+    Args:
+        config: The configuration (default: load_runtime_config())
+
+    Returns:
+        RuntimeConfig: The applied configuration
+    """
+    config = config or load_runtime_config()
+    threads = config.ui_threads if _shares_cores_with_pool and config.ui_threads else config.threads_per_worker
+    apply_torch_threads(threads, config.interop_threads)
+    return config
+
+
+def _benchmark_job(text: str) -> float:
+    """Summarize text once in a worker and return the model time in seconds."""
+    # Measure the model, not the result cache
+    os.environ["RESULT_CACHE_PATH"] = ""
+    from summaries import SummaryGenerator
+
+    start = time.perf_counter()
+    SummaryGenerator().generate_summary(text)
+    return time.perf_counter() - start
+
+
+def candidate_layouts(cores: Optional[int] = None) -> List[RuntimeConfig]:
+    """
+    List worker x thread splits of the machine's cores worth benchmarking.
+
+    Args:
+        cores: Core count (default: detect_cores())
+
+    Returns:
+        List[RuntimeConfig]: From one worker with every core to one worker per core
+    """
+    cores = cores or detect_cores()
+    layouts = []
+    threads = cores
+    while threads >= 1:
+        workers = max(1, cores // threads)
+        layout = SINGLE if workers == 1 else MULTI
+        layouts.append(RuntimeConfig(layout, workers, threads, 1))
+        threads //= 2
+    return layouts
+
+
+def benchmark_layouts(requests: int = 16, text: str = BENCHMARK_TEXT,
+                      layouts: Optional[List[RuntimeConfig]] = None) -> List[Dict]:
+    """
+    Measure summarization throughput for each worker layout.
+
+    Each layout gets a fresh worker pool; every worker is warmed up (model
+    loaded) before the timed run of `requests` summaries.
+
+    Args:
+        requests: Summaries to run per layout
+        text: Text to summarize
+        layouts: Layouts to try (default: candidate_layouts())
+
+    Returns:
+        List[Dict]: One entry per layout with throughput and latency, best first
+    """
+    from jobs import JobRunner
+
+    results = []
+    for config in layouts or candidate_layouts():
+        runner = JobRunner(
+            max_workers=config.workers,
+            max_pending=requests + config.workers,
+            initializer=apply_torch_threads,
+            initargs=(config.threads_per_worker, config.interop_threads)
+        )
+        try:
+            runner_jobs = [runner.submit(_benchmark_job, text) for _ in range(config.workers)]
+            _wait_for(runner, runner_jobs)
+
+            start = time.perf_counter()
+            runner_jobs = [runner.submit(_benchmark_job, text) for _ in range(requests)]
+            latencies = _wait_for(runner, runner_jobs)
+            elapsed = time.perf_counter() - start
+        finally:
+            runner.shutdown()
+
+        results.append(dict(
+            asdict(config),
+            requests=requests,
+            seconds=elapsed,
+            throughput=requests / elapsed,
+            mean_latency=sum(latencies) / len(latencies)
+        ))
+
+    return sorted(results, key=lambda result: result["throughput"], reverse=True)
+
+
+def _wait_for(runner, job_ids: List[str]) -> List:
+    """Block until the jobs finish and return their results."""
+    from jobs import CANCELLED, DONE, FAILED
+
+    while any(runner.status(job_id) not in (DONE, FAILED, CANCELLED) for job_id in job_ids):
+        time.sleep(0.05)
+    return [runner.result(job_id) for job_id in job_ids]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show or benchmark the inference runtime configuration.")
+    parser.add_argument("--benchmark", action="store_true", help="Compare worker/thread layouts")
+    parser.add_argument("--requests", type=int, default=16, help="Summaries per layout")
+    args = parser.parse_args()
+
+    if args.benchmark:
+        for result in benchmark_layouts(args.requests):
+            print(
+                f"{result['workers']:>3} workers x {result['threads_per_worker']:>3} threads: "
+                f"{result['throughput']:.2f} summaries/s, {result['mean_latency']:.2f}s mean latency"
+            )
+    else:
+        print(json.dumps(asdict(load_runtime_config()), indent=2))
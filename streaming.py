@@ -0,0 +1,50 @@
+import threading
+from typing import Iterator
+from model_registry import registry
+
+
+def stream_generate(pipe, text: str, **generate_kwargs) -> Iterator[str]:
+    """
+    Generate text with a pipeline's model and yield it piece by piece as it is decoded.
+
+    Generation runs on a background thread and feeds a TextIteratorStreamer.
+    Beam search cannot stream, so decoding is greedy (num_beams=1) and the
+    output can differ slightly from the pipeline's non-streaming result.
+
+    Args:
+        pipe: A loaded summarization or text2text-generation pipeline
+        text: The model input (including any task prompt)
+        **generate_kwargs: Arguments for model.generate (max_new_tokens, min_length, ...)
+
+    Yields:
+        str: Decoded text, in the order it is generated
+
+    Raises:
+        Exception: Any error raised by generation, once the stream ends
+    """
+    from transformers import TextIteratorStreamer
+
+    tokenizer = pipe.tokenizer
+    with registry.usage_lock(pipe):
+        inputs = tokenizer(text, return_tensors="pt", truncation=True).to(pipe.device)
+    streamer = TextIteratorStreamer(tokenizer, skip_prompt=True, skip_special_tokens=True)
+
+    errors = []
+
+    def generate():
+        try:
+            pipe.model.generate(**inputs, streamer=streamer, **dict(generate_kwargs, num_beams=1, do_sample=False))
+        except Exception as e:
+            errors.append(e)
+            # Unblock the consumer, which is waiting on the streamer
+            streamer.end()
+
+    thread = threading.Thread(target=generate, name="stream-generate", daemon=True)
+    thread.start()
+    for piece in streamer:
+        if piece:
+            yield piece
+    thread.join()
+
+    if errors:
+        raise errors[0]
@@ -1,120 +1,571 @@
-from transformers import pipeline
-from typing import Optional, Tuple
-import torch
+import os
+from itertools import islice
+from typing import Callable, Iterator, List, Optional, Tuple
+from chunking import count_tokens, iter_token_chunks
+from confirmation import Confirmer, default_confirmer
+from inference_backends import backend_from_env
+from jobs import JobCancelled
+from instrumentation import increment, observe, span, traced
+from model_registry import SUMMARY_MODEL, registry
+from result_cache import ResultCache, get_default_cache
+from streaming import stream_generate
+
+# Progress hook for long summaries: (level, completed, total)
+ProgressCallback = Callable[[int, int, Optional[int]], None]
+
+
+class _LockedTokenizer:
+    """Tokenizer proxy that holds the pipeline's usage lock for each call only."""
+
+    def __init__(self, tokenizer, lock):
+        self._tokenizer = tokenizer
+        self._lock = lock
+
+    def __call__(self, *args, **kwargs):
+        with self._lock:
+            return self._tokenizer(*args, **kwargs)
+
+    def num_special_tokens_to_add(self, *args, **kwargs) -> int:
+        with self._lock:
+            return self._tokenizer.num_special_tokens_to_add(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._tokenizer, name)
+
 
 class SummaryGenerator:
-    def __init__(self):
-        """Initialize the summary generator with a pre-trained model."""
-        # Force CPU usage to avoid device switching issues
-        self.summarizer = pipeline(
-            "summarization",
-            model="facebook/bart-large-cnn",
-            device=-1  # Force CPU
-        )
+    def __init__(self, model_name: str = SUMMARY_MODEL[1], cache: Optional[ResultCache] = None,
+                 backend: Optional[str] = None):
+        """
+        Initialize the summary generator with a pre-trained model.
 
-    def generate_summary(self, text: str, max_length: int = 200) -> Tuple[str, bool]:
+        Args:
+            model_name: The summarization model to use
+            cache: Result cache (default: the shared on-disk cache, if enabled)
+            backend: Inference backend (default: SUMMARY_BACKEND, or fp32 PyTorch)
+        """
+        # Force CPU usage to avoid device switching issues; the registry
+        # loads the model once per process and shares it between instances
+        self.model_name = model_name
+        self.backend = backend or backend_from_env("SUMMARY_BACKEND")
+        self.summarizer = registry.get(SUMMARY_MODEL[0], model_name, device=-1, backend=self.backend)
+        self.model_version = registry.model_version(self.summarizer)
+        self.cache = cache if cache is not None else get_default_cache()
+        # The pipeline (and its tokenizer) may be shared with other threads; the
+        # lock is held per tokenizer or model call, so requests interleave
+        self._model_lock = registry.usage_lock(self.summarizer)
+        self._tokenizer = _LockedTokenizer(self.summarizer.tokenizer, self._model_lock)
+
+        # Upper bounds for batched generation: chunks per batch and padded tokens per batch
+        self.max_batch_size = int(os.getenv("SUMMARY_BATCH_SIZE", "8"))
+        self.max_batch_tokens = int(os.getenv("SUMMARY_BATCH_TOKENS", "8192"))
+
+        # Chunk size in tokens (0 means the model's own limit) and overlap between chunks
+        self.chunk_tokens = int(os.getenv("SUMMARY_CHUNK_TOKENS", "0"))
+        self.chunk_overlap_tokens = int(os.getenv("SUMMARY_CHUNK_OVERLAP", "0"))
+
+        # Average sentences between content-defined chunk boundaries (0 packs
+        # chunks full); anchored boundaries survive edits, so unchanged chunks
+        # are found in the chunk summary cache
+        self.chunk_anchor_every = int(os.getenv("SUMMARY_CHUNK_ANCHOR_EVERY", "8"))
+
+        # Batches of chunks read from the chunker at a time in hierarchical mode
+        self.window_batches = int(os.getenv("SUMMARY_WINDOW_BATCHES", "2"))
+
+    @traced("summary.generate")
+    def generate_summary(self, text: str, max_length: int = 200, hierarchical: bool = False,
+                         progress_callback: Optional[ProgressCallback] = None) -> Tuple[str, bool]:
         """
         Generate a summary of the input text.
 
         Args:
             text: The text to summarize
             max_length: Maximum length of the summary in words
+            hierarchical: Reduce chunk summaries in a tree (for book-length inputs)
+            progress_callback: Called as (level, completed, total) as chunks are
+                summarized; raising JobCancelled from it stops the summary
 
         Returns:
             Tuple[str, bool]: The generated summary and a flag indicating if it's within the word limit
+
+        Raises:
+            JobCancelled: If progress_callback cancelled the job
         """
         try:
             # Ensure minimum input length
             if len(text.split()) < 10:
                 return "Input text is too short for summarization. Please provide more content.", False
 
-            # Split text into chunks if it's too long
-            chunks = self._split_text(text)
-            summaries = []
-
-            for chunk in chunks:
-                # Calculate appropriate max_length for the chunk
-                chunk_length = len(chunk.split())
-                # More aggressive summarization - target 1/3 of the original length
-                chunk_max_length = min(max_length // len(chunks), max(30, chunk_length // 3))
-
-                summary = self.summarizer(
-                    chunk,
-                    max_new_tokens=chunk_max_length,
-                    min_length=min(30, chunk_max_length // 2),
-                    do_sample=False
-                )
-                summaries.append(summary[0]['summary_text'])
-
-            final_summary = " ".join(summaries)
-            word_count = len(final_summary.split())
-
-            # If still too long, do a final pass
-            if word_count > max_length:
+            cache_key = self._cache_key(text, max_length, hierarchical)
+            if self.cache is not None:
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    return cached["summary"], cached["within_limit"]
+
+            if hierarchical:
+                final_summary = self._summarize_hierarchical(text, max_length, progress_callback)
+            else:
+                final_summary = self._summarize_single_pass(text, max_length, progress_callback)
+
+            within_limit = len(final_summary.split()) <= max_length
+            if self.cache is not None and final_summary:
+                self.cache.set(cache_key, {"summary": final_summary, "within_limit": within_limit}, "summary")
+
+            return final_summary, within_limit
+
+        except JobCancelled:
+            raise
+        except Exception as e:
+            print(f"Error generating summary: {e}")
+            return "", False
+
+    def _summarize_single_pass(self, text: str, max_length: int,
+                               progress_callback: Optional[ProgressCallback] = None) -> str:
+        """
+        Summarize every chunk, then do one final pass if the result is too long.
+
+        Args:
+            text: The text to summarize
+            max_length: Maximum length of the summary in words
+            progress_callback: Called as (0, completed, total) after each
+                window of chunks and (1, 1, 1) after the final pass
+
+        Returns:
+            str: The final summary
+        """
+        # Split text into chunks if it's too long
+        requests = self._chunk_requests(list(self._split_text(text)), max_length)
+
+        # Summarize a window of batches at a time, so progress (and cancellation) is reported
+        window_size = self.window_batches * self.max_batch_size
+        summaries = []
+        for start in range(0, len(requests), window_size):
+            summaries.extend(self._summarize_batch(requests[start:start + window_size]))
+            if progress_callback:
+                progress_callback(0, len(summaries), len(requests))
+        final_summary = " ".join(summaries)
+
+        # If still too long, do a final pass
+        if len(final_summary.split()) > max_length:
+            with span("summary.model", stage="final", batch_size=1, max_new_tokens=max_length), self._model_lock:
                 final_summary = self.summarizer(
                     final_summary,
                     max_new_tokens=max_length,
                     min_length=max_length // 2,
-                    do_sample=False
+                    do_sample=False,
+                    truncation=True
                 )[0]['summary_text']
-                word_count = len(final_summary.split())
+            if progress_callback:
+                progress_callback(1, 1, 1)
 
-            return final_summary, word_count <= max_length
+        return final_summary
+
+    def _summarize_chunks(self, chunks: List[str], max_length: int) -> List[str]:
+        """
+        Summarize chunks in batches.
+
+        Args:
+            chunks: The chunks of the input text
+            max_length: Maximum length of the summary in words
+
+        Returns:
+            List[str]: One summary per chunk
+        """
+        return self._summarize_batch(self._chunk_requests(chunks, max_length))
+
+    def _chunk_requests(self, chunks: List[str], max_length: int) -> List[Tuple[str, int, int]]:
+        """
+        Build the (chunk, max_new_tokens, min_length) requests for one text's chunks.
+
+        Each chunk's budget depends on the chunk alone, so an edit elsewhere
+        in the text (or one more chunk) leaves its cached summary valid; the
+        final pass brings the joined summaries down to max_length.
+
+        Args:
+            chunks: The chunks of the input text
+            max_length: Maximum length of the summary in words
+
+        Returns:
+            List[Tuple[str, int, int]]: One request per chunk
+        """
+        return [self._map_request(chunk, max_length) for chunk in chunks]
+
+    @traced("summary.generate_batch")
+    def generate_summaries(self, texts: List[str], max_length: int = 200) -> List[Tuple[str, bool]]:
+        """
+        Summarize several texts, batching chunks from all of them together.
+
+        Gives the same results as calling generate_summary on each text
+        (single pass), with fewer and fuller forward passes.
+
+        Args:
+            texts: The texts to summarize
+            max_length: Maximum length of each summary in words
+
+        Returns:
+            List[Tuple[str, bool]]: (summary, within word limit) per text
+        """
+        results: List[Optional[Tuple[str, bool]]] = [None] * len(texts)
+        pending = []
+        for index, text in enumerate(texts):
+            if len(text.split()) < 10:
+                results[index] = ("Input text is too short for summarization. Please provide more content.", False)
+                continue
+            cache_key = self._cache_key(text, max_length, False)
+            cached = self.cache.get(cache_key) if self.cache is not None else None
+            if cached is not None:
+                results[index] = (cached["summary"], cached["within_limit"])
+            else:
+                pending.append((index, cache_key))
+
+        if not pending:
+            return results
+
+        try:
+            # Map the chunks of every pending text in one set of batches
+            owners, requests = [], []
+            for index, _ in pending:
+                for request in self._chunk_requests(list(self._split_text(texts[index])), max_length):
+                    owners.append(index)
+                    requests.append(request)
+
+            parts = {index: [] for index, _ in pending}
+            for index, summary in zip(owners, self._summarize_batch(requests)):
+                parts[index].append(summary)
+            summaries = {index: " ".join(chunk_summaries) for index, chunk_summaries in parts.items()}
+
+            # Final pass, batched too, for the texts whose summaries are still too long
+            too_long = [index for index, summary in summaries.items() if len(summary.split()) > max_length]
+            if too_long:
+                final_requests = [(summaries[index], max_length, max_length // 2) for index in too_long]
+                for index, summary in zip(too_long, self._summarize_batch(final_requests)):
+                    summaries[index] = summary
+
+        except JobCancelled:
+            raise
+        except Exception as e:
+            # One bad text should not sink the batch; fall back to one text at a time
+            print(f"Error generating summaries in a batch, retrying one by one: {e}")
+            for index, _ in pending:
+                results[index] = self.generate_summary(texts[index], max_length)
+            return results
+
+        for index, cache_key in pending:
+            summary = summaries[index]
+            within_limit = len(summary.split()) <= max_length
+            results[index] = (summary, within_limit)
+            if self.cache is not None and summary:
+                self.cache.set(cache_key, {"summary": summary, "within_limit": within_limit}, "summary")
+        return results
+
+    def stream_summary(self, text: str, max_length: int = 200) -> Iterator[str]:
+        """
+        Generate a summary of the input text, yielding it as it is decoded.
+
+        Single-chunk inputs stream from the first token. Longer inputs
+        summarize their chunks in batches first and stream the final pass.
+        Streaming uses greedy decoding, so the summary can differ slightly
+        from generate_summary; a cached summary is yielded whole.
+
+        Args:
+            text: The text to summarize
+            max_length: Maximum length of the summary in words
+
+        Yields:
+            str: Pieces of the summary; joined, they form the full summary
+        """
+        try:
+            # Ensure minimum input length
+            if len(text.split()) < 10:
+                yield "Input text is too short for summarization. Please provide more content."
+                return
+
+            cache_key = self._cache_key(text, max_length, False)
+            if self.cache is not None:
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    yield cached["summary"]
+                    return
+
+            # Locks are taken per model call and never held while yielding,
+            # so an abandoned stream cannot keep other requests waiting
+            chunks = list(self._split_text(text))
+            if len(chunks) > 1:
+                source = " ".join(self._summarize_chunks(chunks, max_length))
+            if len(chunks) == 1:
+                chunk_length = len(chunks[0].split())
+                source = chunks[0]
+                max_new_tokens = min(max_length, max(30, chunk_length // 3))
+                min_length = min(30, max_new_tokens // 2)
+            else:
+                if len(source.split()) <= max_length:
+                    yield source
+                    return
+                max_new_tokens = max_length
+                min_length = max_length // 2
+
+            yield from stream_generate(
+                self.summarizer,
+                source,
+                max_new_tokens=max_new_tokens,
+                min_length=min_length
+            )
 
         except Exception as e:
             print(f"Error generating summary: {e}")
-            return "", False
 
-    def _split_text(self, text: str, chunk_size: int = 512) -> list:
+    def _cache_key(self, text: str, max_length: int, hierarchical: bool) -> str:
+        """Key a summary by its content, model version and every setting that shapes it."""
+        return ResultCache.make_key("summary", text, self.model_version, {
+            "backend": self.backend,
+            "max_length": max_length,
+            "hierarchical": hierarchical,
+            "chunk_tokens": self.chunk_tokens,
+            "chunk_overlap_tokens": self.chunk_overlap_tokens,
+            "chunk_anchor_every": self.chunk_anchor_every
+        })
+
+    def _chunk_cache_key(self, request: Tuple[str, int, int]) -> str:
+        """Key a chunk summary by the chunk, model version and generation parameters."""
+        chunk, max_new_tokens, min_length = request
+        return ResultCache.make_key("chunk_summary", chunk, self.model_version, {
+            "backend": self.backend,
+            "max_new_tokens": max_new_tokens,
+            "min_length": min_length
+        })
+
+    def _summarize_hierarchical(self, text: str, max_length: int,
+                                progress_callback: Optional[ProgressCallback] = None) -> str:
         """
-        Split text into smaller chunks for processing.
+        Summarize text with a map pass over chunks and tree-shaped reduce passes.
+
+        Chunks are read from the streaming chunker one window at a time, so
+        only a window of chunks and the running list of summaries are held in
+        memory. Each level packs the previous summaries into model-sized
+        groups and summarizes the groups in batches until the result fits the
+        word budget.
 
         Args:
-            text: The text to split
-            chunk_size: Maximum size of each chunk
+            text: The text to summarize
+            max_length: Maximum length of the summary in words
+            progress_callback: Called as (level, completed, total); total is
+                None for the map level because chunks are streamed
+
+        Returns:
+            str: The final summary
+        """
+        window_size = self.window_batches * self.max_batch_size
+        summaries = []
+
+        # Level 0: map every chunk to a summary, one window at a time
+        chunks = self._split_text(text)
+        while True:
+            window = list(islice(chunks, window_size))
+            if not window:
+                break
+            summaries.extend(self._summarize_batch([self._map_request(chunk, max_length) for chunk in window]))
+            if progress_callback:
+                progress_callback(0, len(summaries), None)
+
+        # Reduce levels: summarize groups of summaries until the budget is met
+        level = 1
+        while len(" ".join(summaries).split()) > max_length:
+            groups = self._pack_summaries(summaries)
+
+            # One group left (or no progress possible): do the final pass
+            if len(groups) == 1 or len(groups) >= len(summaries):
+                with span("summary.model", stage="final", batch_size=1, max_new_tokens=max_length), \
+                        self._model_lock:
+                    summaries = [self.summarizer(
+                        " ".join(summaries),
+                        max_new_tokens=max_length,
+                        min_length=max_length // 2,
+                        do_sample=False,
+                        truncation=True
+                    )[0]['summary_text']]
+                if progress_callback:
+                    progress_callback(level, 1, 1)
+                break
+
+            summaries = self._summarize_batch([self._map_request(group, max_length) for group in groups])
+            if progress_callback:
+                progress_callback(level, len(summaries), len(groups))
+            level += 1
+
+        return " ".join(summaries)
+
+    def _map_request(self, chunk: str, max_length: int) -> Tuple[str, int, int]:
+        """
+        Build the (chunk, max_new_tokens, min_length) request for a chunk or tree node.
+
+        The budget does not depend on the number of chunks, which would
+        shrink it to nothing for book-length inputs and tie every chunk's
+        cache key to the length of the whole text.
+        """
+        # More aggressive summarization - target 1/3 of the original length
+        chunk_max_length = min(max_length, max(30, len(chunk.split()) // 3))
+        return chunk, chunk_max_length, min(30, chunk_max_length // 2)
+
+    def _pack_summaries(self, summaries: List[str]) -> List[str]:
+        """
+        Join consecutive summaries into groups that fit the model's input.
+
+        Args:
+            summaries: Summaries from the previous level, in document order
+
+        Returns:
+            List[str]: Joined groups, in document order
+        """
+        tokenizer = self._tokenizer
+        max_tokens = self.chunk_tokens or min(tokenizer.model_max_length, 1024)
+        budget = max_tokens - tokenizer.num_special_tokens_to_add()
+
+        groups = []
+        current, current_tokens = [], 0
+        for summary in summaries:
+            tokens = count_tokens(tokenizer, summary)
+            if current and current_tokens + tokens > budget:
+                groups.append(" ".join(current))
+                current, current_tokens = [], 0
+            current.append(summary)
+            current_tokens += tokens
+
+        if current:
+            groups.append(" ".join(current))
+        return groups
+
+    def _summarize_batch(self, requests: List[Tuple[str, int, int]]) -> List[str]:
+        """
+        Summarize several chunks, reusing cached summaries of unchanged chunks.
+
+        Each chunk summary is cached under the chunk's content and generation
+        parameters, so re-summarizing an edited document only runs the model
+        on the chunks that changed.
+
+        Args:
+            requests: List of (chunk, max_new_tokens, min_length) tuples
+
+        Returns:
+            List[str]: One summary per request, in the original order
+        """
+        if self.cache is None:
+            return self._generate_batch(requests)
+
+        keys = [self._chunk_cache_key(request) for request in requests]
+        summaries: List[Optional[str]] = [self.cache.get(key) for key in keys]
+        missing = [index for index, summary in enumerate(summaries) if summary is None]
+        increment("summary_chunks", len(requests) - len(missing), outcome="cached")
+        increment("summary_chunks", len(missing), outcome="generated")
+
+        if missing:
+            generated = self._generate_batch([requests[index] for index in missing])
+            for index, summary in zip(missing, generated):
+                summaries[index] = summary
+                if summary:
+                    self.cache.set(keys[index], summary, "chunk_summary")
+        return summaries
+
+    def _generate_batch(self, requests: List[Tuple[str, int, int]]) -> List[str]:
+        """
+        Summarize several chunks with as few forward passes as possible.
+
+        Chunks that share the same length budget are generated together in
+        padded batches, so each chunk gets exactly the generation parameters
+        it would get when summarized on its own.
+
+        Args:
+            requests: List of (chunk, max_new_tokens, min_length) tuples
 
         Returns:
-            list: List of text chunks
+            List[str]: One summary per request, in the original order
         """
-        words = text.split()
-        chunks = []
-        current_chunk = []
-        current_size = 0
+        tokenizer = self._tokenizer
+        with span("summary.tokenize", chunks=len(requests)) as current:
+            token_counts = [
+                len(tokenizer(chunk, truncation=True)["input_ids"]) for chunk, _, _ in requests
+            ]
+            current.set("tokens", sum(token_counts))
 
-        for word in words:
-            current_chunk.append(word)
-            current_size += len(word) + 1  # +1 for space
+        # Group request indices by identical generation parameters
+        groups = {}
+        for index, (_, max_new_tokens, min_length) in enumerate(requests):
+            groups.setdefault((max_new_tokens, min_length), []).append(index)
 
-            if current_size >= chunk_size:
-                chunks.append(" ".join(current_chunk))
-                current_chunk = []
-                current_size = 0
+        summaries = [None] * len(requests)
+        for (max_new_tokens, min_length), indices in groups.items():
+            # Sort by length so each batch pads to similar-sized inputs
+            indices.sort(key=lambda i: token_counts[i])
+            batch_size = self._batch_size_for([token_counts[i] for i in indices])
 
-        if current_chunk:
-            chunks.append(" ".join(current_chunk))
+            for start in range(0, len(indices), batch_size):
+                batch = indices[start:start + batch_size]
+                input_tokens = sum(token_counts[i] for i in batch)
+                with span("summary.model", batch_size=len(batch), input_tokens=input_tokens,
+                          max_new_tokens=max_new_tokens), self._model_lock:
+                    outputs = self.summarizer(
+                        [requests[i][0] for i in batch],
+                        max_new_tokens=max_new_tokens,
+                        min_length=min_length,
+                        do_sample=False,
+                        truncation=True,
+                        batch_size=len(batch)
+                    )
+                observe("summary_batch_size", len(batch))
+                observe("summary_input_tokens", input_tokens)
+                for i, output in zip(batch, outputs):
+                    # Pipelines return a list per input unless it was unwrapped
+                    if isinstance(output, list):
+                        output = output[0]
+                    summaries[i] = output['summary_text']
 
-        return chunks
+        return summaries
 
-    def confirm_summary(self, summary: str) -> bool:
+    def _batch_size_for(self, token_counts: List[int]) -> int:
+        """
+        Pick a batch size that keeps the padded batch within the token budget.
+
+        Args:
+            token_counts: Input lengths in tokens for the chunks of one group
+
+        Returns:
+            int: Number of chunks to generate per forward pass
+        """
+        longest = max(token_counts) if token_counts else 1
+        by_tokens = max(1, self.max_batch_tokens // max(longest, 1))
+        return max(1, min(len(token_counts), self.max_batch_size, by_tokens))
+
+    def _split_text(self, text: str, max_tokens: Optional[int] = None,
+                    overlap_tokens: Optional[int] = None) -> Iterator[str]:
+        """
+        Split text into sentence-aligned chunks that fit the model's input.
+
+        Args:
+            text: The text to split
+            max_tokens: Maximum tokens per chunk (default: the model's limit)
+            overlap_tokens: Tokens of trailing context repeated in the next chunk
+
+        Returns:
+            Iterator[str]: Generator of text chunks
+        """
+        tokenizer = self._tokenizer
+        if max_tokens is None:
+            # Small checkpoints can have fewer positions than their tokenizer allows
+            positions = getattr(self.summarizer.model.config, "max_position_embeddings", None) or 1024
+            max_tokens = self.chunk_tokens or min(tokenizer.model_max_length, positions, 1024)
+        if overlap_tokens is None:
+            overlap_tokens = self.chunk_overlap_tokens
+        return iter_token_chunks(text, tokenizer, max_tokens, overlap_tokens, self.chunk_anchor_every)
+
+    def confirm_summary(self, summary: str, confirmer: Optional[Confirmer] = None) -> Optional[bool]:
         """
         Ask for user confirmation of the generated summary.
 
         Args:
             summary: The summary to confirm
+            confirmer: How to ask (default: default_confirmer())
 
         Returns:
-            bool: True if confirmed, False otherwise
+            Optional[bool]: True if confirmed, False if rejected, None while
+                the answer is pending (Streamlit widgets)
         """
-        print("\nGenerated Summary:")
-        print(summary)
-        print(f"\nWord count: {len(summary.split())}")
-        print("\nDo you confirm this summary as accurate? [Yes/No]")
-
-        while True:
-            response = input().lower()
-            if response in ['yes', 'y']:
-                return True
-            elif response in ['no', 'n']:
-                return False
-            else:
-                print("Please answer with Yes/No or Y/N")
\ No newline at end of file
+        return (confirmer or default_confirmer()).confirm_summary(summary)
@@ -0,0 +1,251 @@
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from api_interactions import NotionAPI
+
+# Default location of the mirror and how old it may get before a read triggers a sync
+DEFAULT_MIRROR_PATH = ".notion_tasks.sqlite3"
+DEFAULT_MAX_STALENESS = 300
+
+
+def parse_notion_date(value: Optional[str]) -> Optional[float]:
+    """
+    Convert a Notion date string to a POSIX timestamp.
+
+    Args:
+        value: An ISO date or datetime; naive values are taken as local time
+
+    Returns:
+        Optional[float]: The timestamp, or None if missing or unparseable
+    """
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+class TaskMirror:
+    def __init__(self, notion_api: NotionAPI, database_id: Optional[str] = None,
+                 path: str = DEFAULT_MIRROR_PATH, max_staleness: float = DEFAULT_MAX_STALENESS):
+        """
+        Initialize a local SQLite mirror of a Notion tasks database.
+
+        Args:
+            notion_api: Client used to pull changes from Notion
+            database_id: The database to mirror (default: TASKS_DATABASE_ID)
+            path: Path of the SQLite database file
+            max_staleness: Seconds after a sync before reads sync again
+        """
+        self.notion_api = notion_api
+        self.database_id = database_id or os.getenv("TASKS_DATABASE_ID")
+        self.path = path
+        self.max_staleness = max_staleness
+        self._local = threading.local()
+        self._sync_lock = threading.Lock()
+
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS tasks (
+                id TEXT PRIMARY KEY,
+                database_id TEXT NOT NULL,
+                title TEXT,
+                due_date TEXT,
+                due_ts REAL,
+                progress REAL,
+                last_edited_time TEXT,
+                archived INTEGER NOT NULL DEFAULT 0
+            )
+            """
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_due ON tasks (database_id, archived, due_ts)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_tasks_title ON tasks (database_id, title)")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS sync_state (
+                database_id TEXT PRIMARY KEY,
+                last_edited_time TEXT,
+                synced_at REAL NOT NULL
+            )
+            """
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def _sync_state(self):
+        """Return (last_edited_time watermark, synced_at) or (None, None)."""
+        row = self._connection().execute(
+            "SELECT last_edited_time, synced_at FROM sync_state WHERE database_id = ?",
+            (self.database_id,)
+        ).fetchone()
+        return row if row else (None, None)
+
+    def is_stale(self) -> bool:
+        """
+        Check whether the mirror is older than the staleness bound.
+
+        Returns:
+            bool: True if the mirror has never synced or synced too long ago
+        """
+        _, synced_at = self._sync_state()
+        return synced_at is None or time.time() - synced_at > self.max_staleness
+
+    def sync(self, force: bool = False) -> int:
+        """
+        Pull changes from Notion into the mirror.
+
+        Incremental syncs only fetch pages edited since the last one. A forced
+        sync re-reads the whole database, which also drops pages deleted in
+        Notion.
+
+        Args:
+            force: Sync now and do a full refresh, even if the mirror is fresh
+
+        Returns:
+            int: Number of pages fetched from Notion
+
+        Raises:
+            Exception: Any error from the Notion API, after retries
+        """
+        with self._sync_lock:
+            if not force and not self.is_stale():
+                return 0
+
+            watermark, _ = self._sync_state()
+            full = force or watermark is None
+            filter_params = None
+            if not full:
+                # Notion rounds edit times to the minute, so on_or_after may
+                # re-fetch a few pages; upserting them again is harmless
+                filter_params = {
+                    "timestamp": "last_edited_time",
+                    "last_edited_time": {"on_or_after": watermark}
+                }
+
+            rows = []
+            newest = watermark
+            for page in self.notion_api.iter_database(self.database_id, filter_params, prefetch=True):
+                rows.append(self._row(page))
+                if newest is None or page["last_edited_time"] > newest:
+                    newest = page["last_edited_time"]
+
+            conn = self._connection()
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if full:
+                    conn.execute("DELETE FROM tasks WHERE database_id = ?", (self.database_id,))
+                conn.executemany(
+                    """
+                    INSERT OR REPLACE INTO tasks
+                        (id, database_id, title, due_date, due_ts, progress, last_edited_time, archived)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    rows
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO sync_state (database_id, last_edited_time, synced_at) VALUES (?, ?, ?)",
+                    (self.database_id, newest, time.time())
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+            return len(rows)
+
+    def _row(self, page: Dict) -> tuple:
+        """Flatten a Notion page into a tasks table row."""
+        properties = page["properties"]
+        title = "".join(part.get("plain_text", part.get("text", {}).get("content", ""))
+                        for part in properties.get("Name", {}).get("title", []))
+        due = (properties.get("Due Date", {}).get("date") or {}).get("start")
+        progress = properties.get("Progress", {}).get("number")
+        archived = page.get("archived", False) or page.get("in_trash", False)
+        return (
+            page["id"], self.database_id, title, due, parse_notion_date(due),
+            progress, page["last_edited_time"], int(archived)
+        )
+
+    def apply_local_progress(self, page_id: str, progress: int) -> None:
+        """
+        Record a progress change locally before it reaches Notion.
+
+        Args:
+            page_id: The ID of the task page
+            progress: The new progress percentage (0-100)
+        """
+        self._connection().execute("UPDATE tasks SET progress = ? WHERE id = ?", (progress, page_id))
+
+    def week_stats(self, start_date: datetime, end_date: datetime) -> Dict:
+        """
+        Compute task statistics for a date range from the local mirror.
+
+        Args:
+            start_date: Start of the range (inclusive)
+            end_date: End of the range (inclusive)
+
+        Returns:
+            Dict: total_tasks, completed_tasks and average_progress
+        """
+        total, completed, average = self._connection().execute(
+            """
+            SELECT COUNT(*), COALESCE(SUM(progress = 100), 0), COALESCE(AVG(progress), 0)
+            FROM tasks
+            WHERE database_id = ? AND archived = 0 AND due_ts BETWEEN ? AND ?
+            """,
+            (self.database_id, start_date.timestamp(), end_date.timestamp())
+        ).fetchone()
+        return {"total_tasks": total, "completed_tasks": completed, "average_progress": average}
+
+    def tasks_between(self, start_date: datetime, end_date: datetime) -> List[Tuple[float, Optional[float]]]:
+        """
+        Get the due time and progress of every task in a date range.
+
+        Args:
+            start_date: Start of the range (inclusive)
+            end_date: End of the range (inclusive)
+
+        Returns:
+            List[Tuple[float, Optional[float]]]: (due timestamp, progress) per task
+        """
+        return self._connection().execute(
+            """
+            SELECT due_ts, progress
+            FROM tasks
+            WHERE database_id = ? AND archived = 0 AND due_ts BETWEEN ? AND ?
+            """,
+            (self.database_id, start_date.timestamp(), end_date.timestamp())
+        ).fetchall()
+
+
+def create_default_mirror(notion_api: NotionAPI) -> Optional[TaskMirror]:
+    """
+    Create a mirror configured from the environment.
+
+    TASK_MIRROR_PATH sets the database file (empty disables the mirror) and
+    TASK_MIRROR_MAX_STALENESS the staleness bound in seconds.
+
+    Args:
+        notion_api: Client used to pull changes from Notion
+
+    Returns:
+        Optional[TaskMirror]: The mirror, or None if disabled
+    """
+    path = os.getenv("TASK_MIRROR_PATH", DEFAULT_MIRROR_PATH)
+    if not path:
+        return None
+    max_staleness = float(os.getenv("TASK_MIRROR_MAX_STALENESS", str(DEFAULT_MAX_STALENESS)))
+    return TaskMirror(notion_api, path=path, max_staleness=max_staleness)
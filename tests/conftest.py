@@ -0,0 +1,113 @@
+import os
+import sys
+import threading
+import time
+from types import SimpleNamespace
+import pytest
+
+# The application modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class WordTokenizer:
+    """
+    One token per word, plus two special tokens per input.
+
+    Like a fast tokenizer, it fails with "Already borrowed" when two threads
+    use it at once; `delay` widens the window so tests can catch that.
+    """
+
+    model_max_length = 1024
+
+    def __init__(self):
+        self.delay = 0.0
+        self._busy = False
+
+    def __call__(self, text, add_special_tokens=True, truncation=False, **kwargs):
+        if self._busy:
+            raise RuntimeError("Already borrowed")
+        self._busy = True
+        try:
+            time.sleep(self.delay)
+            ids = list(range(len(text.split())))
+            if add_special_tokens:
+                ids = ids + [0, 0]
+            if truncation:
+                ids = ids[:self.model_max_length]
+            return {"input_ids": ids}
+        finally:
+            self._busy = False
+
+    def num_special_tokens_to_add(self):
+        return 2
+
+
+class FakeSummarizer:
+    """
+    Stands in for a summarization pipeline without loading a model.
+
+    A summary is the first max_new_tokens // 10 words of the input (at
+    least three), so tests can tell which input a summary came from.
+    Every call is recorded in `calls`.
+    """
+
+    def __init__(self, max_positions=1024):
+        self.tokenizer = WordTokenizer()
+        self.tokenizer.model_max_length = max_positions
+        config = SimpleNamespace(name_or_path="fake-summarizer", _commit_hash="test",
+                                 max_position_embeddings=max_positions)
+        self.model = SimpleNamespace(config=config)
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def summarize(self, text, max_new_tokens):
+        return " ".join(text.split()[:max(3, max_new_tokens // 10)])
+
+    def __call__(self, inputs, max_new_tokens, min_length=0, do_sample=False, **kwargs):
+        with self.lock:
+            self.calls.append({"inputs": inputs, "max_new_tokens": max_new_tokens,
+                               "thread": threading.current_thread().name, **kwargs})
+        # The pipeline tokenizes its inputs, so it is not thread-safe either
+        for text in [inputs] if isinstance(inputs, str) else inputs:
+            self.tokenizer(text)
+        if isinstance(inputs, str):
+            return [{"summary_text": self.summarize(inputs, max_new_tokens)}]
+        return [[{"summary_text": self.summarize(text, max_new_tokens)}] for text in inputs]
+
+
+@pytest.fixture
+def make_summary_generator(monkeypatch):
+    """Build SummaryGenerators backed by a FakeSummarizer in a private registry."""
+    import model_registry
+    import summaries
+
+    pipes = []
+
+    def load_pipeline(task, model, device, backend):
+        pipes.append(FakeSummarizer())
+        return pipes[-1]
+
+    monkeypatch.setattr(model_registry, "load_pipeline", load_pipeline)
+    monkeypatch.setattr(summaries, "registry", model_registry.ModelRegistry())
+    monkeypatch.setenv("RESULT_CACHE_PATH", "")
+
+    def make(**options):
+        for name, value in options.pop("env", {}).items():
+            monkeypatch.setenv(name, str(value))
+        return summaries.SummaryGenerator(**options)
+
+    return make
+
+
+@pytest.fixture
+def notion(monkeypatch):
+    """A NotionAPI client talking to a fresh FakeNotionServer, as (server, api)."""
+    from api_interactions import NotionAPI
+    from benchmarks.fake_notion import FakeNotionServer
+    from rate_limiter import NotionRateLimiter
+
+    with FakeNotionServer() as server:
+        monkeypatch.setenv("NOTION_BASE_URL", server.base_url)
+        monkeypatch.setenv("NOTION_API_KEY", "test")
+        monkeypatch.setenv("TASKS_DATABASE_ID", "test-tasks")
+        yield server, NotionAPI(limiter=NotionRateLimiter(rate=1000, burst=1000))
@@ -0,0 +1,89 @@
+import os
+import pytest
+import batch_ingest
+from batch_ingest import BatchIngester, iter_documents
+
+
+class StubSummaries:
+    """Summarizes a document as its first sentence."""
+
+    def generate_summaries(self, texts, max_length):
+        return [(text.split(".")[0] + ".", True) for text in texts]
+
+
+class StubQuestions:
+    def generate_questions_batch(self, summaries, num_questions):
+        return [[{"question": f"What about {summary}", "answer": summary}] for summary in summaries]
+
+    def validate_questions(self, questions, summary):
+        return questions
+
+
+@pytest.fixture
+def make_ingester(notion, monkeypatch, tmp_path):
+    server, api = notion
+    monkeypatch.setattr(batch_ingest, "SummaryGenerator", StubSummaries)
+    monkeypatch.setattr(batch_ingest, "QuestionGenerator", StubQuestions)
+    monkeypatch.setattr(batch_ingest, "NotionAPI", lambda: api)
+    return lambda: BatchIngester(str(tmp_path / "checkpoint.jsonl"), batch_size=2)
+
+
+def write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text, encoding="utf-8")
+
+
+def body(server, page_id):
+    return [block["paragraph"]["rich_text"][0]["text"]["content"] for block in server.blocks.get(page_id, [])]
+
+
+def page_ids(server):
+    return {page["properties"]["Name"]["title"][0]["text"]["content"]: page["id"] for page in server.pages.values()}
+
+
+def test_documents_with_the_same_name_get_their_own_pages(notion, make_ingester, tmp_path):
+    server, _ = notion
+    write(tmp_path / "notes" / "week1" / "notes.md", "Week one covers sets. More text.")
+    write(tmp_path / "notes" / "week2" / "notes.md", "Week two covers graphs. More text.")
+
+    report = make_ingester().run(iter_documents(str(tmp_path / "notes")))
+
+    assert report["done"] == 2
+    pages = page_ids(server)
+    assert len(pages) == 4
+    week1 = pages[f"notes ({os.path.join('week1', 'notes.md')}) Summary"]
+    week2 = pages[f"notes ({os.path.join('week2', 'notes.md')}) Summary"]
+    assert body(server, week1) == ["Week one covers sets."]
+    assert body(server, week2) == ["Week two covers graphs."]
+
+
+def test_edited_document_replaces_its_page_body(notion, make_ingester, tmp_path):
+    server, _ = notion
+    source = tmp_path / "notes"
+    write(source / "a.md", "Original summary sentence. More text.")
+    write(source / "b.md", "Untouched document. More text.")
+    make_ingester().run(iter_documents(str(source)))
+    before = page_ids(server)
+
+    write(source / "a.md", "Edited summary sentence. More text.")
+    report = make_ingester().run(iter_documents(str(source)))
+
+    assert (report["done"], report["skipped"]) == (1, 1)
+    assert page_ids(server) == before
+    assert body(server, before["a (a.md) Summary"]) == ["Edited summary sentence."]
+    assert body(server, before["a (a.md) Questions"]) == [
+        "Q1. What about Edited summary sentence.\nA1. Edited summary sentence."
+    ]
+    assert body(server, before["b (b.md) Summary"]) == ["Untouched document."]
+
+
+def test_unchanged_documents_are_skipped(notion, make_ingester, tmp_path):
+    server, _ = notion
+    write(tmp_path / "notes" / "a.md", "Some material. More text.")
+    make_ingester().run(iter_documents(str(tmp_path / "notes")))
+    requests = server.stats()["requests"]
+
+    report = make_ingester().run(iter_documents(str(tmp_path / "notes")))
+
+    assert (report["done"], report["skipped"]) == (0, 1)
+    assert server.stats()["requests"] == requests
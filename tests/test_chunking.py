@@ -0,0 +1,87 @@
+from chunking import count_tokens, is_anchor, iter_sentences, iter_token_chunks
+
+
+class WordTokenizer:
+    """One token per word, plus two special tokens per input."""
+
+    def __call__(self, text, add_special_tokens=True):
+        ids = list(range(len(text.split())))
+        return {"input_ids": ids + [0, 0] if add_special_tokens else ids}
+
+    def num_special_tokens_to_add(self):
+        return 2
+
+
+def make_text(sentences):
+    return " ".join(f"Sentence number {i} talks about topic {i * 7} in some detail." for i in range(sentences))
+
+
+def test_iter_sentences_splits_on_punctuation_and_blank_lines():
+    text = 'First one. "Second?" Third!\n\nFourth without a period'
+    assert list(iter_sentences(text)) == ["First one.", '"Second?"', "Third!", "Fourth without a period"]
+
+
+def test_chunks_fit_the_budget_and_keep_every_sentence():
+    tokenizer = WordTokenizer()
+    text = make_text(40)
+    chunks = list(iter_token_chunks(text, tokenizer, max_tokens=50))
+
+    assert len(chunks) > 1
+    assert all(count_tokens(tokenizer, chunk) <= 48 for chunk in chunks)
+    assert " ".join(chunks) == " ".join(iter_sentences(text))
+
+
+def test_long_sentence_is_split_at_word_boundaries():
+    tokenizer = WordTokenizer()
+    text = " ".join(f"word{i}" for i in range(25)) + "."
+    chunks = list(iter_token_chunks(text, tokenizer, max_tokens=12))
+
+    assert all(count_tokens(tokenizer, chunk) <= 10 for chunk in chunks)
+    assert " ".join(chunks).split() == text.split()
+
+
+def test_overlap_repeats_trailing_sentences():
+    tokenizer = WordTokenizer()
+    chunks = list(iter_token_chunks(make_text(20), tokenizer, max_tokens=50, overlap_tokens=12))
+
+    for previous, current in zip(chunks, chunks[1:]):
+        last_sentence = list(iter_sentences(previous))[-1]
+        assert current.startswith(last_sentence)
+
+
+def test_is_anchor_ignores_whitespace():
+    sentence = "Sentence number 3 talks about topic 21 in some detail."
+    assert is_anchor(sentence, 4) == is_anchor("  " + sentence.replace(" ", "   "), 4)
+
+
+def test_anchors_resynchronize_chunks_after_an_edit():
+    tokenizer = WordTokenizer()
+    text = make_text(60)
+    edited = "An extra opening sentence shifts everything after it. " + text
+
+    original = list(iter_token_chunks(text, tokenizer, max_tokens=60, anchor_every=3))
+    changed = list(iter_token_chunks(edited, tokenizer, max_tokens=60, anchor_every=3))
+
+    # Only the chunks up to the first anchor differ
+    assert original[-3:] == changed[-3:]
+    unchanged = sum(1 for chunk in changed if chunk in original)
+    assert unchanged >= len(original) - 1
+
+
+class JoiningTokenizer(WordTokenizer):
+    """Like WordTokenizer, but every space after a sentence costs three extra tokens once joined."""
+
+    def __call__(self, text, add_special_tokens=True):
+        ids = super().__call__(text, add_special_tokens)["input_ids"]
+        return {"input_ids": ids + [0] * 3 * text.count(". ")}
+
+
+def test_joined_chunk_is_measured_again():
+    tokenizer = JoiningTokenizer()
+    text = make_text(40)
+
+    for overlap in (0, 12):
+        chunks = list(iter_token_chunks(text, tokenizer, max_tokens=50, overlap_tokens=overlap))
+        assert all(count_tokens(tokenizer, chunk) <= 48 for chunk in chunks)
+        if not overlap:
+            assert " ".join(chunks) == " ".join(iter_sentences(text))
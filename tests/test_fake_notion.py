@@ -0,0 +1,78 @@
+from progress_tracker import ProgressTracker
+
+
+def add_task(server, title, due_date=None, progress=None, database_id="test-tasks"):
+    properties = {"Name": {"title": [{"text": {"content": title}}]}}
+    if due_date:
+        properties["Due Date"] = {"date": {"start": due_date}}
+    if progress is not None:
+        properties["Progress"] = {"number": progress}
+    return server._create_page({"parent": {"database_id": database_id}, "properties": properties})
+
+
+def names(pages):
+    return sorted(page["properties"]["Name"]["title"][0]["text"]["content"] for page in pages)
+
+
+def test_query_honours_title_filters(notion):
+    server, api = notion
+    for title in ("Week 1 Summary", "Week 2 Summary", "Week 1 Summary Extra"):
+        add_task(server, title)
+
+    pages = api.query_database("test-tasks", api._title_filter(["Week 1 Summary", "Missing"]))
+
+    assert names(pages) == ["Week 1 Summary"]
+
+
+def test_query_honours_date_and_number_filters(notion):
+    server, api = notion
+    add_task(server, "Early", "2024-01-01", progress=10)
+    add_task(server, "Inside", "2024-01-03T10:00:00", progress=50)
+    add_task(server, "Late", "2024-01-09", progress=90)
+    add_task(server, "Undated")
+
+    date_filter = {"and": [
+        {"property": "Due Date", "date": {"on_or_after": "2024-01-02"}},
+        {"property": "Due Date", "date": {"on_or_before": "2024-01-07T23:59:59"}}
+    ]}
+    assert names(api.query_database("test-tasks", date_filter)) == ["Inside"]
+
+    number_filter = {"property": "Progress", "number": {"greater_than_or_equal_to": 50}}
+    assert names(api.query_database("test-tasks", number_filter)) == ["Inside", "Late"]
+
+
+def test_query_honours_last_edited_time_filter(notion):
+    server, api = notion
+    old = add_task(server, "Old")
+    old["last_edited_time"] = "2024-01-01T00:00:00.000Z"
+    add_task(server, "New")
+
+    edited_filter = {"timestamp": "last_edited_time", "last_edited_time": {"on_or_after": "2024-06-01T00:00:00Z"}}
+    assert names(api.query_database("test-tasks", edited_filter)) == ["New"]
+
+
+def test_week_range_filter_only_returns_the_week(notion, monkeypatch):
+    server, api = notion
+    monkeypatch.setenv("TASK_MIRROR_PATH", "")
+    monkeypatch.setenv("PROGRESS_WRITE_BEHIND", "0")
+    tracker = ProgressTracker()
+    start, end = tracker._week_range(1)
+    add_task(server, "This week", start.date().isoformat())
+    add_task(server, "Long ago", "2000-01-01")
+
+    assert names(api.query_database("test-tasks", tracker._date_filter(start, end))) == ["This week"]
+
+
+def test_block_children_can_be_listed_and_deleted(notion):
+    server, api = notion
+    page = add_task(server, "Notes")
+    api.append_blocks(page["id"], api._paragraph_blocks([f"Paragraph {index}" for index in range(150)]))
+
+    first = api.client.blocks.children.list(block_id=page["id"], page_size=100)
+    rest = api.client.blocks.children.list(block_id=page["id"], start_cursor=first["next_cursor"])
+    assert len(first["results"]) == 100 and first["has_more"]
+    assert len(rest["results"]) == 50 and not rest["has_more"]
+
+    api.client.blocks.delete(block_id=first["results"][0]["id"])
+    assert len(server.blocks[page["id"]]) == 149
+    assert server.stats()["by_route"]["blocks.delete"] == 1
@@ -0,0 +1,49 @@
+import time
+import pytest
+from jobs import CANCELLED, DONE, JobRunner
+
+
+@pytest.fixture
+def runner():
+    runner = JobRunner(max_workers=1)
+    yield runner
+    runner.shutdown()
+
+
+def wait_for(runner, job_id, timeout=30):
+    deadline = time.monotonic() + timeout
+    while runner.status(job_id) not in (DONE, CANCELLED):
+        assert time.monotonic() < deadline, "job did not finish"
+        time.sleep(0.05)
+
+
+def test_job_result(runner):
+    job_id = runner.submit(divmod, 7, 2)
+    wait_for(runner, job_id)
+    assert runner.result(job_id) == (3, 1)
+
+
+def test_cancelled_queued_job_never_starts(runner):
+    busy = runner.submit(time.sleep, 1)
+    queued = runner.submit(divmod, 1, 1)
+    after = runner.submit(divmod, 2, 1)
+
+    assert runner.cancel(queued)
+    wait_for(runner, busy)
+    wait_for(runner, after)
+
+    # One worker runs jobs in order, so the cancelled one had its turn
+    assert runner.status(queued) == CANCELLED
+    assert f"{queued}:started" not in runner._shared
+    with pytest.raises(RuntimeError):
+        runner.result(queued)
+
+
+def test_forget_drops_bookkeeping(runner):
+    job_id = runner.submit(divmod, 4, 2)
+    wait_for(runner, job_id)
+    runner.forget(job_id)
+
+    with pytest.raises(KeyError):
+        runner.status(job_id)
+    assert not [key for key in runner._shared.keys() if key.startswith(job_id)]
@@ -0,0 +1,68 @@
+import threading
+import time
+from types import SimpleNamespace
+import pytest
+import model_registry
+from model_registry import ModelRegistry
+
+
+@pytest.fixture
+def loads(monkeypatch):
+    """Replace model loading with a slow fake and record every load."""
+    calls = []
+
+    def load_pipeline(task, model, device, backend):
+        calls.append((task, model, device, backend))
+        time.sleep(0.05)
+        config = SimpleNamespace(name_or_path=model, _commit_hash="abc123")
+        return SimpleNamespace(task=task, model=SimpleNamespace(config=config))
+
+    monkeypatch.setattr(model_registry, "load_pipeline", load_pipeline)
+    return calls
+
+
+def test_pipeline_is_loaded_once(loads):
+    registry = ModelRegistry()
+    first = registry.get("summarization", "bart")
+    second = registry.get("summarization", "bart")
+
+    assert first is second
+    assert len(loads) == 1
+    assert [stats.model for stats in registry.stats()] == ["bart"]
+
+
+def test_each_model_and_backend_gets_its_own_pipeline(loads):
+    registry = ModelRegistry()
+    registry.get("summarization", "bart")
+    registry.get("summarization", "bart", backend="onnx")
+    registry.get("text2text-generation", "t5")
+
+    assert len(loads) == 3
+
+
+def test_concurrent_requests_share_one_load(loads):
+    registry = ModelRegistry()
+    pipes = []
+    threads = [threading.Thread(target=lambda: pipes.append(registry.get("summarization", "bart")))
+               for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(loads) == 1
+    assert all(pipe is pipes[0] for pipe in pipes)
+
+
+def test_usage_lock_is_shared_per_pipeline(loads):
+    registry = ModelRegistry()
+    bart = registry.get("summarization", "bart")
+    t5 = registry.get("text2text-generation", "t5")
+
+    assert registry.usage_lock(bart) is registry.usage_lock(bart)
+    assert registry.usage_lock(bart) is not registry.usage_lock(t5)
+
+
+def test_model_version_uses_the_commit_hash(loads):
+    pipe = ModelRegistry().get("summarization", "bart")
+    assert ModelRegistry.model_version(pipe) == "bart@abc123"
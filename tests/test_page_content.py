@@ -0,0 +1,72 @@
+from api_interactions import MAX_RICH_TEXT_ITEMS, MAX_TEXT_LENGTH
+
+
+def block_texts(blocks, block_type="paragraph"):
+    return ["".join(item["text"]["content"] for item in block[block_type]["rich_text"]) for block in blocks]
+
+
+def test_split_text_keeps_words_whole_and_loses_nothing(notion):
+    _, api = notion
+    text = " ".join(f"word{i}" for i in range(1500))
+
+    segments = api._split_text(text)
+
+    assert len(segments) > 1
+    assert "".join(segments) == text
+    assert all(len(segment) <= MAX_TEXT_LENGTH for segment in segments)
+    assert all(segment.endswith(" ") for segment in segments[:-1])
+
+
+def test_split_text_cuts_text_without_spaces_at_the_limit(notion):
+    _, api = notion
+    segments = api._split_text("x" * 4500)
+
+    assert [len(segment) for segment in segments] == [2000, 2000, 500]
+    assert api._split_text("") == []
+
+
+def test_split_rich_text_keeps_annotations(notion):
+    _, api = notion
+    item = {"type": "text", "text": {"content": "a " * 1500, "link": None}, "annotations": {"bold": True}}
+
+    split = api._split_rich_text([item, {"type": "text", "text": {"content": "short"}}])
+
+    assert len(split) == 3
+    assert all(part["annotations"] == {"bold": True} for part in split[:2])
+    assert "".join(part["text"]["content"] for part in split[:2]) == item["text"]["content"]
+
+
+def test_text_needing_many_segments_spans_several_blocks(notion):
+    _, api = notion
+    text = "y" * (MAX_TEXT_LENGTH * (MAX_RICH_TEXT_ITEMS + 20))
+    child = api._paragraph_blocks(["Nested"])
+
+    blocks = api._text_blocks("toggle", text, child)
+
+    assert len(blocks) == 2
+    assert [len(block["toggle"]["rich_text"]) for block in blocks] == [MAX_RICH_TEXT_ITEMS, 20]
+    assert "".join(block_texts(blocks, "toggle")) == text
+    assert "children" not in blocks[0]["toggle"] and blocks[1]["toggle"]["children"] == child
+
+
+def test_long_body_is_appended_in_order_one_hundred_blocks_at_a_time(notion):
+    server, api = notion
+    paragraphs = [f"Paragraph {i}" for i in range(250)]
+
+    page_id = api.create_page("test-tasks", api._task_properties("Notes", "2024-01-08"),
+                              api._paragraph_blocks(paragraphs))
+
+    routes = server.stats()["by_route"]
+    assert (routes["pages.create"], routes["blocks.children.append"]) == (1, 2)
+    assert block_texts(server.blocks[page_id]) == paragraphs
+
+
+def test_page_with_a_truncated_body_is_archived(notion, monkeypatch):
+    server, api = notion
+    monkeypatch.setattr(api, "append_blocks", lambda block_id, blocks: False)
+
+    page_id = api.create_page("test-tasks", api._task_properties("Notes", "2024-01-08"),
+                              api._paragraph_blocks([f"Paragraph {i}" for i in range(150)]))
+
+    assert page_id is None
+    assert [page["archived"] for page in server.pages.values()] == [True]
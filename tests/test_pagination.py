@@ -0,0 +1,74 @@
+import asyncio
+import time
+import pytest
+from api_interactions import AsyncNotionAPI
+from rate_limiter import NotionRateLimiter
+
+
+def add_pages(server, count, database_id="test-tasks"):
+    for index in range(count):
+        server._create_page({
+            "parent": {"database_id": database_id},
+            "properties": {"Name": {"title": [{"text": {"content": f"Task {index}"}}]}}
+        })
+
+
+def queries(server):
+    return server.stats()["by_route"].get("databases.query", 0)
+
+
+def titles(pages):
+    return [page["properties"]["Name"]["title"][0]["text"]["content"] for page in pages]
+
+
+@pytest.mark.parametrize("prefetch", [False, True])
+def test_iter_database_follows_every_cursor(notion, prefetch):
+    server, api = notion
+    add_pages(server, 250)
+
+    pages = list(api.iter_database("test-tasks", page_size=100, prefetch=prefetch))
+
+    assert titles(pages) == [f"Task {index}" for index in range(250)]
+    assert queries(server) == 3
+
+
+def test_query_database_returns_more_than_one_page_of_results(notion):
+    server, api = notion
+    add_pages(server, 120)
+    add_pages(server, 5, database_id="other")
+
+    assert len(api.query_database("test-tasks")) == 120
+
+
+def test_prefetch_requests_the_next_batch_before_it_is_needed(notion):
+    server, api = notion
+    add_pages(server, 30)
+
+    pages = api.iter_database("test-tasks", page_size=10, prefetch=True)
+    next(pages)
+    deadline = time.monotonic() + 5
+    while queries(server) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert queries(server) == 2
+
+    # Without prefetch nothing is read ahead
+    lazy = api.iter_database("test-tasks", page_size=10)
+    next(lazy)
+    time.sleep(0.1)
+    assert queries(server) == 3
+    pages.close()
+    lazy.close()
+
+
+@pytest.mark.parametrize("prefetch", [False, True])
+def test_async_iter_database_follows_every_cursor(notion, prefetch):
+    server, _ = notion
+    add_pages(server, 150)
+
+    async def collect():
+        async with AsyncNotionAPI(limiter=NotionRateLimiter(rate=1000, burst=1000)) as api:
+            return [page async for page in api.iter_database("test-tasks", page_size=40, prefetch=prefetch)]
+
+    pages = asyncio.run(collect())
+    assert titles(pages) == [f"Task {index}" for index in range(150)]
+    assert queries(server) == 4
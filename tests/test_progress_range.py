@@ -0,0 +1,100 @@
+from datetime import timedelta
+import numpy as np
+import pytest
+from progress_tracker import DEFAULT_PERFORMANCE, ProgressTracker
+
+
+class StubMirror:
+    """Answers the tracker's mirror queries from a list of (due datetime, progress) tasks."""
+
+    def __init__(self, tasks):
+        self.tasks = tasks
+
+    def sync(self, force=False):
+        return 0
+
+    def tasks_between(self, start_date, end_date):
+        return [(due.timestamp(), progress) for due, progress in self.tasks if start_date <= due <= end_date]
+
+    def week_stats(self, start_date, end_date):
+        rows = self.tasks_between(start_date, end_date)
+        progress = [p for _, p in rows if p is not None]
+        return {
+            "total_tasks": len(rows),
+            "completed_tasks": sum(1 for p in progress if p == 100),
+            "average_progress": sum(progress) / len(progress) if progress else 0
+        }
+
+
+@pytest.fixture
+def make_tracker(monkeypatch):
+    monkeypatch.setenv("PROGRESS_WRITE_BEHIND", "0")
+    monkeypatch.setenv("TASK_MIRROR_PATH", "")
+
+    def make(tasks_by_week):
+        """tasks_by_week maps a week number to the progress values of its tasks."""
+        probe = ProgressTracker(mirror=StubMirror([]))
+        tasks = [
+            (probe._week_range(week)[0] + timedelta(hours=hour), progress)
+            for week, values in tasks_by_week.items()
+            for hour, progress in enumerate(values)
+        ]
+        return ProgressTracker(mirror=StubMirror(tasks))
+
+    return make
+
+
+def test_range_matches_weekly_progress(make_tracker):
+    tracker = make_tracker({1: [100, 50], 2: [100, 100, 0], 4: [30]})
+    stats = tracker.get_progress_range(1, 4)
+
+    assert list(stats["week_number"]) == [1, 2, 3, 4]
+    for index, week in enumerate(range(1, 5)):
+        weekly = tracker.get_weekly_progress(week)
+        for column in ("total_tasks", "completed_tasks", "completion_rate", "average_progress"):
+            assert stats[column][index] == pytest.approx(weekly[column])
+
+
+def test_trend_compares_each_week_with_the_one_before(make_tracker):
+    # Week 2 is the older one: nothing done then, everything done now
+    tracker = make_tracker({1: [100, 100], 2: [0, 0]})
+    stats = tracker.get_progress_range(1, 2)
+
+    assert list(stats["trend"]) == [100, 0]
+    assert tracker.performance_from_range(stats) == {"completion_rate": 50, "trend": 100}
+
+
+def test_empty_range_keeps_the_default_difficulty(make_tracker):
+    tracker = make_tracker({})
+    performance = tracker.performance_from_range(tracker.get_progress_range(1, 8))
+
+    assert performance == DEFAULT_PERFORMANCE
+    assert tracker.adjust_difficulty(performance)["question_complexity"] == "medium"
+
+
+def test_task_without_progress_counts_but_is_not_averaged(make_tracker):
+    tracker = make_tracker({1: [None, 80]})
+    stats = tracker.get_progress_range(1, 1)
+
+    assert stats["total_tasks"][0] == 2
+    assert stats["average_progress"][0] == 80
+
+
+def test_notion_path_agrees_with_the_mirror(make_tracker, notion):
+    server, _ = notion
+    mirrored = make_tracker({1: [100, 20], 3: [100]})
+    for due, progress in mirrored.mirror.tasks:
+        server._create_page({
+            "parent": {"database_id": "test-tasks"},
+            "properties": {
+                "Due Date": {"date": {"start": due.isoformat()}},
+                "Progress": {"number": progress}
+            }
+        })
+    direct = ProgressTracker()
+    assert direct.mirror is None
+
+    expected = mirrored.get_progress_range(1, 3)
+    actual = direct.get_progress_range(1, 3)
+    for column in ("total_tasks", "completed_tasks", "average_progress", "trend"):
+        assert np.allclose(actual[column], expected[column])
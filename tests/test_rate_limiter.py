@@ -0,0 +1,99 @@
+import httpx
+import pytest
+from notion_client.errors import RequestTimeoutError
+from rate_limiter import NotionRateLimiter, TokenBucket, is_retryable
+
+
+class StatusError(Exception):
+    def __init__(self, status, headers=None):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+        self.headers = headers
+
+
+def test_bucket_allows_a_burst_then_spaces_requests():
+    bucket = TokenBucket(rate=10, capacity=3)
+    waits = [bucket.reserve() for _ in range(5)]
+
+    assert waits[:3] == [0.0, 0.0, 0.0]
+    assert waits[3] == pytest.approx(0.1, abs=0.01)
+    assert waits[4] == pytest.approx(0.2, abs=0.01)
+
+
+def test_concurrent_pauses_do_not_stack():
+    bucket = TokenBucket(rate=3, capacity=3)
+    for _ in range(5):
+        bucket.pause(2)
+
+    # Held back by one Retry-After, not five
+    assert bucket.reserve() == pytest.approx(2 + 1 / 3, abs=0.05)
+
+
+@pytest.mark.parametrize("error, expected", [
+    (StatusError(429), True),
+    (StatusError(503), True),
+    (StatusError(404), False),
+    (StatusError(400), False),
+    (httpx.ConnectError("refused"), True),
+    (ValueError("bad"), False),
+])
+def test_is_retryable(error, expected):
+    assert is_retryable(error) is expected
+
+
+def test_call_retries_transient_errors_only():
+    limiter = NotionRateLimiter(rate=1000, burst=1000, base_delay=0, max_retries=3)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise StatusError(502)
+        return "ok"
+
+    assert limiter.call(flaky) == "ok"
+    assert limiter.metrics()["retries"] == 2
+
+    def missing():
+        raise StatusError(404)
+
+    with pytest.raises(StatusError):
+        limiter.call(missing)
+    assert limiter.metrics()["failures"] == 1
+
+
+def timeout_error(cause):
+    """A RequestTimeoutError raised while handling an httpx error, as notion_client does."""
+    try:
+        try:
+            raise cause
+        except httpx.TimeoutException:
+            raise RequestTimeoutError()
+    except RequestTimeoutError as error:
+        return error
+
+
+@pytest.mark.parametrize("error, expected", [
+    (StatusError(429), True),
+    (httpx.ConnectError("refused"), True),
+    (timeout_error(httpx.ConnectTimeout("connect")), True),
+    (timeout_error(httpx.ReadTimeout("read")), False),
+    (StatusError(502), False),
+    (httpx.RemoteProtocolError("disconnected"), False),
+])
+def test_non_idempotent_calls_retry_only_unsent_requests(error, expected):
+    assert is_retryable(error, idempotent=False) is expected
+    assert is_retryable(error)
+
+
+def test_create_call_is_not_repeated_after_a_server_error():
+    limiter = NotionRateLimiter(rate=1000, burst=1000, base_delay=0, max_retries=3)
+    attempts = []
+
+    def create(**kwargs):
+        attempts.append(kwargs)
+        raise StatusError(502)
+
+    with pytest.raises(StatusError):
+        limiter.call(create, title="Week 1", idempotent=False)
+    assert attempts == [{"title": "Week 1"}]
@@ -0,0 +1,101 @@
+import time
+from result_cache import ResultCache
+
+
+def test_get_returns_what_was_set(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache.sqlite3"))
+    key = ResultCache.make_key("summary", "Some text", "model@1", {"max_length": 10})
+    cache.set(key, {"summary": "short"}, namespace="summary")
+
+    assert cache.get(key) == {"summary": "short"}
+    assert cache.get("missing") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_make_key_normalizes_whitespace():
+    key = ResultCache.make_key("summary", "Some   text\n", "model@1", {})
+    assert key == ResultCache.make_key("summary", "Some text", "model@1", {})
+    assert key != ResultCache.make_key("questions", "Some text", "model@1", {})
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path):
+    value = "x" * 100
+    # Room for two values; a third forces one out
+    cache = ResultCache(str(tmp_path / "cache.sqlite3"), max_bytes=250)
+    cache.set("a", value)
+    time.sleep(0.01)
+    cache.set("b", value)
+    time.sleep(0.01)
+    cache.get("a")
+    time.sleep(0.01)
+    cache.set("c", value)
+
+    assert cache.get("a") == value
+    assert cache.get("b") is None
+    assert cache.get("c") == value
+
+
+def test_clear_namespace(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache.sqlite3"))
+    cache.set("a", 1, namespace="summary")
+    cache.set("b", 2, namespace="chunk_summary")
+    cache.clear("chunk_summary")
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+
+
+def test_size_total_follows_writes_replacements_and_clears(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache.sqlite3"))
+    cache.set("a", "x" * 10, namespace="summary")
+    cache.set("b", "y" * 20, namespace="questions")
+    cache.set("a", "z" * 5, namespace="summary")
+    assert cache.stats()["size_bytes"] == 7 + 22
+
+    cache.clear("questions")
+    assert cache.stats()["size_bytes"] == 7
+    cache.clear()
+    stats = cache.stats()
+    assert (stats["entries"], stats["size_bytes"]) == (0, 0)
+
+
+def test_size_total_is_seeded_from_an_existing_cache(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = ResultCache(path)
+    cache.set("a", "x" * 10)
+    cache._connection().execute("DROP TABLE usage")
+
+    assert ResultCache(path).stats()["size_bytes"] == 12
+
+
+def test_eviction_frees_space_below_the_limit(tmp_path):
+    cache = ResultCache(str(tmp_path / "cache.sqlite3"), max_bytes=1000)
+    for index in range(11):
+        cache.set(str(index), "x" * 98)
+        time.sleep(0.002)
+
+    # Evicting down to the low-water mark leaves room for the next writes
+    stats = cache.stats()
+    assert stats["size_bytes"] <= 900
+    assert cache.get("0") is None
+    assert cache.get("10") is not None
+
+
+def test_access_times_are_written_in_batches(tmp_path, monkeypatch):
+    import result_cache
+    monkeypatch.setattr(result_cache, "TOUCH_BATCH_SIZE", 3)
+    cache = ResultCache(str(tmp_path / "cache.sqlite3"))
+    for key in "abc":
+        cache.set(key, key)
+
+    def last_access(key):
+        return cache._connection().execute("SELECT last_access FROM entries WHERE key = ?", (key,)).fetchone()[0]
+
+    before = last_access("a")
+    time.sleep(0.01)
+    cache.get("a")
+    cache.get("b")
+    assert last_access("a") == before
+    cache.get("c")
+    assert last_access("a") > before
@@ -0,0 +1,41 @@
+import pytest
+import runtime_config
+from runtime_config import MULTI, SINGLE, configure_process, load_runtime_config
+
+
+@pytest.fixture
+def cores(monkeypatch):
+    for name in ("INFERENCE_LAYOUT", "INFERENCE_WORKERS", "TORCH_NUM_THREADS", "INFERENCE_UI_THREADS"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setattr(runtime_config, "detect_cores", lambda: 8)
+
+
+def test_single_layout_splits_the_cores_with_the_ui(cores):
+    config = load_runtime_config(SINGLE)
+    assert (config.workers, config.threads_per_worker, config.ui_threads) == (1, 4, 4)
+
+
+def test_multi_layout_keeps_one_core_for_the_ui(cores):
+    config = load_runtime_config(MULTI)
+    assert (config.workers, config.threads_per_worker, config.ui_threads) == (7, 1, 1)
+
+
+def test_ui_threads_can_be_set(cores, monkeypatch):
+    monkeypatch.setenv("INFERENCE_UI_THREADS", "2")
+    config = load_runtime_config(SINGLE)
+    assert (config.threads_per_worker, config.ui_threads) == (6, 2)
+
+
+def test_explicit_counts_win(cores):
+    config = load_runtime_config(SINGLE, workers=2, threads=3)
+    assert (config.workers, config.threads_per_worker) == (2, 3)
+
+
+@pytest.mark.parametrize("shares, expected", [(False, 4), (True, 2)])
+def test_pool_owner_uses_its_own_share(cores, monkeypatch, shares, expected):
+    applied = []
+    monkeypatch.setattr(runtime_config, "apply_torch_threads", lambda threads, interop: applied.append(threads))
+    monkeypatch.setattr(runtime_config, "_shares_cores_with_pool", shares)
+
+    configure_process(runtime_config.RuntimeConfig(SINGLE, 1, 4, 1, ui_threads=2))
+    assert applied == [expected]
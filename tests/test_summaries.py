@@ -0,0 +1,113 @@
+import threading
+import pytest
+from jobs import JobCancelled
+
+
+def document(name, sentences):
+    return " ".join(f"{name} sentence {i} explains one more detail of the topic." for i in range(sentences))
+
+
+def test_batched_chunks_keep_document_order(make_summary_generator):
+    generator = make_summary_generator(env={"SUMMARY_CHUNK_TOKENS": 40, "SUMMARY_CHUNK_ANCHOR_EVERY": 0})
+    text = document("Alpha", 30)
+    chunks = list(generator._split_text(text))
+
+    summary, _ = generator.generate_summary(text, max_length=1000)
+
+    expected = [generator.summarizer.summarize(chunk, request[1])
+                for chunk, request in zip(chunks, generator._chunk_requests(chunks, 1000))]
+    assert summary == " ".join(expected)
+    # Chunks were generated together rather than one call each
+    assert len(generator.summarizer.calls) < len(chunks)
+
+
+def test_generate_summaries_matches_one_at_a_time(make_summary_generator):
+    generator = make_summary_generator(env={"SUMMARY_CHUNK_TOKENS": 40, "SUMMARY_CHUNK_ANCHOR_EVERY": 0})
+    texts = [document("Alpha", 12), "too short", document("Beta", 25), document("Gamma", 4)]
+
+    batched = generator.generate_summaries(texts, max_length=1000)
+    single = [generator.generate_summary(text, max_length=1000) for text in texts]
+
+    assert batched == single
+    assert batched[0][0].startswith("Alpha")
+    assert batched[2][0].startswith("Beta")
+    assert batched[1][1] is False
+
+
+def test_every_model_call_truncates_its_input(make_summary_generator):
+    generator = make_summary_generator(env={"SUMMARY_CHUNK_TOKENS": 40})
+    generator.generate_summary(document("Alpha", 40), max_length=20)
+
+    # Includes the final pass over the joined chunk summaries
+    assert any(call["max_new_tokens"] == 20 for call in generator.summarizer.calls)
+    assert all(call.get("truncation") for call in generator.summarizer.calls)
+
+
+def test_concurrent_requests_interleave_safely(make_summary_generator):
+    generator = make_summary_generator(env={"SUMMARY_CHUNK_TOKENS": 40, "SUMMARY_BATCH_SIZE": 1})
+    generator.summarizer.tokenizer.delay = 0.001
+    results = {}
+
+    def summarize(name, hierarchical):
+        results[name] = generator.generate_summary(document(name, 60), max_length=40, hierarchical=hierarchical)
+
+    threads = [threading.Thread(target=summarize, args=(name, hierarchical), name=name)
+               for name, hierarchical in (("Alpha", True), ("Beta", False), ("Gamma", True))]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # No "Already borrowed" failures, and no request waited for another to finish
+    assert all(summary for summary, _ in results.values())
+    order = [call["thread"] for call in generator.summarizer.calls]
+    first_done = min(max(i for i, name in enumerate(order) if name == thread.name) for thread in threads)
+    assert len(set(order[:first_done])) > 1
+
+
+def test_single_pass_reports_progress_per_window(make_summary_generator):
+    generator = make_summary_generator(env={
+        "SUMMARY_CHUNK_TOKENS": 40, "SUMMARY_BATCH_SIZE": 2, "SUMMARY_WINDOW_BATCHES": 1
+    })
+    text = document("Alpha", 30)
+    total = len(list(generator._split_text(text)))
+    reports = []
+
+    summary, _ = generator.generate_summary(text, max_length=1000, progress_callback=lambda *p: reports.append(p))
+
+    assert summary
+    assert reports == [(0, min(done, total), total) for done in range(2, total + 2, 2)]
+
+
+@pytest.mark.parametrize("hierarchical", [False, True])
+def test_cancelling_from_progress_stops_the_summary(make_summary_generator, hierarchical):
+    generator = make_summary_generator(env={
+        "SUMMARY_CHUNK_TOKENS": 40, "SUMMARY_BATCH_SIZE": 2, "SUMMARY_WINDOW_BATCHES": 1
+    })
+
+    def cancel(*progress):
+        raise JobCancelled("job")
+
+    with pytest.raises(JobCancelled):
+        generator.generate_summary(document("Alpha", 30), max_length=1000, hierarchical=hierarchical,
+                                   progress_callback=cancel)
+    # Stopped after the first window rather than summarizing everything
+    assert len(generator.summarizer.calls) == 1
+
+
+def test_chunk_summaries_survive_a_longer_text(make_summary_generator, tmp_path):
+    from result_cache import ResultCache
+    generator = make_summary_generator(cache=ResultCache(str(tmp_path / "cache.db")),
+                                       env={"SUMMARY_CHUNK_TOKENS": 40, "SUMMARY_CHUNK_ANCHOR_EVERY": 0})
+    text = document("Alpha", 20)
+    longer = text + " " + document("Beta", 8)
+    old_chunks = list(generator._split_text(text))
+    generator.generate_summary(text, max_length=60)
+    generator.summarizer.calls.clear()
+
+    generator.generate_summary(longer, max_length=60)
+
+    summarized = [chunk for call in generator.summarizer.calls
+                  for chunk in ([call["inputs"]] if isinstance(call["inputs"], str) else call["inputs"])]
+    assert old_chunks[0] in list(generator._split_text(longer))
+    assert not set(summarized) & set(old_chunks[:-1])
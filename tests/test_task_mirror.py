@@ -0,0 +1,87 @@
+from datetime import datetime
+from task_mirror import TaskMirror
+
+
+class StubNotion:
+    """Serves pages from memory and honours the mirror's last_edited_time filter."""
+
+    def __init__(self):
+        self.pages = {}
+        self.filters = []
+
+    def put(self, page_id, due, progress, edited, archived=False):
+        self.pages[page_id] = {
+            "id": page_id,
+            "last_edited_time": edited,
+            "archived": archived,
+            "properties": {
+                "Name": {"title": [{"plain_text": f"Task {page_id}"}]},
+                "Due Date": {"date": {"start": due}},
+                "Progress": {"number": progress}
+            }
+        }
+
+    def iter_database(self, database_id, filter_params=None, prefetch=False):
+        self.filters.append(filter_params)
+        since = (filter_params or {}).get("last_edited_time", {}).get("on_or_after")
+        for page in list(self.pages.values()):
+            if since is None or page["last_edited_time"] >= since:
+                yield page
+
+
+WEEK = (datetime(2024, 3, 4), datetime(2024, 3, 10, 23, 59, 59))
+
+
+def make_mirror(tmp_path, api, max_staleness=0):
+    return TaskMirror(api, database_id="tasks", path=str(tmp_path / "mirror.sqlite3"), max_staleness=max_staleness)
+
+
+def test_first_sync_reads_everything_then_only_changes(tmp_path):
+    api = StubNotion()
+    api.put("a", "2024-03-05", 100, "2024-03-01T10:00:00.000Z")
+    api.put("b", "2024-03-06", 40, "2024-03-01T11:00:00.000Z")
+    mirror = make_mirror(tmp_path, api)
+
+    assert mirror.sync() == 2
+    assert api.filters[-1] is None
+
+    api.put("b", "2024-03-06", 100, "2024-03-02T09:00:00.000Z")
+    assert mirror.sync() == 1
+    assert api.filters[-1]["last_edited_time"] == {"on_or_after": "2024-03-01T11:00:00.000Z"}
+    assert mirror.week_stats(*WEEK) == {"total_tasks": 2, "completed_tasks": 2, "average_progress": 100}
+
+
+def test_fresh_mirror_does_not_sync(tmp_path):
+    api = StubNotion()
+    api.put("a", "2024-03-05", 100, "2024-03-01T10:00:00.000Z")
+    mirror = make_mirror(tmp_path, api, max_staleness=3600)
+
+    assert mirror.sync() == 1
+    assert mirror.sync() == 0
+    assert len(api.filters) == 1
+
+
+def test_forced_sync_drops_deleted_pages_and_archived_pages_are_ignored(tmp_path):
+    api = StubNotion()
+    api.put("a", "2024-03-05", 100, "2024-03-01T10:00:00.000Z")
+    api.put("b", "2024-03-06", 50, "2024-03-01T10:00:00.000Z")
+    api.put("c", "2024-03-07", 0, "2024-03-01T10:00:00.000Z", archived=True)
+    mirror = make_mirror(tmp_path, api)
+    mirror.sync()
+    assert mirror.week_stats(*WEEK)["total_tasks"] == 2
+
+    del api.pages["b"]
+    mirror.sync(force=True)
+    assert api.filters[-1] is None
+    assert mirror.week_stats(*WEEK)["total_tasks"] == 1
+
+
+def test_local_progress_is_visible_before_the_next_sync(tmp_path):
+    api = StubNotion()
+    api.put("a", "2024-03-05", 20, "2024-03-01T10:00:00.000Z")
+    mirror = make_mirror(tmp_path, api, max_staleness=3600)
+    mirror.sync()
+
+    mirror.apply_local_progress("a", 100)
+    assert mirror.week_stats(*WEEK)["completed_tasks"] == 1
+    assert mirror.tasks_between(*WEEK) == [(datetime(2024, 3, 5).timestamp(), 100)]
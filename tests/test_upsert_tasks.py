@@ -0,0 +1,93 @@
+def add_task(server, title, database_id="test-tasks", archived=False):
+    page = server._create_page({
+        "parent": {"database_id": database_id},
+        "properties": {
+            "Name": {"title": [{"text": {"content": title}}]},
+            "Due Date": {"date": {"start": "2024-01-08"}}
+        }
+    })
+    page["archived"] = archived
+    return page
+
+
+def writes(server):
+    routes = server.stats()["by_route"]
+    return routes.get("pages.create", 0) + routes.get("pages.update", 0)
+
+
+def test_upsert_creates_each_title_once(notion):
+    server, api = notion
+    tasks = [
+        {"title": "Review: Week 1", "due_date": "2024-01-08"},
+        {"title": "Review: Week 2", "due_date": "2024-01-15"},
+        {"title": "Review: Week 1", "due_date": "2024-01-08"},
+    ]
+    results = api.upsert_tasks(tasks)
+
+    assert all(result.ok for result in results)
+    assert len(server.pages) == 2
+    assert results[0].page_id == results[2].page_id
+
+
+def test_second_run_makes_no_writes(notion):
+    server, api = notion
+    tasks = [{"title": f"Task {i}", "due_date": "2024-01-08"} for i in range(5)]
+    first = api.upsert_tasks(tasks)
+    before = writes(server)
+    second = api.upsert_tasks(tasks)
+
+    assert writes(server) == before
+    assert [result.page_id for result in second] == [result.page_id for result in first]
+
+
+def test_changed_due_date_is_updated_without_touching_progress(notion):
+    server, api = notion
+    api.upsert_tasks([{"title": "Task", "due_date": "2024-01-08", "progress": 40}])
+    before = server.stats()["by_route"].get("pages.create", 0)
+    result = api.upsert_tasks([{"title": "Task", "due_date": "2024-01-15", "progress": 0}])[0]
+
+    page = server.pages[result.page_id]
+    assert server.stats()["by_route"].get("pages.create", 0) == before
+    assert page["properties"]["Due Date"]["date"]["start"] == "2024-01-15"
+    assert page["properties"]["Progress"]["number"] == 40
+
+
+def test_only_exact_titles_in_the_tasks_database_match(notion):
+    server, api = notion
+    add_task(server, "Review: Week 10")
+    add_task(server, "Review: Week 1 (draft)")
+    add_task(server, "Review: Week 1", database_id="other")
+    add_task(server, "Review: Week 1", archived=True)
+
+    result = api.upsert_tasks([{"title": "Review: Week 1", "due_date": "2024-01-08"}])[0]
+
+    assert result.ok
+    assert server.stats()["by_route"]["pages.create"] == 1
+    assert server.pages[result.page_id]["parent"]["database_id"] == "test-tasks"
+    assert not server.pages[result.page_id]["archived"]
+
+
+def test_titles_are_looked_up_in_batches_of_one_hundred(notion):
+    server, api = notion
+    existing = {add_task(server, f"Task {i}")["id"] for i in range(150)}
+    tasks = [{"title": f"Task {i}", "due_date": "2024-01-08"} for i in range(160)]
+
+    results = api.upsert_tasks(tasks)
+
+    routes = server.stats()["by_route"]
+    assert routes["databases.query"] == 2
+    assert routes["pages.create"] == 10
+    assert {result.page_id for result in results[:150]} == existing
+
+
+def test_replace_body_rewrites_an_existing_page(notion):
+    server, api = notion
+    task = {"title": "Notes Summary", "due_date": "2024-01-08", "body": ["Old text."]}
+    page_id = api.upsert_tasks([task])[0].page_id
+
+    result = api.upsert_tasks([dict(task, body=["New text.", "More text."], replace_body=True)])[0]
+
+    assert result.ok and result.page_id == page_id
+    assert [block["paragraph"]["rich_text"][0]["text"]["content"] for block in server.blocks[page_id]] == [
+        "New text.", "More text."
+    ]
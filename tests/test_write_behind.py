@@ -0,0 +1,83 @@
+import threading
+from write_behind import ProgressWriteQueue
+
+
+class StatusError(Exception):
+    def __init__(self, status):
+        super().__init__(f"HTTP {status}")
+        self.status = status
+
+
+class FakeNotionAPI:
+    """Records progress writes; pages in `errors` fail with that status."""
+
+    def __init__(self, errors=None):
+        self.errors = errors or {}
+        self.writes = []
+        self.lock = threading.Lock()
+
+    def update_progress(self, page_id, progress, raise_errors=False):
+        with self.lock:
+            if page_id in self.errors:
+                raise StatusError(self.errors[page_id])
+            self.writes.append((page_id, progress))
+        return True
+
+
+def make_queue(tmp_path, api, **options):
+    options.setdefault("flush_interval", 0.05)
+    options.setdefault("retry_interval", 0.01)
+    return ProgressWriteQueue(api, journal_path=str(tmp_path / "journal.sqlite3"), **options)
+
+
+def test_updates_to_a_page_are_coalesced(tmp_path):
+    api = FakeNotionAPI()
+    queue = make_queue(tmp_path, api, flush_interval=0.2)
+    for progress in (10, 20, 30):
+        queue.enqueue("page", progress)
+
+    assert queue.flush(timeout=5)
+    queue.close()
+    assert api.writes == [("page", 30)]
+    assert queue.metrics()["coalesced"] == 2
+
+
+def test_permanent_errors_are_dead_lettered(tmp_path):
+    api = FakeNotionAPI(errors={"deleted": 404})
+    queue = make_queue(tmp_path, api)
+    queue.enqueue("deleted", 50)
+    queue.enqueue("page", 60)
+
+    assert queue.flush(timeout=5)
+    queue.close()
+    assert api.writes == [("page", 60)]
+    assert queue.metrics()["dropped"] == 1
+    rows = queue._connection().execute("SELECT page_id, progress FROM dead_letter").fetchall()
+    assert rows == [("deleted", 50)]
+
+
+def test_transient_errors_give_up_after_max_attempts(tmp_path):
+    api = FakeNotionAPI(errors={"page": 503})
+    queue = make_queue(tmp_path, api, max_attempts=3)
+    queue.enqueue("page", 70)
+
+    assert queue.flush(timeout=5)
+    queue.close()
+    metrics = queue.metrics()
+    assert metrics["failed"] == 3
+    assert metrics["dropped"] == 1
+
+
+def test_unflushed_updates_are_replayed_from_the_journal(tmp_path):
+    api = FakeNotionAPI(errors={"page": 503})
+    queue = make_queue(tmp_path, api, flush_interval=60)
+    queue.enqueue("page", 80)
+    queue.close(timeout=0)
+
+    # The failing write stays journaled and a new queue picks it up
+    recovered = FakeNotionAPI()
+    replay = make_queue(tmp_path, recovered)
+    assert replay.depth() == 1
+    assert replay.flush(timeout=5)
+    replay.close()
+    assert recovered.writes == [("page", 80)]
@@ -0,0 +1,300 @@
+import atexit
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+from api_interactions import NotionAPI
+from rate_limiter import is_retryable
+
+# Default journal location, coalescing window and retry delay (seconds)
+DEFAULT_JOURNAL_PATH = ".progress_journal.sqlite3"
+DEFAULT_FLUSH_INTERVAL = 1.0
+DEFAULT_RETRY_INTERVAL = 5.0
+
+# Failed flushes of one update before it is given up on
+DEFAULT_MAX_ATTEMPTS = 10
+
+
+class ProgressWriteQueue:
+    def __init__(self, notion_api: NotionAPI, journal_path: str = DEFAULT_JOURNAL_PATH,
+                 flush_interval: float = DEFAULT_FLUSH_INTERVAL, retry_interval: float = DEFAULT_RETRY_INTERVAL,
+                 max_attempts: int = DEFAULT_MAX_ATTEMPTS):
+        """
+        Initialize a write-behind queue for task progress updates.
+
+        Updates are coalesced per page (the last write wins), journaled to
+        SQLite so they survive a restart, and written to Notion by a
+        background thread through the shared rate limiter. An update that
+        fails with a permanent error (e.g. the page was deleted), or keeps
+        failing for max_attempts flushes, is moved to the journal's
+        dead_letter table instead of being retried forever.
+
+        Args:
+            notion_api: Client used to write the updates
+            journal_path: Path of the SQLite journal of pending writes
+            flush_interval: Seconds to collect a burst of updates before flushing
+            retry_interval: Seconds to wait before retrying failed writes
+            max_attempts: Failed flushes of an update before it is dead-lettered
+        """
+        self.notion_api = notion_api
+        self.journal_path = journal_path
+        self.flush_interval = flush_interval
+        self.retry_interval = retry_interval
+        self.max_attempts = max_attempts
+        self._attempts: Dict[str, int] = {}
+
+        self._local = threading.local()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._metrics = {
+            "enqueued": 0,
+            "coalesced": 0,
+            "flushed": 0,
+            "failed": 0,
+            "dropped": 0,
+            "last_flush_latency": 0.0,
+            "max_flush_latency": 0.0,
+            "total_flush_latency": 0.0
+        }
+
+        conn = self._connection()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS pending (
+                page_id TEXT PRIMARY KEY,
+                progress INTEGER NOT NULL,
+                seq INTEGER NOT NULL,
+                enqueued_at REAL NOT NULL
+            )
+            """
+        )
+        conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS dead_letter (
+                page_id TEXT NOT NULL,
+                progress INTEGER NOT NULL,
+                error TEXT,
+                failed_at REAL NOT NULL
+            )
+            """
+        )
+
+        # Replay writes left over from a previous run
+        self._pending: Dict[str, tuple] = {
+            page_id: (progress, seq, enqueued_at)
+            for page_id, progress, seq, enqueued_at in conn.execute(
+                "SELECT page_id, progress, seq, enqueued_at FROM pending"
+            )
+        }
+        self._seq = max((entry[1] for entry in self._pending.values()), default=0)
+
+        self._worker = threading.Thread(target=self._run, name="progress-write-behind", daemon=True)
+        self._worker.start()
+
+    def _connection(self) -> sqlite3.Connection:
+        """Return this thread's journal connection, opening it on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.journal_path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA busy_timeout=30000")
+            self._local.conn = conn
+        return conn
+
+    def enqueue(self, page_id: str, progress: int) -> None:
+        """
+        Queue a progress update, replacing any pending update for the page.
+
+        Args:
+            page_id: The ID of the task page
+            progress: The new progress percentage (0-100)
+        """
+        with self._cond:
+            previous = self._pending.get(page_id)
+            self._seq += 1
+            # Latency is measured from the oldest unflushed write for the page
+            enqueued_at = previous[2] if previous else time.time()
+            self._pending[page_id] = (progress, self._seq, enqueued_at)
+            # A new value gets a fresh set of attempts
+            self._attempts.pop(page_id, None)
+
+            self._connection().execute(
+                "INSERT OR REPLACE INTO pending (page_id, progress, seq, enqueued_at) VALUES (?, ?, ?, ?)",
+                (page_id, progress, self._seq, enqueued_at)
+            )
+            self._metrics["enqueued"] += 1
+            if previous:
+                self._metrics["coalesced"] += 1
+            self._cond.notify_all()
+
+    def _run(self) -> None:
+        """Worker loop: wait for updates, let bursts settle, then flush them."""
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending and self._closed:
+                    return
+
+            # Give a burst of updates time to coalesce before writing
+            if not self._closed:
+                time.sleep(self.flush_interval)
+
+            flushed = self._flush_pending()
+            if self._closed:
+                # One last attempt on shutdown; failures stay in the journal
+                return
+            if not flushed:
+                time.sleep(self.retry_interval)
+
+    def _flush_pending(self) -> bool:
+        """
+        Write a snapshot of the pending updates to Notion.
+
+        Returns:
+            bool: True if every write in the snapshot succeeded
+        """
+        with self._cond:
+            snapshot = dict(self._pending)
+
+        all_ok = True
+        for page_id, (progress, seq, enqueued_at) in snapshot.items():
+            try:
+                self.notion_api.update_progress(page_id, progress, raise_errors=True)
+            except Exception as e:
+                with self._cond:
+                    self._metrics["failed"] += 1
+                    attempts = self._attempts.get(page_id, 0) + 1
+                    self._attempts[page_id] = attempts
+                    if is_retryable(e) and attempts < self.max_attempts:
+                        all_ok = False
+                        continue
+                    # Retrying will not help; set the update aside so the journal drains
+                    print(f"Giving up on progress update for page {page_id} after {attempts} attempt(s): {e}")
+                    if self._clear(page_id, seq):
+                        self._connection().execute(
+                            "INSERT INTO dead_letter (page_id, progress, error, failed_at) VALUES (?, ?, ?, ?)",
+                            (page_id, progress, str(e), time.time())
+                        )
+                        self._metrics["dropped"] += 1
+                    self._cond.notify_all()
+                continue
+
+            latency = time.time() - enqueued_at
+            with self._cond:
+                self._clear(page_id, seq)
+                self._metrics["flushed"] += 1
+                self._metrics["last_flush_latency"] = latency
+                self._metrics["max_flush_latency"] = max(self._metrics["max_flush_latency"], latency)
+                self._metrics["total_flush_latency"] += latency
+                self._cond.notify_all()
+
+        return all_ok
+
+    def _clear(self, page_id: str, seq: int) -> bool:
+        """
+        Remove a pending update, unless a newer one for the page arrived meanwhile.
+
+        Must be called with the condition held.
+
+        Returns:
+            bool: True if the update was removed
+        """
+        if self._pending.get(page_id, (None, None))[1] != seq:
+            return False
+        del self._pending[page_id]
+        self._attempts.pop(page_id, None)
+        self._connection().execute("DELETE FROM pending WHERE page_id = ? AND seq = ?", (page_id, seq))
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until every pending update has been written.
+
+        Args:
+            timeout: Maximum seconds to wait (default: no limit)
+
+        Returns:
+            bool: True if the queue drained, False on timeout
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._pending:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout: Optional[float] = 30.0) -> None:
+        """
+        Stop the worker after it flushes what it can; the rest stays journaled.
+
+        Args:
+            timeout: Maximum seconds to wait for the worker
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._worker.join(timeout)
+
+    def depth(self) -> int:
+        """
+        Get the number of pages with an unflushed update.
+
+        Returns:
+            int: Pending page count
+        """
+        with self._cond:
+            return len(self._pending)
+
+    def metrics(self) -> Dict:
+        """
+        Get queue counters and flush latency.
+
+        Returns:
+            Dict: Queue depth, write counts and flush latencies in seconds
+        """
+        with self._cond:
+            metrics = dict(self._metrics)
+            metrics["depth"] = len(self._pending)
+            metrics["avg_flush_latency"] = (
+                metrics["total_flush_latency"] / metrics["flushed"] if metrics["flushed"] else 0.0
+            )
+            return metrics
+
+
+_shared_queues: Dict[str, ProgressWriteQueue] = {}
+_shared_queues_lock = threading.Lock()
+
+
+def get_shared_write_queue(notion_api: NotionAPI) -> Optional[ProgressWriteQueue]:
+    """
+    Get the process-wide write queue configured from the environment.
+
+    PROGRESS_WRITE_BEHIND=0 disables write-behind, PROGRESS_JOURNAL_PATH sets
+    the journal file and PROGRESS_FLUSH_INTERVAL the coalescing window. One
+    queue (and worker thread) exists per journal, however many trackers use it.
+
+    Args:
+        notion_api: Client used by the queue if it has to be created
+
+    Returns:
+        Optional[ProgressWriteQueue]: The shared queue, or None if disabled
+    """
+    if os.getenv("PROGRESS_WRITE_BEHIND", "1") == "0":
+        return None
+
+    journal_path = os.getenv("PROGRESS_JOURNAL_PATH", DEFAULT_JOURNAL_PATH)
+    with _shared_queues_lock:
+        if journal_path not in _shared_queues:
+            queue = ProgressWriteQueue(
+                notion_api,
+                journal_path=journal_path,
+                flush_interval=float(os.getenv("PROGRESS_FLUSH_INTERVAL", str(DEFAULT_FLUSH_INTERVAL)))
+            )
+            # Drain on interpreter exit; anything left is replayed next start
+            atexit.register(queue.close)
+            _shared_queues[journal_path] = queue
+        return _shared_queues[journal_path]